@@ -0,0 +1,193 @@
+"""Latency benchmarks for the locale apply/revert path.
+
+Runs RegionalFormatChanger end to end against the in-memory backend, so the
+numbers can be collected on any OS and compared between releases:
+
+    python benchmarks.py --iterations 5 --latency 0.002
+    python benchmarks.py --json > bench_output.txt
+    python benchmarks.py --phases            # also break runs down per traced phase
+    python benchmarks.py --shell-host        # new shell process per script vs persistent host
+    python benchmarks.py --fleet             # fleet controller against 1..100 stand-in agents
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from capability_cache import CapabilityCache
+from fleet import FleetAgent, FleetController, summarize_dispatch
+from cooldown import CooldownToken
+from locale_snapshots import SnapshotStore
+from os_backend import HKCU, INTERNATIONAL_KEY, InMemoryBackend
+from regional_utils import RegionalFormatChanger
+from shell_host import POWERSHELL_HOST_ARGV, ShellHostPool
+from tracing import TRACER, format_summary
+
+
+def _fake_powershell(args):
+    """Stand-in for the culture-sync script: report the language pack as installed."""
+    if "Get-WindowsCapability" in args[-1]:
+        return 0, "CAPABILITY_STATE=Installed\n", ""
+    return 0, "", ""
+
+
+def make_changer(latency=0.0, start_locale="de-DE", state_dir=None):
+    """Build a RegionalFormatChanger on an in-memory registry seeded with start_locale."""
+    state_dir = state_dir or tempfile.mkdtemp(prefix="rfc-bench-")
+    rfc = RegionalFormatChanger(backend=InMemoryBackend(shell_handler=_fake_powershell))
+    rfc.backend.latency.update({op: latency for op in InMemoryBackend.OPERATIONS})
+    rfc.backend.set_key(HKCU, INTERNATIONAL_KEY, rfc.get_locale_overrides(start_locale))
+    rfc.capability_cache = CapabilityCache(os.path.join(state_dir, "capability_cache.json"))
+    rfc.snapshots = SnapshotStore(os.path.join(state_dir, "region_snapshots.json"))
+    rfc.cooldown = CooldownToken(os.path.join(state_dir, "cooldown.token"))
+    rfc.hive_snapshot_dir = os.path.join(state_dir, "hive_snapshots")
+    rfc.default_locale = start_locale
+    return rfc
+
+
+def _time_call(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _summarize(samples):
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+
+def run_locale_benchmarks(iterations=3, latency=0.0):
+    """Time get_current_locale, apply_locale_quick and revert_to_default_quick."""
+    rfc = make_changer(latency)
+    samples = {
+        "get_current_locale": [],
+        "get_current_locale (cold)": [],
+        "apply_locale_quick": [],
+        "apply_locale_quick (no-op)": [],
+        "revert_to_default_quick": [],
+    }
+    for _ in range(iterations):
+        rfc.locale_state.invalidate()
+        samples["get_current_locale (cold)"].append(_time_call(rfc.get_current_locale))
+        samples["get_current_locale"].append(_time_call(rfc.get_current_locale))
+        samples["apply_locale_quick"].append(_time_call(rfc.apply_locale_quick, "en-US"))
+        samples["apply_locale_quick (no-op)"].append(_time_call(rfc.apply_locale_quick, "en-US"))
+        samples["revert_to_default_quick"].append(_time_call(rfc.revert_to_default_quick))
+    return {name: _summarize(values) for name, values in samples.items()}
+
+
+def run_shell_benchmarks(iterations=3):
+    """Time a trivial script run in a new shell process vs a persistent ShellHost.
+
+    Uses powershell on Windows and the `sh` stand-in host elsewhere.
+    """
+    if sys.platform == "win32":
+        argv, script, pool = ["powershell", "-NoProfile", "-Command"], "$null", ShellHostPool(POWERSHELL_HOST_ARGV, 1)
+    else:
+        argv, script, pool = ["sh", "-c"], ":", ShellHostPool.standin(1)
+    samples = {"shell (new process)": [], "shell host (first call)": [], "shell host": []}
+    try:
+        samples["shell host (first call)"].append(_time_call(pool.run, script))
+        for _ in range(iterations):
+            samples["shell (new process)"].append(_time_call(subprocess.run, argv + [script]))
+            samples["shell host"].append(_time_call(pool.run, script))
+    finally:
+        pool.close()
+    return {name: _summarize(values) for name, values in samples.items()}
+
+
+async def _fleet_round(agent_count, latency, iterations, concurrency):
+    agents = []
+    for index in range(agent_count):
+        rfc = make_changer(latency)
+        # Stand-ins share this machine: no cooldown between rounds, no process scan
+        rfc.cooldown_max = 0.0
+        rfc.game_running = lambda: False
+        agents.append(await FleetAgent(rfc, "bench", port=0, name=f"seat-{index}").start())
+    controller = FleetController([(agent.host, agent.port) for agent in agents], "bench", concurrency, timeout=30.0)
+    samples = {"status (connect)": [], "status": [], "apply + revert": []}
+    try:
+        for _ in range(iterations):
+            for connection in controller.connections.values():
+                connection.close()
+            start = time.perf_counter()
+            await controller.status()
+            samples["status (connect)"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            await controller.status()
+            samples["status"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            applied = summarize_dispatch(await controller.dispatch(["apply", "en-US"]))
+            reverted = summarize_dispatch(await controller.dispatch(["revert"]))
+            samples["apply + revert"].append(time.perf_counter() - start)
+            if applied["succeeded"] != agent_count or reverted["succeeded"] != agent_count:
+                raise RuntimeError(f"{agent_count} agents: apply {applied}, revert {reverted}")
+    finally:
+        controller.close()
+        for agent in agents:
+            await agent.close()
+    return {f"fleet x{agent_count} {name}": _summarize(values) for name, values in samples.items()}
+
+
+def run_fleet_benchmarks(iterations=3, latency=0.0, sizes=(1, 10, 25, 50, 100), concurrency=32):
+    """Time controller round trips against N stand-in agents on 127.0.0.1 (one in-memory seat each)."""
+    results = {}
+    for size in sizes:
+        results.update(asyncio.run(_fleet_round(size, latency, iterations, concurrency)))
+    return results
+
+
+def print_table(results):
+    print(f"{'benchmark':<34}{'runs':>6}{'min':>11}{'p50':>11}{'p95':>11}{'max':>11}")
+    for name, stats in results.items():
+        print(
+            f"{name:<34}{stats['runs']:>6}"
+            f"{stats['min_ms']:>9.2f}ms{stats['p50_ms']:>9.2f}ms"
+            f"{stats['p95_ms']:>9.2f}ms{stats['max_ms']:>9.2f}ms"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the locale apply/revert path")
+    parser.add_argument("--iterations", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds injected into every backend call")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--phases", action="store_true", help="add per-phase p50/p95 from the trace spans")
+    parser.add_argument("--shell-host", action="store_true",
+                        help="also time scripts in a new shell process vs the persistent host")
+    parser.add_argument("--fleet", action="store_true",
+                        help="also time the fleet controller against 1..100 stand-in agents")
+    args = parser.parse_args(argv)
+
+    TRACER.clear()
+    results = run_locale_benchmarks(args.iterations, args.latency)
+    if args.shell_host:
+        results.update(run_shell_benchmarks(args.iterations))
+    if args.fleet:
+        results.update(run_fleet_benchmarks(args.iterations, args.latency))
+    if args.json:
+        if args.phases:
+            results = {"benchmarks": results, "phases": TRACER.summary()}
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+        if args.phases:
+            print()
+            print(format_summary(TRACER.summary()))
+
+
+if __name__ == "__main__":
+    main()
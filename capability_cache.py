@@ -0,0 +1,65 @@
+import json
+import os
+import threading
+import time
+
+
+class CapabilityCache:
+    """Persistent cache of Windows language capability state, keyed by culture.
+
+    Entries look like {"state": "Installed", "checked": <epoch seconds>} and
+    expire after `ttl` seconds so a removed language pack is noticed again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self._entries = data.get("cultures", {})
+        except Exception as e:
+            print(f"Error loading capability cache: {e}")
+        return self._entries
+
+    def _save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump({"version": self.VERSION, "cultures": self._entries}, f, indent=2)
+        except Exception as e:
+            print(f"Error saving capability cache: {e}")
+
+    def is_installed(self, culture):
+        """Return True if the culture's Language.Basic capability is known to be installed."""
+        with self._lock:
+            entry = self._load().get(culture.lower())
+            if not entry or entry.get("state") != "Installed":
+                return False
+            return time.time() - entry.get("checked", 0) < self.ttl
+
+    def record(self, culture, state):
+        """Store the capability state reported by PowerShell for a culture."""
+        with self._lock:
+            self._load()[culture.lower()] = {"state": state, "checked": time.time()}
+            self._save()
+
+    def invalidate(self, culture=None):
+        """Forget one culture, or every culture when `culture` is None."""
+        with self._lock:
+            entries = self._load()
+            if culture is None:
+                entries.clear()
+            else:
+                entries.pop(culture.lower(), None)
+            self._save()
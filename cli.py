@@ -0,0 +1,368 @@
+"""Headless command line entry point (never imports flet).
+
+    python cli.py apply [LOCALE]          # default: en-US
+    python cli.py apply --minimal        # keep the current locale, only switch it to a dot decimal
+    python cli.py revert
+    python cli.py apply --all-users      # every local account's hive (admin)
+    python cli.py status
+    python cli.py launch --steam | --path C:\\...\\Crossfire_Legion.exe
+    python cli.py run --steam | --path C:\\...\\Crossfire_Legion.exe
+    python cli.py log [--wait SECONDS] [--log-path PATH]
+    python cli.py --trace trace.jsonl apply   # also write per-phase timing spans
+    python cli.py --local apply          # never hand off to a running instance
+
+Every command prints one JSON object on stdout and exits with EXIT_OK on
+success, EXIT_FAILED when the operation failed and EXIT_USAGE for bad
+arguments. When the app is already running (see instance_ipc), the command
+is handed to it and runs there, which skips the process startup and UAC
+prompt; the output is the same.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+import instance_ipc
+from player_log import timestep_ok
+from os_backend import BROADCAST_MODES, WINDOW_TIMEOUT_MS
+from tracing import TRACER
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def _result(command, success, message, started, **extra):
+    result = {"command": command, "success": success, "message": message}
+    result.update(extra)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def _load_default(rfc):
+    rfc.default_locale = rfc.load_config()
+    return rfc.default_locale
+
+
+def _respect_cooldown(rfc):
+    """Wait out a cooldown started by another instance; returns ms waited."""
+    return round(rfc.wait_for_cooldown() * 1000, 2)
+
+
+def _locale_arg(value):
+    """argparse type: a locale from the bundled profile table, spelled as the table does."""
+    from locale_profiles import LocaleProfileDB
+    profile = LocaleProfileDB().get(value)
+    if profile is None:
+        raise argparse.ArgumentTypeError(f"unknown locale {value!r} (see locale_profiles.tsv)")
+    return profile["LocaleName"]
+
+
+def _apply_options(rfc, args):
+    """(locale, minimal) for apply/run; --minimal without a locale keeps the current one."""
+    if args.locale:
+        return args.locale, args.minimal
+    if args.minimal:
+        return rfc.get_current_locale().get("locale"), True
+    return "en-US", False
+
+
+def _broadcast(args):
+    """This command's broadcast options, passed per call so a resident instance keeps its own."""
+    return {"broadcast_mode": args.broadcast, "window_timeout_ms": args.window_timeout}
+
+
+def _all_users_result(command, rfc, args, started, locale=None):
+    """Apply/revert in every user profile's hive (admin); one entry per SID under "users"."""
+    users = rfc.apply_to_all_users(locale, revert=locale is None, **_broadcast(args))
+    succeeded = sum(1 for result in users.values() if result["success"])
+    message = f"{succeeded} of {len(users)} user profile(s) updated" if users else "No user profiles found"
+    return _result(command, bool(users) and succeeded == len(users), message, started, users=users)
+
+
+def cmd_apply(rfc, args, started):
+    if args.all_users:
+        if args.minimal:
+            return _result("apply", False, "--minimal applies to the current user only", started)
+        return _all_users_result("apply", rfc, args, started, locale=args.locale or "en-US")
+    locale, minimal = _apply_options(rfc, args)
+    waited = _respect_cooldown(rfc)
+    success, message = rfc.apply_locale_quick(locale, minimal=minimal, **_broadcast(args))
+    return _result("apply", success, message, started, locale=locale, cooldown_waited_ms=waited,
+                   phases=rfc.last_apply_phases)
+
+
+def cmd_revert(rfc, args, started):
+    _load_default(rfc)
+    if args.all_users:
+        return _all_users_result("revert", rfc, args, started)
+    waited = _respect_cooldown(rfc)
+    success, message = rfc.revert_to_default_quick(**_broadcast(args))
+    return _result("revert", success, message, started, locale=rfc.current_locale, cooldown_waited_ms=waited)
+
+
+def cmd_status(rfc, args, started):
+    state = rfc.get_current_locale()
+    return _result(
+        "status", True, "ok", started,
+        locale=state.get("locale"), country=state.get("country"),
+        default_locale=_load_default(rfc),
+        affected=rfc.is_locale_affected(state.get("locale")),
+    )
+
+
+def _launch(rfc, args):
+    if args.steam:
+        return rfc.launch_crossfire_legion()
+    return rfc.launch_manual_path(args.path)
+
+
+def cmd_launch(rfc, args, started):
+    success, message = _launch(rfc, args)
+    return _result("launch", success, message, started)
+
+
+def _timestep_result(ok, line, culture):
+    return {"ok": ok, "value": line.value, "culture": culture, "line": line.text}
+
+
+def cmd_log(rfc, args, started):
+    """Read Player.log from the saved offset and report the timestep/culture lines found.
+
+    With --wait, keeps following the log until a timestep line appears.
+    """
+    tailer = rfc.player_log_tailer(args.log_path)
+    stop = threading.Event()
+    timer = threading.Timer(args.wait, stop.set) if args.wait else None
+    lines, culture, timestep = 0, None, None
+    stream = tailer.follow(stop) if timer else tailer.read_new()
+    if timer:
+        timer.daemon = True
+        timer.start()
+    try:
+        for line in stream:
+            lines += 1
+            if line.kind == "culture":
+                culture = line.value
+            elif line.kind == "timestep":
+                timestep = _timestep_result(timestep_ok(line.value), line, culture)
+                if timer:
+                    break
+    finally:
+        if timer:
+            timer.cancel()
+        tailer.save_state()
+    if timestep is None:
+        return _result("log", False, "No timestep line found in Player.log", started,
+                       lines=lines, culture=culture, offset=tailer.offset, path=tailer.path)
+    message = "Timestep parsed correctly" if timestep["ok"] else "Timestep misparsed (speed bug active)"
+    return _result("log", timestep["ok"], message, started,
+                   lines=lines, culture=culture, timestep=timestep, offset=tailer.offset, path=tailer.path)
+
+
+def cmd_run(rfc, args, started):
+    """Apply the fix, launch the game, wait for it to exit, then revert."""
+    _load_default(rfc)
+    locale, minimal = _apply_options(rfc, args)
+    _respect_cooldown(rfc)
+    applied, apply_message = rfc.apply_locale_quick(locale, minimal=minimal, **_broadcast(args))
+    if not applied:
+        return _result("run", False, apply_message, started, stage="apply")
+
+    timestep = {}
+
+    def on_timestep(ok, line, culture):
+        # Reported as soon as the game logs it, long before the run finishes
+        timestep.update(_timestep_result(ok, line, culture))
+        print(f"Player.log timestep {line.value}: {'ok' if ok else 'MISPARSED'}", file=sys.stderr, flush=True)
+
+    rfc.monitor_player_log(on_timestep, timeout=args.appear_timeout + 120)
+    # A game started before the new culture is live still parses with the old one;
+    # the cooldown ends once a probe sees it (at most rfc.cooldown_max seconds)
+    launch_waited = _respect_cooldown(rfc)
+    launched, launch_message = _launch(rfc, args)
+    game_message = None
+    if launched:
+        # Blocks on the game process (following the Steam hand-off) with no polling while it runs
+        found, game_message = rfc.wait_for_game_exit(args.appear_timeout)
+        if found:
+            # Indexed under the locale the session actually ran with, i.e. before reverting
+            rfc.archive_player_log()
+    rfc.stop_log_monitor()
+    reverted, revert_message = rfc.revert_to_default_quick(**_broadcast(args))
+    return _result(
+        "run", launched and reverted, launch_message if not launched else revert_message, started,
+        apply=apply_message, launch=launch_message, game=game_message, revert=revert_message,
+        timestep=timestep or None, launch_waited_ms=launch_waited,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Crossfire Legion regional format fix (headless)")
+    parser.add_argument("--trace", metavar="FILE", help="write this run's timing spans to FILE as JSONL")
+    parser.add_argument("--broadcast", choices=BROADCAST_MODES, default="send",
+                        help="how WM_SETTINGCHANGE is delivered (default: send)")
+    parser.add_argument("--window-timeout", type=int, default=WINDOW_TIMEOUT_MS, metavar="MS",
+                        help=f"per-window broadcast: how long to wait on each window (default: {WINDOW_TIMEOUT_MS})")
+    parser.add_argument("--local", action="store_true",
+                        help="run in this process even if the app is already running")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    apply_parser = sub.add_parser("apply", help="apply a regional format (default en-US)")
+    apply_parser.add_argument("locale", nargs="?", type=_locale_arg, help="default: en-US (with --minimal: the current locale)")
+    apply_parser.add_argument("--minimal", action="store_true",
+                              help="only switch the locale's decimal separator to \".\"; its other formats stay")
+    apply_parser.set_defaults(handler=cmd_apply)
+
+    revert_parser = sub.add_parser("revert", help="revert to the saved default")
+    revert_parser.set_defaults(handler=cmd_revert)
+    for command_parser in (apply_parser, revert_parser):
+        command_parser.add_argument("--all-users", action="store_true",
+                                    help="every user profile on this PC, signed in or not (admin)")
+    sub.add_parser("status", help="show current and default locale").set_defaults(handler=cmd_status)
+
+    log_parser = sub.add_parser("log", help="check Player.log for the parsed timestep")
+    log_parser.add_argument("--wait", type=float, default=0.0,
+                            help="seconds to keep following the log for a timestep line")
+    log_parser.add_argument("--log-path", help="Player.log to read (default: the game's LocalLow folder)")
+    log_parser.set_defaults(handler=cmd_log)
+
+    for name, handler, help_text in (
+        ("launch", cmd_launch, "launch the game"),
+        ("run", cmd_run, "apply, launch, and revert when the game exits"),
+    ):
+        launch_parser = sub.add_parser(name, help=help_text)
+        target = launch_parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("--steam", action="store_true", help="launch through Steam")
+        target.add_argument("--path", help="full path to Crossfire_Legion.exe")
+        if name == "run":
+            launch_parser.add_argument("--locale", type=_locale_arg, help="default: en-US (with --minimal: the current locale)")
+            launch_parser.add_argument("--minimal", action="store_true",
+                                       help="only switch the locale's decimal separator to \".\"; "
+                                            "its other formats stay")
+            launch_parser.add_argument("--appear-timeout", type=float, default=180.0,
+                                       help="seconds to wait for Crossfire_Legion.exe to start")
+        launch_parser.set_defaults(handler=handler)
+    return parser
+
+
+def execute(rfc, args, started):
+    """Run parsed `args` against `rfc` and return the result dict (never raises).
+
+    Shared by main() and the resident instance serving forwarded commands.
+    """
+    previous_broadcast = rfc._broadcast_future
+    try:
+        result = args.handler(rfc, args, started)
+        # The apply did not wait for the broadcast; collect its outcome for the report
+        # (a long-lived instance may still hold one from an earlier command)
+        if rfc._broadcast_future is not previous_broadcast:
+            broadcast = rfc.wait_for_broadcast(rfc.broadcast_timeout_ms / 1000 + 5)
+            if broadcast is not None:
+                result["broadcast"] = broadcast._asdict()
+    except Exception as e:
+        result = _result(args.command, False, f"Unexpected error: {e}", started)
+    return result
+
+
+def _same_file(a, b):
+    return bool(a and b) and os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def refuse_forwarded(rfc, args, network=False):
+    """Why a forwarded command must not run here (None if it may).
+
+    The resident instance may be elevated while its client is not, so a
+    forwarded command gets no more than the UI offers: no --trace file, a
+    Player.log only by its usual names (never over the network), and only
+    the Steam install or the saved game path as --path (only the Steam
+    install over the network). Locales are checked by the parser.
+    """
+    where = "over the network" if network else "by a running instance (use --local)"
+    if args.trace:
+        return f"--trace is not accepted {where}"
+    log_path = getattr(args, "log_path", None)
+    if log_path and (network or os.path.basename(log_path) not in ("Player.log", "Player-prev.log")):
+        return f"--log-path {log_path!r} is not accepted {where}"
+    path = getattr(args, "path", None)
+    if path:
+        # Never start an arbitrary exe on the client's behalf
+        allowed = [rfc.find_game_exe()] + ([] if network else [rfc.load_game_path()])
+        if not any(_same_file(path, exe) for exe in allowed):
+            allowed_names = "the Steam install" if network else "the Steam install or the saved game path"
+            return f"Only {allowed_names} can be launched {where}"
+    return None
+
+
+def serve_request(rfc, argv, network=False):
+    """ControlServer handler: run one forwarded argv in this process (see refuse_forwarded)."""
+    started = time.perf_counter()
+    try:
+        args = build_parser().parse_args(argv)
+    except SystemExit:
+        return _result(argv[0] if argv else "?", False, f"Invalid arguments: {' '.join(argv)}", started)
+    reason = refuse_forwarded(rfc, args, network=network)
+    if reason:
+        return _result(args.command, False, reason, started)
+    return execute(rfc, args, started)
+
+
+def _absolute_paths(argv):
+    """Resolve path arguments against our cwd; the resident instance has its own."""
+    resolved = []
+    expect_path = False
+    for arg in argv:
+        if expect_path:
+            arg = os.path.abspath(arg)
+        elif arg.startswith(("--path=", "--log-path=")):
+            option, _, value = arg.partition("=")
+            arg = f"{option}={os.path.abspath(value)}"
+        expect_path = arg in ("--path", "--log-path")
+        resolved.append(arg)
+    return resolved
+
+
+def _forward(argv, started):
+    """Hand the command to a running instance; returns its result, or None if there is none."""
+    try:
+        result = instance_ipc.forward(_absolute_paths(argv))
+    except Exception as e:
+        # Sent but unanswered: running it again here could apply twice
+        return _result(argv[0] if argv else "?", False, f"Running instance did not answer: {e}", started)
+    if result is not None:
+        result["forwarded_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    # A trace describes this process's run, so --trace always runs locally
+    result = None if args.local or args.trace else _forward(argv, started)
+    if result is None:
+        from regional_utils import RegionalFormatChanger
+        rfc = RegionalFormatChanger()
+        # Diagnostics printed by RegionalFormatChanger must not corrupt the JSON on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            result = execute(rfc, args, started)
+    if args.trace:
+        try:
+            TRACER.export_jsonl(args.trace)
+            result["trace"] = args.trace
+        except OSError as e:
+            print(f"Could not write trace: {e}", file=sys.stderr)
+    print(json.dumps(result, ensure_ascii=False), flush=True)
+    return EXIT_OK if result["success"] else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
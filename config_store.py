@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+class ConfigStore:
+    """In-memory view of one JSON config file with debounced, atomic writes.
+
+    The file is read once, on first access. set() only changes memory and
+    schedules a write `delay` seconds after the last change, so a burst of
+    edits (e.g. typing a path) becomes one write. Writes go to a temp file in
+    the same folder that is then renamed over the config, so a crash never
+    leaves a half-written file. `writes` counts the files actually written.
+    """
+
+    def __init__(self, path, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self._data = None
+        self._dirty = False
+        self._deadline = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    def _load(self):
+        if self._data is not None:
+            return self._data
+        self._data = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._data = data
+        except Exception as e:
+            print(f"Error loading {os.path.basename(self.path)}: {e}")
+        return self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._load().get(key, default)
+
+    def set(self, **values):
+        """Update values in memory and schedule a write; unchanged values are not written."""
+        with self._lock:
+            data = self._load()
+            if all(data.get(key) == value for key, value in values.items()):
+                return
+            data.update(values)
+            data["last_saved"] = datetime.now().isoformat()
+            self._dirty = True
+            self._deadline = time.monotonic() + self.delay
+            if self._timer is None:
+                self._start_timer(self.delay)
+
+    def _start_timer(self, delay):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            remaining = (self._deadline or 0) - time.monotonic()
+            if remaining > 0:
+                # More edits arrived while waiting: wait out the rest instead of writing now
+                self._start_timer(remaining)
+                return
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Write pending changes now (no-op when nothing changed)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = dict(self._data)
+            self._dirty = False
+            try:
+                folder = os.path.dirname(os.path.abspath(self.path))
+                fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=folder)
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, indent=2)
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+                self.writes += 1
+            except Exception as e:
+                self._dirty = True
+                print(f"Error saving {os.path.basename(self.path)}: {e}")
+
+    def reset_count(self):
+        """Zero `writes`, e.g. before measuring one interaction."""
+        self.writes = 0
@@ -0,0 +1,55 @@
+import json
+import os
+import tempfile
+import time
+
+
+class CooldownToken:
+    """Small file shared by every instance (GUI, CLI) describing the current cooldown.
+
+    Written after a locale change: {"expected": {"locale", "decimal"}, "started",
+    "until", "pid"}, where "until" (epoch seconds) is the hard upper bound.
+    Whoever sees the token may probe the culture and end it early with
+    finish(); once "until" has passed it is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def start(self, expected, max_seconds):
+        """Begin a cooldown waiting for `expected` ({"locale", "decimal"}) to go live."""
+        now = time.time()
+        token = {"expected": expected, "started": now, "until": now + max_seconds, "pid": os.getpid()}
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(self.path)))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(token, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error writing cooldown token: {e}")
+        return token
+
+    def read(self):
+        """Return the active token, or None if there is none or it has expired."""
+        try:
+            with open(self.path, 'r') as f:
+                token = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if token.get("until", 0) <= time.time():
+            return None
+        return token
+
+    def remaining(self):
+        """Seconds left before the hard upper bound (0 when no cooldown is active)."""
+        token = self.read()
+        return max(0.0, token["until"] - time.time()) if token else 0.0
+
+    def finish(self):
+        """End the cooldown for every instance."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing cooldown token: {e}")
@@ -0,0 +1,399 @@
+"""Run the fix on many seats at once.
+
+Each seat runs an agent; one controller sends commands to all of them:
+
+    python fleet.py agent --token SECRET --host 0.0.0.0       # on every seat
+    python fleet.py control --agents seats.txt --token SECRET status
+    python fleet.py control --agents 10.0.0.11,10.0.0.12 --token SECRET apply en-US
+    python fleet.py control --agents seats.txt --token SECRET launch --steam
+
+Commands are the same as cli.py's (apply, revert, status, launch, run,
+log); `status` on the controller additionally aggregates every seat's
+locale, cooldown and whether the game is running. The token may also come
+from the CROSSFIRE_FLEET_TOKEN environment variable. The agent listens on
+127.0.0.1 unless --host says otherwise. Over the network a seat only
+applies locales from its profile table, only launches the game found in its
+own Steam libraries, and refuses options that name files on the seat
+(--log-path, --trace).
+
+Wire protocol: newline-delimited JSON over TCP. The agent opens with
+{"agent", "version", "challenge"}; the client answers {"nonce", "proof"}
+and the agent replies {"proof"}, each proof being an HMAC-SHA256 keyed with
+the token over both random values, so the token itself never crosses the
+wire and both sides know the other holds it. Then each request
+{"id", "argv"} gets one reply {"id", "result"}. Connections stay open and
+are reused for every later command. Requests and results are not
+encrypted; run the fleet on a network you trust.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import secrets
+import socket
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PORT = 47615
+PROTOCOL_VERSION = 2
+# Replies can carry a Player.log line or a per-SID table; requests are tiny
+LINE_LIMIT = 1 << 20
+STATUS_COMMAND = "fleet-status"
+# Commands that only read state; they are answered even while a seat is busy applying or running
+READ_ONLY_COMMANDS = (STATUS_COMMAND, "status")
+
+
+def _encode(message):
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _proof(token, role, *nonces):
+    """HMAC-SHA256 hex digest proving `role` ("controller" or "agent") knows the token."""
+    message = "|".join((role,) + nonces).encode("utf-8")
+    return hmac.new(token.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def _proof_matches(received, expected):
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    return hmac.compare_digest(str(received).encode("utf-8"), expected.encode("ascii"))
+
+
+def agent_status(rfc):
+    """This seat's state for the controller's aggregate view."""
+    state = rfc.get_current_locale()
+    return {
+        "command": STATUS_COMMAND, "success": True, "message": "ok",
+        "locale": state.get("locale"),
+        "default_locale": rfc.default_locale or rfc.load_config(),
+        "affected": rfc.is_locale_affected(state.get("locale")),
+        "cooldown_remaining": round(rfc.cooldown.remaining(), 2),
+        "game_running": rfc.game_running(),
+    }
+
+
+# --- AGENT ---
+class FleetAgent:
+    """Serves cli.py commands for one seat's RegionalFormatChanger over TCP.
+
+    Commands that change the seat run one at a time on a single worker
+    thread, so two controllers can never interleave an apply and a revert on
+    the same seat. Status queries have their own worker, so a seat in the
+    middle of a `run` still reports its state instead of looking unreachable.
+    """
+
+    def __init__(self, rfc, token, host="127.0.0.1", port=DEFAULT_PORT, name=None):
+        if not token:
+            raise ValueError("A fleet token is required")
+        self.rfc = rfc
+        self.token = token
+        self.host = host
+        self.port = port
+        self.name = name or socket.gethostname()
+        self.requests = 0
+        self._server = None
+        self._writers = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fleet-agent")
+        self._status_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fleet-status")
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=LINE_LIMIT)
+        # Port 0 picks a free port; report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Open connections outlive the listening socket; end them so controllers reconnect
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False)
+        self._status_executor.shutdown(wait=False)
+
+    def _run(self, argv):
+        import cli
+
+        if argv == [STATUS_COMMAND]:
+            return agent_status(self.rfc)
+        # Same policy as the local control pipe, minus the options that name local files
+        return cli.serve_request(self.rfc, argv, network=True)
+
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        self._writers.add(writer)
+        try:
+            challenge = secrets.token_hex(16)
+            writer.write(_encode({"agent": self.name, "version": PROTOCOL_VERSION, "challenge": challenge}))
+            await writer.drain()
+            hello = json.loads(await reader.readline() or b"null")
+            if not isinstance(hello, dict):
+                return
+            nonce = str(hello.get("nonce", ""))
+            if not nonce or not _proof_matches(hello.get("proof", ""), _proof(self.token, "controller", challenge, nonce)):
+                return
+            writer.write(_encode({"proof": _proof(self.token, "agent", nonce, challenge)}))
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                request = json.loads(line)
+                argv = request.get("argv")
+                if not isinstance(argv, list) or not argv:
+                    result = {"success": False, "message": "Bad request: expected {'id', 'argv': [...]}"}
+                else:
+                    self.requests += 1
+                    argv = [str(arg) for arg in argv]
+                    executor = self._status_executor if argv[0] in READ_ONLY_COMMANDS else self._executor
+                    try:
+                        result = await loop.run_in_executor(executor, self._run, argv)
+                    except Exception as e:
+                        result = {"command": argv[0], "success": False, "message": f"Unexpected error: {e}"}
+                writer.write(_encode({"id": request.get("id"), "result": result}))
+                await writer.drain()
+        except (ConnectionError, ValueError, asyncio.LimitOverrunError, asyncio.IncompleteReadError):
+            pass  # dropped or garbled connection; the controller reconnects
+        except asyncio.CancelledError:
+            pass  # agent shutting down
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+# --- CONTROLLER ---
+class _AgentConnection:
+    """Persistent connection to one agent; requests on it are sent one at a time."""
+
+    def __init__(self, address, token):
+        self.address = address
+        self.token = token
+        self.agent = None
+        self.connects = 0
+        self._reader = self._writer = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        host, port = self.address
+        self._reader, self._writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        self.connects += 1
+        try:
+            hello = json.loads(await self._reader.readline() or b"null")
+            if not isinstance(hello, dict) or hello.get("version") != PROTOCOL_VERSION:
+                raise ConnectionError(f"Not a fleet agent speaking protocol {PROTOCOL_VERSION}")
+            challenge = str(hello.get("challenge", ""))
+            nonce = secrets.token_hex(16)
+            self._writer.write(_encode({"nonce": nonce, "proof": _proof(self.token, "controller", challenge, nonce)}))
+            await self._writer.drain()
+            reply = json.loads(await self._reader.readline() or b"null")
+            if not isinstance(reply, dict):
+                raise PermissionError("Agent rejected the fleet token")
+            if not _proof_matches(reply.get("proof", ""), _proof(self.token, "agent", nonce, challenge)):
+                raise PermissionError("Agent does not hold the fleet token")
+        except BaseException:
+            self.close()
+            raise
+        self.agent = hello.get("agent")
+
+    async def request(self, argv):
+        async with self._lock:
+            for _ in range(2):
+                reused = self._writer is not None
+                if not reused:
+                    await self._connect()
+                request_id = next(self._ids)
+                try:
+                    self._writer.write(_encode({"id": request_id, "argv": list(argv)}))
+                    await self._writer.drain()
+                    line = await self._reader.readline()
+                    if not line:
+                        raise ConnectionResetError("Agent closed the connection")
+                except (ConnectionError, OSError):
+                    self.close()
+                    if reused:
+                        continue  # the agent restarted since we last talked; connect once more
+                    raise
+                reply = json.loads(line)
+                if reply.get("id") != request_id:
+                    self.close()
+                    raise ConnectionError(f"Reply {reply.get('id')} for request {request_id}")
+                return reply["result"]
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+def parse_agent(spec, default_port=DEFAULT_PORT):
+    """"host" or "host:port" -> (host, port)."""
+    host, separator, port = spec.strip().rpartition(":")
+    if not separator:
+        return spec.strip(), default_port
+    return host, int(port)
+
+
+class FleetController:
+    """Send one command to many agents concurrently and collect their results.
+
+    At most `concurrency` agents are talked to at once; an agent that does
+    not answer within `timeout` seconds is reported as failed (its
+    connection is dropped, since its state is unknown) without holding up
+    the others.
+    """
+
+    def __init__(self, agents, token, concurrency=32, timeout=30.0):
+        self.connections = {f"{host}:{port}": _AgentConnection((host, port), token) for host, port in agents}
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = None
+
+    async def _send(self, name, argv, timeout):
+        connection = self.connections[name]
+        started = time.perf_counter()
+        async with self._semaphore:
+            try:
+                result = await asyncio.wait_for(connection.request(argv), timeout)
+            except asyncio.TimeoutError:
+                connection.close()
+                result = {"success": False, "message": f"No answer within {timeout:g}s", "unreachable": True}
+            except (OSError, ValueError) as e:
+                result = {"success": False, "message": f"Agent unreachable: {e}", "unreachable": True}
+        result["agent"] = connection.agent
+        result["round_trip_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def dispatch(self, argv, timeout=None):
+        """Run `argv` (a cli.py command) on every agent; returns {"host:port": result}."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = self.timeout if timeout is None else timeout
+        names = list(self.connections)
+        results = await asyncio.gather(*(self._send(name, argv, timeout) for name in names))
+        return dict(zip(names, results))
+
+    async def status(self, timeout=None):
+        """Every agent's fleet-status plus a summary across the fleet."""
+        agents = await self.dispatch([STATUS_COMMAND], timeout)
+        return {"summary": summarize(agents), "agents": agents}
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.close()
+
+
+def summarize(statuses):
+    """Aggregate fleet-status results: seats per locale, cooldowns, running games, failures."""
+    reachable = [s for s in statuses.values() if s.get("success")]
+    return {
+        "agents": len(statuses),
+        "reachable": len(reachable),
+        "locales": dict(Counter(s.get("locale") or "Unknown" for s in reachable)),
+        "affected": sum(1 for s in reachable if s.get("affected")),
+        "cooling_down": sum(1 for s in reachable if s.get("cooldown_remaining", 0) > 0),
+        "games_running": sum(1 for s in reachable if s.get("game_running")),
+    }
+
+
+def summarize_dispatch(results):
+    """Aggregate a command's results: succeeded/failed counts and the slowest round trip."""
+    return {
+        "agents": len(results),
+        "succeeded": sum(1 for r in results.values() if r.get("success")),
+        "unreachable": sum(1 for r in results.values() if r.get("unreachable")),
+        "max_round_trip_ms": max((r["round_trip_ms"] for r in results.values()), default=0.0),
+    }
+
+
+# --- COMMAND LINE ---
+def _read_agents(value):
+    """Comma-separated host[:port] list, or a file with one per line (# comments allowed)."""
+    if os.path.isfile(value):
+        with open(value, "r", encoding="utf-8") as f:
+            specs = [line.split("#", 1)[0] for line in f]
+    else:
+        specs = value.split(",")
+    return [parse_agent(spec) for spec in specs if spec.strip()]
+
+
+async def _run_agent(args):
+    from regional_utils import RegionalFormatChanger
+
+    rfc = RegionalFormatChanger()
+    rfc.default_locale = rfc.load_config()
+    # Status is served from the locale cache; without the watcher it would miss changes
+    # made on the seat itself (Windows Settings, the GUI, cli.py --local)
+    rfc.start_locale_watch()
+    try:
+        agent = await FleetAgent(rfc, args.token, args.host, args.port).start()
+        print(f"Fleet agent {agent.name} listening on {agent.host}:{agent.port}", file=sys.stderr, flush=True)
+        try:
+            await agent.serve_forever()
+        finally:
+            await agent.close()
+    finally:
+        rfc.stop_locale_watch()
+        rfc.flush_config()
+
+
+async def _run_control(args):
+    controller = FleetController(_read_agents(args.agents), args.token, args.concurrency, args.timeout)
+    started = time.perf_counter()
+    try:
+        if args.command == ["status"]:
+            output = await controller.status()
+            ok = output["summary"]["reachable"] == output["summary"]["agents"]
+        else:
+            agents = await controller.dispatch(args.command)
+            output = {"summary": summarize_dispatch(agents), "agents": agents}
+            ok = output["summary"]["succeeded"] == output["summary"]["agents"]
+    finally:
+        controller.close()
+    output["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    print(json.dumps(output, ensure_ascii=False), flush=True)
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="fleet.py", description="Apply the fix on many seats at once")
+    parser.add_argument("--token", default=os.environ.get("CROSSFIRE_FLEET_TOKEN"),
+                        help="shared secret (default: $CROSSFIRE_FLEET_TOKEN)")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    agent_parser = sub.add_parser("agent", help="serve this seat")
+    agent_parser.add_argument("--host", "--bind", dest="host", default="127.0.0.1",
+                              help="address to listen on (default: 127.0.0.1; 0.0.0.0 for every interface)")
+    agent_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+
+    control_parser = sub.add_parser("control", help="send a command to every agent")
+    control_parser.add_argument("--agents", required=True, help="host[:port],... or a file with one per line")
+    control_parser.add_argument("--concurrency", type=int, default=32, help="agents contacted at once")
+    control_parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each agent")
+    control_parser.add_argument("command", nargs=argparse.REMAINDER, help="cli.py command, e.g. apply en-US")
+
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("a fleet token is required (--token or CROSSFIRE_FLEET_TOKEN)")
+    if args.mode == "agent":
+        try:
+            asyncio.run(_run_agent(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if not args.command:
+        parser.error("control needs a command, e.g. status or apply en-US")
+    return asyncio.run(_run_control(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import os
+import sys
+import threading
+import time
+
+GAME_EXE = "Crossfire_Legion.exe"
+
+
+class WatchStopped(Exception):
+    """Raised inside the watcher when stop() is called."""
+
+
+# --- PROCESS LOOKUP ---
+def find_pids(exe_name):
+    """Return PIDs of running processes whose image name is `exe_name` (case-insensitive)."""
+    if sys.platform == "win32":
+        return _find_pids_windows(exe_name)
+    return _find_pids_posix(exe_name)
+
+
+def _find_pids_windows(exe_name):
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD), ("th32DefaultHeapID", ctypes.c_void_p),
+            ("th32ModuleID", wintypes.DWORD), ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD), ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD), ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+    kernel32 = ctypes.windll.kernel32
+    kernel32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+    kernel32.Process32FirstW.argtypes = [ctypes.c_void_p, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.Process32NextW.argtypes = [ctypes.c_void_p, ctypes.POINTER(PROCESSENTRY32W)]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snapshot or snapshot == INVALID_HANDLE_VALUE:
+        return []
+    pids = []
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        more = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while more:
+            if entry.szExeFile.lower() == exe_name.lower():
+                pids.append(entry.th32ProcessID)
+            more = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return pids
+
+
+def _find_pids_posix(exe_name):
+    target = exe_name.lower()
+    pids = []
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return pids
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                argv0 = f.read().split(b"\0", 1)[0].decode("utf-8", "replace")
+            with open(f"/proc/{entry}/comm", "r") as f:
+                comm = f.read().strip()
+        except OSError:
+            continue
+        # comm is truncated to 15 characters by the kernel; argv[0] may carry a Windows path (Proton)
+        name = argv0.replace("\\", "/").rsplit("/", 1)[-1].lower()
+        if name == target or comm.lower() == target[:15]:
+            pids.append(int(entry))
+    return pids
+
+
+# --- EXIT WAITING ---
+class _ExitWaiter:
+    """Blocks on a process handle (Windows) or pidfd (Linux) until exit or stop()."""
+
+    def __init__(self):
+        if sys.platform == "win32":
+            import ctypes
+            self._kernel32 = ctypes.windll.kernel32
+            self._kernel32.CreateEventW.restype = ctypes.c_void_p
+            self._kernel32.OpenProcess.restype = ctypes.c_void_p
+            self._kernel32.WaitForMultipleObjects.argtypes = [ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong]
+            self._kernel32.SetEvent.argtypes = [ctypes.c_void_p]
+            self._kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+            self._stop_event = self._kernel32.CreateEventW(None, True, False, None)
+        else:
+            self._stop_read, self._stop_write = os.pipe()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            if self._closed:
+                return
+            if sys.platform == "win32":
+                self._kernel32.SetEvent(self._stop_event)
+            else:
+                os.write(self._stop_write, b"x")
+
+    def sleep(self, seconds):
+        """Sleep that returns early (raising WatchStopped) when stop() is called."""
+        if self._stopped.wait(seconds):
+            raise WatchStopped()
+
+    def wait(self, pid):
+        """Return when process `pid` has exited; raise WatchStopped if stopped first."""
+        if self._stopped.is_set():
+            raise WatchStopped()
+        if sys.platform == "win32":
+            self._wait_windows(pid)
+        else:
+            self._wait_posix(pid)
+
+    def _wait_windows(self, pid):
+        import ctypes
+
+        SYNCHRONIZE = 0x00100000
+        INFINITE = 0xFFFFFFFF
+        WAIT_OBJECT_0 = 0
+        handle = self._kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return  # Already gone
+        try:
+            handles = (ctypes.c_void_p * 2)(handle, self._stop_event)
+            if self._kernel32.WaitForMultipleObjects(2, handles, False, INFINITE) != WAIT_OBJECT_0:
+                raise WatchStopped()
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def _wait_posix(self, pid):
+        import select
+
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return  # Already gone
+        except (AttributeError, OSError):
+            pidfd = None
+        if pidfd is None:
+            # No pidfd (old kernel / non-Linux): fall back to a slow liveness check
+            while _pid_alive(pid):
+                self.sleep(1.0)
+            return
+        try:
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            poller.register(self._stop_read, select.POLLIN)
+            ready = {fd for fd, _ in poller.poll()}
+            if pidfd not in ready:
+                raise WatchStopped()
+        finally:
+            os.close(pidfd)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if sys.platform == "win32":
+                self._kernel32.CloseHandle(self._stop_event)
+            else:
+                os.close(self._stop_read)
+                os.close(self._stop_write)
+
+
+def _pid_alive(pid):
+    if sys.platform == "win32":
+        # os.kill(pid, 0) would terminate the process on Windows; ask for its exit code instead
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        kernel32.OpenProcess.restype = ctypes.c_void_p
+        kernel32.GetExitCodeProcess.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_ulong)]
+        kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong(0)
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# --- WATCHER ---
+class GameWatcher:
+    """Follows a launched game until it exits.
+
+    When started with the PID of a direct launch it waits on that process.
+    Otherwise (Steam `-applaunch` hands off to a new process) it looks for
+    `exe_name` with a short backoff until it appears, then blocks on the
+    process handle/pidfd, so no CPU is used while the game runs.
+    """
+
+    def __init__(self, exe_name=GAME_EXE, appear_timeout=180.0):
+        self.exe_name = exe_name
+        self.appear_timeout = appear_timeout
+        self.pid = None
+        self._waiter = _ExitWaiter()
+        self._thread = None
+
+    def _resolve_pid(self, pid=None):
+        if pid is not None and _pid_alive(pid):
+            return pid
+        deadline = time.monotonic() + self.appear_timeout
+        delay = 0.1
+        while True:
+            pids = find_pids(self.exe_name)
+            if pids:
+                return pids[0]
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._waiter.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2.0)
+
+    def wait(self, pid=None):
+        """Block until the game exits.
+
+        Returns (True, message) after exit, (False, message) if the game never
+        appeared; raises WatchStopped if stop() was called.
+        """
+        self.pid = self._resolve_pid(pid)
+        if self.pid is None:
+            return False, f"{self.exe_name} did not start within {self.appear_timeout:g}s"
+        started = time.monotonic()
+        self._waiter.wait(self.pid)
+        return True, f"{self.exe_name} (PID {self.pid}) exited after {time.monotonic() - started:.0f}s"
+
+    def start(self, on_exit, pid=None):
+        """Watch in a background thread and call on_exit(found, message) when done."""
+        def run():
+            try:
+                found, message = self.wait(pid)
+            except WatchStopped:
+                return
+            finally:
+                self._waiter.close()
+            try:
+                on_exit(found, message)
+            except Exception as e:
+                print(f"Game exit handler error: {e}")
+
+        self._thread = threading.Thread(target=run, name="game-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop watching without calling on_exit."""
+        self._waiter.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            self._waiter.close()
@@ -0,0 +1,252 @@
+"""Single-instance control endpoint.
+
+The first instance (normally the GUI) binds a per-user named pipe (Windows)
+or Unix socket; binding doubles as the single-instance lock. Later launches,
+cli.py and scripts/stream decks connect and send the CLI argv, e.g.
+["apply", "en-US"], and get the same JSON result the CLI would print, without
+paying for a new process, a UAC prompt or a Flet runtime. A connection may
+be kept open and reused for any number of requests.
+
+Requests and replies are JSON (never pickle) and connections authenticate
+with a random key the server writes to a per-user directory. Anything the
+handler runs still has to validate the argv itself: the resident instance
+may be elevated while the client is not (see cli.serve_request).
+"""
+import getpass
+import json
+import os
+import stat
+import sys
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+# Largest request or reply accepted on the wire, and the argv limits within a request
+MAX_MESSAGE_BYTES = 64 * 1024
+MAX_ARGS = 32
+MAX_ARG_LENGTH = 1024
+
+
+def _user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "user"
+
+
+def state_dir():
+    """Per-user directory for the key file (and the Unix socket), created private to this user.
+
+    %LOCALAPPDATA% on Windows (the profile's ACL keeps other users out);
+    elsewhere $XDG_RUNTIME_DIR or ~/.cache, in a 0700 folder that must be
+    owned by this user.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        path = os.path.join(base, "CrossfireLegionFix")
+    else:
+        base = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "crossfire-legion-fix")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if sys.platform != "win32":
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.geteuid() or info.st_mode & 0o077:
+            raise PermissionError(f"{path} must be a directory private to this user")
+    return path
+
+
+def default_address():
+    if sys.platform == "win32":
+        return rf"\\.\pipe\CrossfireLegionFix-{_user()}"
+    return os.path.join(state_dir(), "control.sock")
+
+
+def default_key_file():
+    return os.path.join(state_dir(), "control.key")
+
+
+def _family(address):
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+def _read_key(key_file):
+    try:
+        with open(key_file, "rb") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def _send(conn, message):
+    conn.send_bytes(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+
+def _receive(conn):
+    """Read one JSON message; raises ValueError for anything that is not one."""
+    return json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES).decode("utf-8"))
+
+
+def valid_argv(argv):
+    """True for a non-empty list of at most MAX_ARGS strings of at most MAX_ARG_LENGTH characters."""
+    return (
+        isinstance(argv, list) and 0 < len(argv) <= MAX_ARGS
+        and all(isinstance(arg, str) and len(arg) <= MAX_ARG_LENGTH and "\0" not in arg for arg in argv)
+    )
+
+
+class AlreadyRunning(Exception):
+    """Raised by ControlServer.start() when another instance owns the endpoint."""
+
+
+class ControlServer:
+    """Serves requests {"argv": [...]} with handler(argv) -> result dict.
+
+    Only argv that passes valid_argv() reaches the handler. Each client
+    connection gets its own thread, so a long request (e.g. `run`) never
+    blocks other clients.
+    """
+
+    def __init__(self, handler, address=None, key_file=None):
+        self.handler = handler
+        self.address = address or default_address()
+        self.key_file = key_file or default_key_file()
+        self.requests = 0
+        self._listener = None
+        self._authkey = None
+        self._closed = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Bind the endpoint and start accepting; raises AlreadyRunning if another instance owns it."""
+        if ping(self.address, self.key_file):
+            raise AlreadyRunning(self.address)
+        family = _family(self.address)
+        if family == "AF_UNIX" and os.path.exists(self.address):
+            # Nobody answered above, so the socket file is left over from a crash
+            os.unlink(self.address)
+        self._authkey = os.urandom(32)
+        try:
+            self._listener = Listener(self.address, family=family, authkey=self._authkey)
+        except OSError as e:
+            raise AlreadyRunning(f"{self.address}: {e}")
+        # Only the instance that won the bind publishes its key
+        self._write_key()
+        self._thread = threading.Thread(target=self._accept_loop, name="control-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def _write_key(self):
+        # A fresh file every time: whatever is at the path now (an old key, a planted file or
+        # symlink) is removed, and O_EXCL/O_NOFOLLOW refuse anything that reappears in between
+        try:
+            os.unlink(self.key_file)
+        except FileNotFoundError:
+            pass
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+        fd = os.open(self.key_file, flags, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._authkey)
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed.is_set():
+                    return
+                continue  # failed handshake (e.g. stale key); keep serving
+            if self._closed.is_set():
+                conn.close()
+                return
+            threading.Thread(target=self._serve, args=(conn,), name="control-client", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = _receive(conn)
+                except (EOFError, OSError, ValueError):
+                    # Closed, oversized or not JSON: drop the connection
+                    return
+                argv = request.get("argv") if isinstance(request, dict) else None
+                if not valid_argv(argv):
+                    response = {"success": False, "message": "Bad request: expected {'argv': [strings]}"}
+                elif argv == ["ping"]:
+                    response = {"command": "ping", "success": True, "pid": os.getpid()}
+                else:
+                    self.requests += 1
+                    try:
+                        response = self.handler(argv)
+                    except Exception as e:
+                        response = {"command": argv[0], "success": False, "message": f"Unexpected error: {e}"}
+                try:
+                    _send(conn, response)
+                except (OSError, TypeError, ValueError):
+                    return
+
+    def close(self):
+        if self._closed.is_set() or self._listener is None:
+            return
+        self._closed.set()
+        try:
+            # accept() has no timeout; a throwaway connection wakes it
+            Client(self.address, family=_family(self.address), authkey=self._authkey).close()
+        except Exception:
+            pass
+        self._listener.close()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        try:
+            os.remove(self.key_file)
+        except OSError:
+            pass
+
+
+class ControlClient:
+    """Persistent connection to the resident instance (reuse it for repeated commands)."""
+
+    def __init__(self, address=None, key_file=None):
+        self.address = address or default_address()
+        key = _read_key(key_file or default_key_file())
+        if key is None:
+            raise ConnectionRefusedError("No resident instance (key file missing)")
+        self._conn = Client(self.address, family=_family(self.address), authkey=key)
+
+    def request(self, argv, timeout=None):
+        """Send one CLI argv and return the result dict (raises TimeoutError after `timeout` s)."""
+        _send(self._conn, {"argv": list(argv)})
+        if timeout is not None and not self._conn.poll(timeout):
+            raise TimeoutError(f"No reply within {timeout:g}s")
+        return _receive(self._conn)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def forward(argv, address=None, key_file=None, timeout=None):
+    """Run `argv` in the resident instance; returns its result, or None if none is running.
+
+    Errors after the request was sent (the instance died, or `timeout`
+    passed) are raised, since the command may already have run.
+    """
+    try:
+        client = ControlClient(address, key_file)
+    except (OSError, EOFError, AuthenticationError):
+        # No endpoint, a stale socket, or a key left behind by an instance that is gone
+        return None
+    with client:
+        return client.request(argv, timeout)
+
+
+def ping(address=None, key_file=None):
+    """Return True if a resident instance answers on the endpoint."""
+    try:
+        return forward(["ping"], address, key_file, timeout=2.0) is not None
+    except Exception:
+        return False
@@ -0,0 +1,110 @@
+import os
+import re
+import sys
+import threading
+
+# Bundled table: one tab-separated row of Control Panel\International values per locale
+PROFILE_TABLE = os.path.join(
+    getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__))), "locale_profiles.tsv"
+)
+
+# Precomputed from locale_profiles.tsv (rows whose sDecimal is ","), so deciding
+# whether a machine is affected by the speed bug never has to open the table.
+# tests/test_locale_profiles.py fails when this drifts from the table.
+COMMA_DECIMAL_LOCALES = frozenset({
+    "cs-cz", "da-dk", "de-at", "de-de", "el-gr", "en-za", "es-ar", "es-es",
+    "fi-fi", "fr-be", "fr-ca", "fr-fr", "hu-hu", "id-id", "it-it", "nb-no",
+    "nl-be", "nl-nl", "pl-pl", "pt-br", "pt-pt", "ro-ro", "ru-ru", "sk-sk",
+    "sv-se", "tr-tr", "uk-ua", "vi-vn",
+})
+
+
+# language[-Script][-REGION], e.g. "en-US", "sr-Latn-RS", "es-419": all a locale name may look like
+LOCALE_NAME = re.compile(r"[A-Za-z]{2,3}(-[A-Za-z]{4})?(-([A-Za-z]{2}|[0-9]{3}))?")
+
+
+def is_locale_name(value):
+    """Return True if `value` is a plain BCP-47 locale name (safe to pass to PowerShell)."""
+    return isinstance(value, str) and LOCALE_NAME.fullmatch(value) is not None
+
+
+def is_comma_decimal(locale_name):
+    """Return True if the locale's default decimal separator is a comma (affected by the bug)."""
+    return bool(locale_name) and locale_name.lower() in COMMA_DECIMAL_LOCALES
+
+
+class LocaleProfileDB:
+    """Lazy reader for the bundled locale profile table.
+
+    Nothing is read until the first lookup; that lookup builds an index of
+    row offsets keyed by locale name, and each row is parsed only when asked
+    for and then kept in memory.
+    """
+
+    def __init__(self, path=PROFILE_TABLE):
+        self.path = path
+        self._fields = None
+        self._offsets = None
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self):
+        if self._offsets is not None:
+            return
+        offsets = {}
+        with open(self.path, "rb") as f:
+            self._fields = f.readline().decode("utf-8").rstrip("\r\n").split("\t")
+            offset = f.tell()
+            for line in f:
+                name = line.split(b"\t", 1)[0].decode("ascii").lower()
+                if name:
+                    offsets[name] = offset
+                offset += len(line)
+        self._offsets = offsets
+
+    def get(self, locale_name):
+        """Return {registry value name: data} for a locale, or None if it is not in the table."""
+        if not locale_name:
+            return None
+        key = locale_name.lower()
+        profile = self._profiles.get(key)
+        if profile is not None:
+            return dict(profile)
+        with self._lock:
+            try:
+                self._load_index()
+            except Exception as e:
+                print(f"Error loading locale profiles: {e}")
+                return None
+            offset = self._offsets.get(key)
+            if offset is None:
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                row = f.readline().decode("utf-8").rstrip("\r\n").split("\t")
+            profile = dict(zip(self._fields, row))
+            self._profiles[key] = profile
+        return dict(profile)
+
+    def names(self):
+        """Return all locale names in the table (lower-case)."""
+        with self._lock:
+            self._load_index()
+            return sorted(self._offsets)
+
+    def minimal_override(self, locale_name):
+        """Return the fewest values that give `locale_name` a dot decimal separator.
+
+        Empty for locales that are not affected. Thousand separators that
+        would collide with the new "." are switched to ",".
+        """
+        if not is_comma_decimal(locale_name):
+            return {}
+        override = {"sDecimal": ".", "sMonDecimalSep": "."}
+        profile = self.get(locale_name) or {}
+        if profile.get("sThousand", ".") == ".":
+            override["sThousand"] = ","
+        if profile.get("sMonThousandSep", ".") == ".":
+            override["sMonThousandSep"] = ","
+        return override
+
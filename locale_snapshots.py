@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class SnapshotStore:
+    """Bounded history of Control Panel\\International snapshots on disk.
+
+    Each snapshot is {"id", "taken", "locale", "values", "names", "restored"};
+    `names` lists every value the key had, `values` only the strings. The
+    newest snapshot is the one revert uses; an apply captures a new one only
+    once it has been restored.
+    The file is written as compact JSON and only the last `max_snapshots`
+    entries are kept.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, max_snapshots=5):
+        self.path = path
+        self.max_snapshots = max_snapshots
+        self._snapshots = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._snapshots is not None:
+            return self._snapshots
+        self._snapshots = []
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self._snapshots = data.get("snapshots", [])
+        except Exception as e:
+            print(f"Error loading snapshots: {e}")
+        return self._snapshots
+
+    def _save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.VERSION, "snapshots": self._snapshots}, f,
+                          separators=(",", ":"), ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving snapshots: {e}")
+
+    def history(self):
+        """Return all stored snapshots, oldest first."""
+        with self._lock:
+            return [dict(s) for s in self._load()]
+
+    def pending(self):
+        """Return the newest snapshot that has not been restored, or None."""
+        with self._lock:
+            snapshots = self._load()
+            if snapshots and not snapshots[-1].get("restored"):
+                return dict(snapshots[-1])
+            return None
+
+    def latest(self):
+        """Return the newest snapshot (restored or not), or None."""
+        with self._lock:
+            snapshots = self._load()
+            return dict(snapshots[-1]) if snapshots else None
+
+    def capture(self, values, locale_name):
+        """Store a snapshot of the key's string values (and all value names) and prune old ones."""
+        with self._lock:
+            snapshots = self._load()
+            snapshot = {
+                "id": (snapshots[-1]["id"] + 1) if snapshots else 1,
+                "taken": datetime.now().isoformat(),
+                "locale": locale_name,
+                # International values are all REG_SZ; anything else is not restorable as such
+                "values": {name: data for name, data in values.items() if isinstance(data, str)},
+                # ...but their names are kept, so a restore only deletes values added since
+                "names": sorted(values),
+                "restored": False,
+            }
+            snapshots.append(snapshot)
+            del snapshots[:-self.max_snapshots]
+            self._save()
+            return dict(snapshot)
+
+    def mark_restored(self, snapshot_id):
+        """Flag a snapshot as restored so the next apply captures a fresh one."""
+        with self._lock:
+            for snapshot in self._load():
+                if snapshot["id"] == snapshot_id:
+                    snapshot["restored"] = True
+            self._save()
+
+
+def added_since(snapshot, current):
+    """Names in `current` that did not exist when `snapshot` was taken (what a restore deletes)."""
+    names = set(snapshot["names"])
+    return [name for name in current if name not in names]
@@ -0,0 +1,91 @@
+import threading
+
+
+class LocaleStateCache:
+    """In-memory copy of the current locale info ({"locale", "country"}).
+
+    Filled on first read and reloaded only after invalidate(), which is called
+    by the registry change watcher or after a successful apply, so get() is a
+    plain dictionary copy on the hot path. Every invalidate() bumps a
+    generation counter; a load that overlapped one is returned to its caller
+    but not cached, so a change arriving mid-load is never lost.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._state = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Guards _generation/_state only; never held while loading, so invalidate() never waits on the OS
+        self._state_lock = threading.Lock()
+        self._watcher = None
+        self._watch_thread = None
+        self._listeners = []
+
+    def get(self):
+        """Return the cached locale info, loading it from the OS if stale."""
+        state = self._state
+        if state is None:
+            with self._lock:
+                state = self._state
+                if state is None:
+                    generation = self._generation
+                    state = self._loader()
+                    with self._state_lock:
+                        # Invalidated while loading: the result may predate the change
+                        if generation == self._generation:
+                            self._state = state
+        return dict(state)
+
+    def invalidate(self):
+        """Drop the cached state so the next get() reads from the OS."""
+        with self._state_lock:
+            self._generation += 1
+            self._state = None
+
+    def add_listener(self, callback):
+        """Call `callback()` on the watcher thread after each external change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- CHANGE NOTIFICATIONS ---
+    def start_watching(self, backend, root, path):
+        """Invalidate the cache whenever the registry key changes.
+
+        Returns False if the backend cannot deliver change notifications.
+        """
+        if self._watch_thread is not None:
+            return True
+        try:
+            self._watcher = backend.watch_key(root, path)
+        except Exception as e:
+            print(f"Locale watcher unavailable: {e}")
+            return False
+        self._watch_thread = threading.Thread(target=self._watch_loop, name="locale-watcher", daemon=True)
+        self._watch_thread.start()
+        return True
+
+    def _watch_loop(self):
+        watcher = self._watcher
+        # Blocks in the OS until the key changes; interrupt() ends the loop
+        while watcher.wait(None):
+            self.invalidate()
+            for callback in list(self._listeners):
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Locale listener error: {e}")
+
+    def stop_watching(self, timeout=2.0):
+        """Stop the watcher thread and release the notification handle."""
+        watcher, thread = self._watcher, self._watch_thread
+        self._watcher = self._watch_thread = None
+        if watcher is None:
+            return
+        watcher.interrupt()
+        if thread is not None:
+            thread.join(timeout)
+        watcher.close()
@@ -0,0 +1,334 @@
+"""Archive Player.log sessions and find which locale settings caused the speed bug.
+
+Each game session's Player.log is copied (gzipped) into an archive folder and
+indexed by start/end time, locale in effect and game exe version. Archives (ours,
+or Player.log copies collected from other seats) are scanned in parallel:
+
+    python log_analyzer.py                       # summarize the local archive
+    python log_analyzer.py D:\\logs\\seat-07 --json
+    python log_analyzer.py --archive             # archive the current Player.log first
+"""
+import argparse
+import bisect
+import gzip
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from player_log import parse_line, timestep_ok
+
+INDEX_FILE = "index.json"
+
+# Per-frame timing lines (the timestep itself is recognised by player_log.parse_line)
+FRAME_PATTERN = re.compile(
+    r"(frame\s*time|delta\s*time|fps)\D{0,20}?([-+]?\d+(?:[.,]\d+)?)\s*(ms)?", re.IGNORECASE
+)
+# A frame faster than this (in ms) means the simulation is running away
+RUNAWAY_FRAME_MS = 2.0
+
+
+def exe_version(game_path):
+    """Return the game exe's file version, or a size/mtime fingerprint where that is unavailable."""
+    if not game_path or not os.path.exists(game_path):
+        return None
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            version = ctypes.windll.version
+            size = version.GetFileVersionInfoSizeW(game_path, None)
+            if size:
+                buffer = ctypes.create_string_buffer(size)
+                version.GetFileVersionInfoW(game_path, 0, size, buffer)
+                info = ctypes.c_void_p()
+                length = ctypes.c_uint()
+                if version.VerQueryValueW(buffer, "\\", ctypes.byref(info), ctypes.byref(length)):
+                    # VS_FIXEDFILEINFO: dwFileVersionMS/LS follow the signature, struct version
+                    fixed = ctypes.cast(info, ctypes.POINTER(ctypes.c_uint32 * 4)).contents
+                    ms, ls = fixed[2], fixed[3]
+                    return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+        except Exception:
+            pass
+    stat = os.stat(game_path)
+    return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+
+def created_time(path):
+    """Return when `path` was created as a datetime, or None where the OS does not record it.
+
+    The game writes a fresh Player.log at every start, so for a log this
+    is when the session started (its mtime is when the session ended).
+    """
+    stat = os.stat(path)
+    created = getattr(stat, "st_birthtime", None)
+    if created is None and sys.platform == "win32":
+        created = stat.st_ctime  # creation time on Windows
+    return datetime.fromtimestamp(created) if created else None
+
+
+# --- ARCHIVE ---
+class LogArchive:
+    """Folder of gzipped Player.log sessions plus a JSON index describing them."""
+
+    def __init__(self, root):
+        self.root = root
+        self.index_file = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get("sessions", [])
+        except Exception as e:
+            print(f"Error loading log archive index: {e}")
+        return []
+
+    def _save(self, sessions):
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump({"sessions": sessions}, f, separators=(",", ":"))
+
+    def sessions(self, locale=None, version=None, since=None):
+        """Return indexed sessions, optionally filtered by locale, exe version and start time (datetime).
+
+        Sessions whose start is unknown are filtered by their end time.
+        """
+        with self._lock:
+            sessions = self._load()
+        selected = []
+        for session in sessions:
+            if locale and (session.get("locale") or "").lower() != locale.lower():
+                continue
+            if version and session.get("exe_version") != version:
+                continue
+            if since and datetime.fromisoformat(session.get("started") or session["ended"]) < since:
+                continue
+            selected.append(dict(session, path=os.path.join(self.root, session["file"])))
+        return selected
+
+    def archive(self, log_path, locale=None, version=None, seat=None):
+        """Copy a Player.log into the archive and index it; returns the session entry or None."""
+        if not os.path.exists(log_path) or os.path.getsize(log_path) == 0:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+        started = created_time(log_path)
+        ended = datetime.fromtimestamp(os.path.getmtime(log_path))
+        with self._lock:
+            sessions = self._load()
+            name = f"{started or ended:%Y%m%d-%H%M%S}_{locale or 'unknown'}_{len(sessions) + 1}.log.gz"
+            with open(log_path, "rb") as src, gzip.open(os.path.join(self.root, name), "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            session = {
+                "file": name,
+                # None where the file system does not keep creation times (e.g. most Linux/Proton setups)
+                "started": started.isoformat() if started else None,
+                "ended": ended.isoformat(),
+                "archived": datetime.now().isoformat(),
+                "locale": locale,
+                "exe_version": version,
+                "seat": seat,
+                "size": os.path.getsize(log_path),
+            }
+            sessions.append(session)
+            self._save(sessions)
+        return dict(session)
+
+
+# --- SCANNING ---
+def _open_log(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb", buffering=1024 * 1024)
+
+
+def _number(text):
+    return float(text.replace(",", "."))
+
+
+def analyze_file(path):
+    """Scan one log (plain or gzipped) and return its per-session statistics.
+
+    Runs in a worker process, so it only takes and returns plain data. A log
+    that cannot be read (missing, truncated or corrupt .gz) gives
+    {"path", "error"} instead, so one bad file does not abort the scan.
+    """
+    try:
+        return _analyze(path)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def _analyze(path):
+    timesteps = array("d")
+    frames_ms = array("d")
+    culture = engine = None
+    bad_timestep = None
+    lines = 0
+    with _open_log(path) as f:
+        for raw in f:
+            lines += 1
+            line = parse_line(raw.rstrip(b"\r\n").decode("utf-8", "replace"))
+            if line.kind == "timestep":
+                if not timestep_ok(line.value) and bad_timestep is None:
+                    bad_timestep = line.value
+                try:
+                    timesteps.append(_number(line.value))
+                except ValueError:
+                    pass
+            elif line.kind == "culture":
+                culture = culture or line.value
+            elif line.kind == "engine":
+                engine = line.value
+            else:
+                match = FRAME_PATTERN.search(line.text)
+                if match:
+                    value = _number(match.group(2))
+                    if match.group(1).lower() == "fps":
+                        value = 1000.0 / value if value > 0 else 0.0
+                    elif not match.group(3):
+                        value *= 1000.0  # seconds
+                    frames_ms.append(value)
+
+    # One sort gives both the median and (by bisection) how many frames ran away
+    frames_ms = sorted(frames_ms)
+    runaway_frames = bisect.bisect_left(frames_ms, RUNAWAY_FRAME_MS)
+    return {
+        "path": path,
+        "lines": lines,
+        "culture": culture,
+        "engine": engine,
+        "timestep": statistics.median(timesteps) if timesteps else None,
+        "bad_timestep": bad_timestep,
+        "frames": len(frames_ms),
+        "frame_p50_ms": statistics.median(frames_ms) if frames_ms else None,
+        "runaway_frames": runaway_frames,
+        "runaway": bad_timestep is not None or (bool(frames_ms) and runaway_frames * 2 > len(frames_ms)),
+    }
+
+
+def find_logs(paths):
+    """Expand files and folders into the *.log / *.log.gz files they contain."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for folder, _, files in os.walk(path):
+            found.extend(
+                os.path.join(folder, name) for name in sorted(files)
+                if name.endswith((".log", ".log.gz"))
+            )
+    return found
+
+
+def scan(paths, workers=None):
+    """Analyze many logs in a process pool; results keep the input order."""
+    if not paths:
+        return []
+    if len(paths) == 1:
+        return [analyze_file(paths[0])]
+    # Large chunks keep per-task IPC small when there are thousands of small logs
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(analyze_file, paths, chunksize=chunksize))
+
+
+def summarize(results, sessions=None, locale=None):
+    """Aggregate per-session results into one row per locale, exe version and engine.
+
+    `sessions` (archive index entries keyed by path) supplies the locale that
+    was in effect and the exe version; otherwise the culture logged by the
+    game is used and the exe version is unknown. With `locale`, only sessions
+    under that locale are kept. Logs that failed to scan are left out (see failed()).
+    """
+    sessions = sessions or {}
+    groups = {}
+    for result in results:
+        if "error" in result:
+            continue
+        meta = sessions.get(result["path"], {})
+        session_locale = meta.get("locale") or result["culture"] or "unknown"
+        if locale and session_locale.lower() != locale.lower():
+            continue
+        key = (session_locale, meta.get("exe_version") or "-", result["engine"] or "-")
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for (session_locale, version, engine), group in sorted(groups.items()):
+        timesteps = [r["timestep"] for r in group if r["timestep"] is not None]
+        frames = [r["frame_p50_ms"] for r in group if r["frame_p50_ms"] is not None]
+        runaway = sum(1 for r in group if r["runaway"])
+        rows.append({
+            "locale": session_locale,
+            "exe_version": version,
+            "engine": engine,
+            "sessions": len(group),
+            "runaway": runaway,
+            "runaway_pct": 100.0 * runaway / len(group),
+            "timestep_p50": statistics.median(timesteps) if timesteps else None,
+            "frame_p50_ms": statistics.median(frames) if frames else None,
+        })
+    rows.sort(key=lambda row: (-row["runaway_pct"], row["locale"]))
+    return rows
+
+
+def failed(results):
+    """Return the results of logs that could not be scanned."""
+    return [result for result in results if "error" in result]
+
+
+def print_table(rows):
+    print(
+        f"{'locale':<10}{'exe version':<18}{'engine':<14}{'sessions':>9}{'runaway':>9}{'%':>7}"
+        f"{'timestep':>10}{'frame p50':>11}"
+    )
+    for row in rows:
+        timestep = f"{row['timestep_p50']:g}" if row["timestep_p50"] is not None else "-"
+        frame = f"{row['frame_p50_ms']:.2f}ms" if row["frame_p50_ms"] is not None else "-"
+        print(
+            f"{row['locale']:<10}{str(row['exe_version'])[:17]:<18}{str(row['engine'])[:13]:<14}"
+            f"{row['sessions']:>9}{row['runaway']:>9}"
+            f"{row['runaway_pct']:>6.0f}%{timestep:>10}{frame:>11}"
+        )
+
+
+def main(argv=None):
+    from regional_utils import RegionalFormatChanger
+
+    parser = argparse.ArgumentParser(description="Summarize archived Player.log sessions by locale")
+    parser.add_argument("paths", nargs="*", help="log files or folders (default: the local archive)")
+    parser.add_argument("--archive", action="store_true", help="archive the current Player.log first")
+    parser.add_argument("--locale", help="only sessions recorded under this locale")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="print per-locale rows as JSON")
+    args = parser.parse_args(argv)
+
+    rfc = RegionalFormatChanger()
+    if args.archive:
+        rfc.archive_player_log()
+    if args.paths:
+        logs, sessions = find_logs(args.paths), {}
+    else:
+        entries = LogArchive(rfc.log_archive_dir).sessions(locale=args.locale)
+        logs = [entry["path"] for entry in entries]
+        sessions = {entry["path"]: entry for entry in entries}
+
+    results = scan(logs, args.workers)
+    for result in failed(results):
+        print(f"Skipped {result['path']}: {result['error']}", file=sys.stderr)
+    # Explicit paths have no index entries: the locale filter goes by the culture each log recorded
+    rows = summarize(results, sessions, locale=args.locale)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
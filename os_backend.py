@@ -0,0 +1,634 @@
+"""OS access layer used by RegionalFormatChanger.
+
+Everything that touches the registry, the WM_SETTINGCHANGE broadcast or a
+shell goes through an OSBackend, so the apply/revert path can run (and be
+timed) against the in-memory stand-in on any platform.
+"""
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from shell_host import POWERSHELL_HOST_ARGV, ShellHostPool
+
+try:
+    import winreg
+except ImportError:  # Not on Windows
+    winreg = None
+
+HKCU = "HKEY_CURRENT_USER"
+HKLM = "HKEY_LOCAL_MACHINE"
+HKU = "HKEY_USERS"
+
+INTERNATIONAL_KEY = r"Control Panel\International"
+
+# How broadcast_setting_change delivers WM_SETTINGCHANGE
+BROADCAST_MODES = ("send", "notify", "per-window")
+# A responsive window answers WM_SETTINGCHANGE in well under this; per-window mode
+# waits this long on each window, so a few hung ones cost a second, not 5s each
+WINDOW_TIMEOUT_MS = 300
+
+# Outcome of one broadcast: `windows` is the number of windows messaged (None for
+# HWND_BROADCAST modes), `timed_out` lists "title (pid N)" of windows that did not answer
+BroadcastResult = namedtuple("BroadcastResult", "mode elapsed_ms windows timed_out")
+
+
+class OSBackend:
+    """Interface for registry, broadcast and shell access.
+
+    Registry methods raise FileNotFoundError for a missing key or value and
+    PermissionError when access is denied, the same way winreg does.
+    """
+
+    def read_value(self, root, path, name):
+        """Return the data of a single registry value."""
+        raise NotImplementedError
+
+    def read_values(self, root, path):
+        """Return all values of a registry key as {name: data}."""
+        raise NotImplementedError
+
+    def key_last_write(self, root, path):
+        """Return an opaque stamp that changes whenever the key is written."""
+        raise NotImplementedError
+
+    def write_values(self, root, path, values, delete=()):
+        """Write {name: data} as REG_SZ values under an existing key.
+
+        Value names in `delete` are removed in the same pass (missing ones are ignored).
+        """
+        raise NotImplementedError
+
+    def flush_key(self, root, path):
+        """Flush a registry key to disk."""
+        raise NotImplementedError
+
+    def list_subkeys(self, root, path):
+        """Return the names of a key's direct subkeys ("" lists the root itself)."""
+        raise NotImplementedError
+
+    def load_hive(self, root, name, file_path):
+        """Mount a hive file (e.g. a profile's NTUSER.DAT) as root\\name; needs admin rights."""
+        raise NotImplementedError
+
+    def unload_hive(self, root, name):
+        """Unmount a hive mounted with load_hive(), writing it back to its file."""
+        raise NotImplementedError
+
+    def watch_key(self, root, path):
+        """Return a KeyWatcher that fires whenever a value under the key changes."""
+        raise NotImplementedError
+
+    def broadcast_setting_change(self, area="intl", mode="send", timeout_ms=5000, window_timeout_ms=WINDOW_TIMEOUT_MS):
+        """Tell top-level windows that a system setting changed; returns a BroadcastResult.
+
+        "send" waits up to `timeout_ms` for all windows at once (HWND_BROADCAST),
+        "notify" posts the message and returns immediately, and "per-window"
+        messages each top-level window in turn, waiting up to
+        `window_timeout_ms` on each, so hung windows can be named.
+        """
+        raise NotImplementedError
+
+    def run_shell(self, args, timeout=None):
+        """Run an argv list to completion (no shell in between) and return a CompletedProcess."""
+        raise NotImplementedError
+
+    def spawn(self, args, cwd=None, hidden=False, detached=False, shell=False):
+        """Start a process without waiting for it and return the Popen-like handle."""
+        raise NotImplementedError
+
+    def powershell_host_pool(self, size=2):
+        """Return a ShellHostPool of persistent PowerShell hosts, or None to use run_shell per command."""
+        return None
+
+    def open_uri(self, uri):
+        """Open a URI (e.g. ms-settings:) with the shell's default handler."""
+        raise NotImplementedError
+
+
+class KeyWatcher:
+    """Change notification handle returned by OSBackend.watch_key.
+
+    The watcher is armed when created; wait() returns True once a change has
+    been seen since the previous wait (or since arming) and re-arms itself.
+    """
+
+    def wait(self, timeout=None):
+        """Block until the key changes or `timeout` seconds pass; return True on change."""
+        raise NotImplementedError
+
+    def interrupt(self):
+        """Wake a thread blocked in wait(), which then returns False."""
+
+    def close(self):
+        """Release the notification handle."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- WINDOWS BACKEND ---
+class _RegistryKeyWatcher(KeyWatcher):
+    """KeyWatcher built on RegNotifyChangeKeyValue and a Win32 event."""
+
+    REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+    REG_NOTIFY_THREAD_AGNOSTIC = 0x10000000
+    WAIT_OBJECT_0 = 0x00000000
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self, hkey, path):
+        import ctypes
+
+        self._kernel32 = ctypes.windll.kernel32
+        self._advapi32 = ctypes.windll.advapi32
+        self._kernel32.CreateEventW.restype = ctypes.c_void_p
+        self._kernel32.WaitForMultipleObjects.argtypes = [ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong]
+        self._kernel32.SetEvent.argtypes = [ctypes.c_void_p]
+        self._kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+        self._advapi32.RegNotifyChangeKeyValue.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_int]
+
+        self._key = winreg.OpenKey(hkey, path, 0, winreg.KEY_NOTIFY | winreg.KEY_READ)
+        self._event = self._kernel32.CreateEventW(None, False, False, None)
+        # Manual-reset event set by interrupt() so waiters can be released
+        self._interrupt_event = self._kernel32.CreateEventW(None, True, False, None)
+        if not self._event or not self._interrupt_event:
+            self.close()
+            raise OSError("CreateEventW failed")
+        self._handles = (ctypes.c_void_p * 2)(self._event, self._interrupt_event)
+        self._arm()
+
+    def _arm(self):
+        # Thread-agnostic so the registration survives the thread that armed it
+        status = self._advapi32.RegNotifyChangeKeyValue(
+            self._key.handle, False,
+            self.REG_NOTIFY_CHANGE_LAST_SET | self.REG_NOTIFY_THREAD_AGNOSTIC,
+            self._event, True
+        )
+        if status != 0:
+            raise OSError(f"RegNotifyChangeKeyValue failed ({status})")
+
+    def wait(self, timeout=None):
+        milliseconds = self.INFINITE if timeout is None else max(0, int(timeout * 1000))
+        if self._kernel32.WaitForMultipleObjects(2, self._handles, False, milliseconds) != self.WAIT_OBJECT_0:
+            return False
+        self._arm()
+        return True
+
+    def interrupt(self):
+        if self._interrupt_event:
+            self._kernel32.SetEvent(self._interrupt_event)
+
+    def close(self):
+        for name in ("_event", "_interrupt_event"):
+            handle = getattr(self, name, None)
+            if handle:
+                self._kernel32.CloseHandle(handle)
+                setattr(self, name, None)
+        if self._key:
+            self._key.Close()
+            self._key = None
+
+
+def _enable_privileges(*names):
+    """Enable privileges held by this process's token (e.g. SeRestorePrivilege for hive loading).
+
+    Raises PermissionError when the token does not hold them, i.e. when not elevated.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class LUID_AND_ATTRIBUTES(ctypes.Structure):
+        _fields_ = [("Luid", ctypes.c_int64), ("Attributes", wintypes.DWORD)]
+
+    class TOKEN_PRIVILEGES(ctypes.Structure):
+        _fields_ = [("PrivilegeCount", wintypes.DWORD), ("Privileges", LUID_AND_ATTRIBUTES * 1)]
+
+    TOKEN_ADJUST_PRIVILEGES = 0x0020
+    TOKEN_QUERY = 0x0008
+    SE_PRIVILEGE_ENABLED = 0x00000002
+    ERROR_NOT_ALL_ASSIGNED = 1300
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    advapi32 = ctypes.WinDLL("advapi32", use_last_error=True)
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    advapi32.OpenProcessToken.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE)]
+    advapi32.LookupPrivilegeValueW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.POINTER(ctypes.c_int64)]
+    advapi32.AdjustTokenPrivileges.argtypes = [
+        wintypes.HANDLE, wintypes.BOOL, ctypes.POINTER(TOKEN_PRIVILEGES), wintypes.DWORD, ctypes.c_void_p, ctypes.c_void_p
+    ]
+
+    token = wintypes.HANDLE()
+    if not advapi32.OpenProcessToken(kernel32.GetCurrentProcess(), TOKEN_ADJUST_PRIVILEGES | TOKEN_QUERY, ctypes.byref(token)):
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        for name in names:
+            luid = ctypes.c_int64()
+            if not advapi32.LookupPrivilegeValueW(None, name, ctypes.byref(luid)):
+                raise ctypes.WinError(ctypes.get_last_error())
+            privileges = TOKEN_PRIVILEGES(1, (LUID_AND_ATTRIBUTES * 1)(LUID_AND_ATTRIBUTES(luid.value, SE_PRIVILEGE_ENABLED)))
+            if not advapi32.AdjustTokenPrivileges(token, False, ctypes.byref(privileges), 0, None, None):
+                raise ctypes.WinError(ctypes.get_last_error())
+            # Succeeds even when the privilege is not held; that case is only reported here
+            if ctypes.get_last_error() == ERROR_NOT_ALL_ASSIGNED:
+                raise PermissionError(f"{name} is not held (run as Administrator)")
+    finally:
+        kernel32.CloseHandle(token)
+
+
+class WindowsBackend(OSBackend):
+    """Backend that talks to the live Windows registry and shell."""
+
+    def _hkey(self, root):
+        if winreg is None:
+            raise OSError("winreg is not available on this platform")
+        return getattr(winreg, root)
+
+    def read_value(self, root, path, name):
+        with winreg.OpenKey(self._hkey(root), path) as key:
+            return winreg.QueryValueEx(key, name)[0]
+
+    def read_values(self, root, path):
+        values = {}
+        with winreg.OpenKey(self._hkey(root), path) as key:
+            index = 0
+            while True:
+                try:
+                    name, data, _ = winreg.EnumValue(key, index)
+                except OSError:
+                    break
+                values[name] = data
+                index += 1
+        return values
+
+    def key_last_write(self, root, path):
+        with winreg.OpenKey(self._hkey(root), path) as key:
+            # Last write time as a FILETIME (100ns intervals since 1601)
+            return winreg.QueryInfoKey(key)[2]
+
+    def write_values(self, root, path, values, delete=()):
+        with winreg.OpenKey(self._hkey(root), path, 0, winreg.KEY_SET_VALUE) as key:
+            for value_name, value_data in values.items():
+                winreg.SetValueEx(key, value_name, 0, winreg.REG_SZ, value_data)
+            for value_name in delete:
+                try:
+                    winreg.DeleteValue(key, value_name)
+                except FileNotFoundError:
+                    pass
+
+    def flush_key(self, root, path):
+        with winreg.OpenKey(self._hkey(root), path, 0, winreg.KEY_READ) as key:
+            winreg.FlushKey(key)
+
+    def list_subkeys(self, root, path):
+        names = []
+        with winreg.OpenKey(self._hkey(root), path) as key:
+            index = 0
+            while True:
+                try:
+                    names.append(winreg.EnumKey(key, index))
+                except OSError:
+                    break
+                index += 1
+        return names
+
+    def load_hive(self, root, name, file_path):
+        _enable_privileges("SeRestorePrivilege", "SeBackupPrivilege")
+        winreg.LoadKey(self._hkey(root), name, file_path)
+
+    def unload_hive(self, root, name):
+        import ctypes
+
+        _enable_privileges("SeRestorePrivilege", "SeBackupPrivilege")
+        advapi32 = ctypes.windll.advapi32
+        advapi32.RegUnLoadKeyW.argtypes = [ctypes.c_void_p, ctypes.c_wchar_p]
+        status = advapi32.RegUnLoadKeyW(self._hkey(root), name)
+        if status != 0:
+            raise ctypes.WinError(status)
+
+    def watch_key(self, root, path):
+        return _RegistryKeyWatcher(self._hkey(root), path)
+
+    def broadcast_setting_change(self, area="intl", mode="send", timeout_ms=5000, window_timeout_ms=WINDOW_TIMEOUT_MS):
+        import ctypes
+        from ctypes import wintypes
+
+        HWND_BROADCAST = 0xFFFF
+        WM_SETTINGCHANGE = 0x001A
+        SMTO_ABORTIFHUNG = 0x0002
+
+        user32 = ctypes.windll.user32
+        SendMessageTimeoutW = user32.SendMessageTimeoutW
+        # LRESULT SendMessageTimeoutW(HWND hWnd, UINT Msg, WPARAM wParam, LPWSTR lParam, UINT fuFlags, UINT uTimeout, PDWORD_PTR lpdwResult)
+        SendMessageTimeoutW.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_wchar_p, ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_size_t)]
+        SendMessageTimeoutW.restype = ctypes.c_void_p
+
+        started = time.perf_counter()
+        result = ctypes.c_size_t(0)
+        windows = None
+        timed_out = []
+        if mode == "notify":
+            # Asynchronous sends cannot carry pointers below WM_USER, so the "intl"
+            # area string is dropped; apps treat a NULL area as "settings changed"
+            user32.SendNotifyMessageW.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_void_p]
+            user32.SendNotifyMessageW(HWND_BROADCAST, WM_SETTINGCHANGE, 0, None)
+        elif mode == "per-window":
+            handles = []
+            EnumWindowsProc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+            def collect(hwnd, _):
+                handles.append(hwnd)
+                return True
+
+            user32.EnumWindows(EnumWindowsProc(collect), 0)
+            user32.GetWindowTextW.argtypes = [wintypes.HWND, ctypes.c_wchar_p, ctypes.c_int]
+            user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+            windows = len(handles)
+            for hwnd in handles:
+                if not SendMessageTimeoutW(hwnd, WM_SETTINGCHANGE, 0, ctypes.c_wchar_p(area), SMTO_ABORTIFHUNG, window_timeout_ms, ctypes.byref(result)):
+                    title = ctypes.create_unicode_buffer(256)
+                    user32.GetWindowTextW(hwnd, title, 256)
+                    pid = wintypes.DWORD(0)
+                    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+                    timed_out.append(f"{title.value or hex(hwnd or 0)} (pid {pid.value})")
+        else:
+            if not SendMessageTimeoutW(HWND_BROADCAST, WM_SETTINGCHANGE, 0, ctypes.c_wchar_p(area), SMTO_ABORTIFHUNG, timeout_ms, ctypes.byref(result)):
+                timed_out.append("HWND_BROADCAST")
+        return BroadcastResult(mode, (time.perf_counter() - started) * 1000, windows, timed_out)
+
+    def run_shell(self, args, timeout=None):
+        # An argv list, started directly: cmd.exe would re-parse the PowerShell script's quotes and metacharacters
+        return subprocess.run(
+            list(args), capture_output=True, text=True, shell=False, timeout=timeout,
+            startupinfo=self._get_hidden_startupinfo()
+        )
+
+    def powershell_host_pool(self, size=2):
+        return ShellHostPool(POWERSHELL_HOST_ARGV, size, startupinfo=self._get_hidden_startupinfo())
+
+    def spawn(self, args, cwd=None, hidden=False, detached=False, shell=False):
+        kwargs = {}
+        if hidden:
+            kwargs["startupinfo"] = self._get_hidden_startupinfo()
+        if detached:
+            DETACHED_PROCESS = 0x00000008
+            CREATE_NO_WINDOW = 0x08000000
+            kwargs["creationflags"] = DETACHED_PROCESS | CREATE_NO_WINDOW
+        return subprocess.Popen(args, cwd=cwd, shell=shell, **kwargs)
+
+    def open_uri(self, uri):
+        # Hide console window when opening the URI
+        return subprocess.Popen(f"start {uri}", shell=True, startupinfo=self._get_hidden_startupinfo())
+
+    def _get_hidden_startupinfo(self):
+        """Helper to get a STARTUPINFO object with hidden window for subprocess."""
+        si = subprocess.STARTUPINFO()
+        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        si.wShowWindow = 0  # SW_HIDE
+        return si
+
+
+# --- IN-MEMORY BACKEND ---
+class _FakeProcess:
+    """Minimal stand-in for a Popen handle returned by InMemoryBackend.spawn."""
+
+    _next_pid = 10000
+
+    def __init__(self, args, cwd=None):
+        _FakeProcess._next_pid += 1
+        self.pid = _FakeProcess._next_pid
+        self.args = args
+        self.cwd = cwd
+        self.returncode = 0
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+class _InMemoryKeyWatcher(KeyWatcher):
+    """Fake notifier driven by InMemoryBackend writes and notify_change()."""
+
+    def __init__(self, backend, key_id):
+        self._backend = backend
+        self._key_id = key_id
+        self._seen = backend._generation(key_id)
+        self._interrupted = False
+
+    def wait(self, timeout=None):
+        backend = self._backend
+        with backend._changed:
+            backend._changed.wait_for(
+                lambda: self._interrupted or backend._generation(self._key_id) != self._seen, timeout
+            )
+            if self._interrupted:
+                return False
+            changed = backend._generation(self._key_id) != self._seen
+            self._seen = backend._generation(self._key_id)
+        return changed
+
+    def interrupt(self):
+        with self._backend._changed:
+            self._interrupted = True
+            self._backend._changed.notify_all()
+
+
+class InMemoryBackend(OSBackend):
+    """Deterministic stand-in backend holding the registry in a dict.
+
+    `latency` maps an operation name ("read", "stat", "write", "flush", "broadcast",
+    "shell", "spawn", "open_uri", "hive") to a delay in seconds that is slept before
+    the operation runs, so benchmarks can model a slow machine.
+    `shell_handler(args)` may return (returncode, stdout, stderr) for run_shell.
+    Writes wake any watcher on the key; notify_change() fires one by hand.
+    Titles in `hung_windows` model windows that never answer a broadcast:
+    each costs the per-window timeout ("send": the broadcast timeout, once)
+    and is reported as timed out;
+    `window_count` more windows answer at once.
+    `hive_files` maps a hive file path to {subkey path: values}; load_hive()
+    mounts it as keys under root\\name and unload_hive() writes them back.
+    """
+
+    OPERATIONS = ("read", "stat", "write", "flush", "broadcast", "shell", "spawn", "open_uri", "hive")
+
+    def __init__(self, keys=None, latency=None, shell_handler=None):
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._keys = {}
+        # Original spelling of each key path (lookups are case-insensitive, like the registry)
+        self._paths = {}
+        self._generations = {}
+        self.hive_files = {}
+        self.loaded_hives = {}
+        self.latency = {op: 0.0 for op in self.OPERATIONS}
+        if latency:
+            self.latency.update(latency)
+        self.shell_handler = shell_handler
+        self.calls = {op: 0 for op in self.OPERATIONS}
+        self.broadcasts = []
+        self.hung_windows = []
+        self.window_count = 20
+        self.shell_commands = []
+        self.spawned = []
+        self.opened_uris = []
+        for (root, path), values in (keys or {}).items():
+            self.set_key(root, path, values)
+
+    def set_key(self, root, path, values):
+        """Create or replace a key with the given values."""
+        with self._lock:
+            self._keys[(root, path.lower())] = dict(values)
+            self._paths[(root, path.lower())] = path
+            self._bump((root, path.lower()))
+
+    def notify_change(self, root, path):
+        """Fire watchers on a key without changing it."""
+        with self._lock:
+            self._bump((root, path.lower()))
+
+    def _generation(self, key_id):
+        return self._generations.get(key_id, 0)
+
+    def _bump(self, key_id):
+        self._generations[key_id] = self._generation(key_id) + 1
+        self._changed.notify_all()
+
+    def _delay(self, op):
+        with self._lock:
+            self.calls[op] += 1
+        delay = self.latency.get(op, 0.0)
+        if delay:
+            time.sleep(delay)
+
+    def _key(self, root, path):
+        try:
+            return self._keys[(root, path.lower())]
+        except KeyError:
+            raise FileNotFoundError(f"Registry key not found: {root}\\{path}")
+
+    def read_value(self, root, path, name):
+        self._delay("read")
+        with self._lock:
+            key = self._key(root, path)
+            if name not in key:
+                raise FileNotFoundError(f"Registry value not found: {name}")
+            return key[name]
+
+    def read_values(self, root, path):
+        self._delay("read")
+        with self._lock:
+            return dict(self._key(root, path))
+
+    def key_last_write(self, root, path):
+        self._delay("stat")
+        with self._lock:
+            self._key(root, path)
+            return self._generation((root, path.lower()))
+
+    def write_values(self, root, path, values, delete=()):
+        self._delay("write")
+        with self._lock:
+            key = self._key(root, path)
+            key.update(values)
+            for value_name in delete:
+                key.pop(value_name, None)
+            self._bump((root, path.lower()))
+
+    def flush_key(self, root, path):
+        self._delay("flush")
+        with self._lock:
+            self._key(root, path)
+
+    def list_subkeys(self, root, path):
+        self._delay("read")
+        prefix = path.lower().strip("\\")
+        names = {}
+        with self._lock:
+            for key_root, key_path in self._keys:
+                if key_root != root:
+                    continue
+                if prefix and not key_path.startswith(prefix + "\\"):
+                    continue
+                # Intermediate keys exist implicitly, as they would in the registry
+                rest = self._paths[(key_root, key_path)][len(prefix) + 1 if prefix else 0:]
+                name = rest.split("\\", 1)[0]
+                names.setdefault(name.lower(), name)
+            if prefix and not names and (root, prefix) not in self._keys:
+                raise FileNotFoundError(f"Registry key not found: {root}\\{path}")
+        return sorted(names.values())
+
+    def load_hive(self, root, name, file_path):
+        self._delay("hive")
+        with self._lock:
+            if name in self.loaded_hives:
+                raise OSError(f"A hive is already loaded as {root}\\{name}")
+            if file_path not in self.hive_files:
+                raise FileNotFoundError(f"Hive file not found: {file_path}")
+            for path, values in self.hive_files[file_path].items():
+                self.set_key(root, f"{name}\\{path}", values)
+            self.loaded_hives[name] = file_path
+
+    def unload_hive(self, root, name):
+        self._delay("hive")
+        with self._lock:
+            if name not in self.loaded_hives:
+                raise FileNotFoundError(f"No hive loaded as {root}\\{name}")
+            prefix = name.lower() + "\\"
+            saved = {}
+            for key_id in [k for k in self._keys if k[0] == root and k[1].startswith(prefix)]:
+                saved[self._paths.pop(key_id)[len(prefix):]] = self._keys.pop(key_id)
+            self.hive_files[self.loaded_hives.pop(name)] = saved
+
+    def watch_key(self, root, path):
+        with self._lock:
+            self._key(root, path)
+            return _InMemoryKeyWatcher(self, (root, path.lower()))
+
+    def broadcast_setting_change(self, area="intl", mode="send", timeout_ms=5000, window_timeout_ms=WINDOW_TIMEOUT_MS):
+        started = time.perf_counter()
+        self._delay("broadcast")
+        with self._lock:
+            self.broadcasts.append(area)
+            hung = list(self.hung_windows)
+        if mode == "notify":
+            return BroadcastResult(mode, (time.perf_counter() - started) * 1000, None, [])
+        if hung:
+            # "send" gives up once on the whole broadcast; "per-window" waits on each hung window
+            time.sleep(window_timeout_ms / 1000 * len(hung) if mode == "per-window" else timeout_ms / 1000)
+        timed_out = hung if mode == "per-window" else (["HWND_BROADCAST"] if hung else [])
+        windows = self.window_count + len(hung) if mode == "per-window" else None
+        return BroadcastResult(mode, (time.perf_counter() - started) * 1000, windows, timed_out)
+
+    def run_shell(self, args, timeout=None):
+        self._delay("shell")
+        with self._lock:
+            self.shell_commands.append(args)
+        returncode, stdout, stderr = 0, "", ""
+        if self.shell_handler:
+            returncode, stdout, stderr = self.shell_handler(args)
+        return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+    def spawn(self, args, cwd=None, hidden=False, detached=False, shell=False):
+        self._delay("spawn")
+        process = _FakeProcess(args, cwd)
+        with self._lock:
+            self.spawned.append(process)
+        return process
+
+    def open_uri(self, uri):
+        self._delay("open_uri")
+        with self._lock:
+            self.opened_uris.append(uri)
+        return _FakeProcess(["start", uri])
+
+
+def get_default_backend():
+    """Return the live Windows backend, or an empty in-memory one elsewhere."""
+    if sys.platform == "win32":
+        return WindowsBackend()
+    return InMemoryBackend()
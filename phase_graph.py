@@ -0,0 +1,78 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class PhaseGraph:
+    """Run named phases as soon as the phases they depend on have finished.
+
+    Phases without a dependency between them run concurrently on the given
+    executor, so the wall time approaches the slowest chain instead of the
+    sum of all phases. A phase that raises stops its dependents (they are
+    reported as skipped); the others still run to completion, then run()
+    re-raises the first error in the order the phases were added.
+    """
+
+    def __init__(self):
+        self._phases = {}
+
+    def add(self, name, func, after=()):
+        """Add phase `name` running func(); `after` names phases that must finish first."""
+        for dependency in after:
+            if dependency not in self._phases:
+                raise ValueError(f"Phase {name!r} depends on unknown phase {dependency!r}")
+        self._phases[name] = (func, tuple(after))
+        return self
+
+    def run(self, executor, before_phase=None):
+        """Run every phase; returns {name: {"ms", "ok", "value"}} in the order they were added.
+
+        `before_phase(name)` is called on the scheduling thread right before
+        a phase is submitted (e.g. to report progress or stop on cancel);
+        whatever it raises is treated like an error of that phase.
+        """
+        results = {name: {"ms": None, "ok": None, "value": None} for name in self._phases}
+        errors = {}
+        pending = dict(self._phases)
+        running = {}
+        while pending or running:
+            for name, (func, after) in list(pending.items()):
+                if any(results[dependency]["ok"] is None for dependency in after):
+                    continue  # still waiting on a dependency
+                del pending[name]
+                if not all(results[dependency]["ok"] for dependency in after):
+                    results[name]["ok"] = False
+                    results[name]["skipped"] = True
+                    continue
+                try:
+                    if before_phase:
+                        before_phase(name)
+                except Exception as e:
+                    results[name]["ok"] = False
+                    errors[name] = e
+                    continue
+                # Each phase gets a copy of this context so its trace spans keep their parent
+                context = contextvars.copy_context()
+                running[executor.submit(context.run, self._timed, func)] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                elapsed, value, error = future.result()
+                results[name].update(ms=elapsed * 1000, ok=error is None, value=value)
+                if error is not None:
+                    errors[name] = error
+        for name in self._phases:
+            if name in errors:
+                raise errors[name]
+        return results
+
+    @staticmethod
+    def _timed(func):
+        start = time.perf_counter()
+        try:
+            value, error = func(), None
+        except Exception as e:
+            value, error = None, e
+        return time.perf_counter() - start, value, error
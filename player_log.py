@@ -0,0 +1,243 @@
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+PLAYER_LOG = "Player.log"
+PREVIOUS_LOG = "Player-prev.log"
+
+# One parsed line: kind is "timestep", "culture", "engine" or "text"; value is the captured field
+LogLine = namedtuple("LogLine", "text kind value")
+
+# Unity writes these while starting up; the game's own wording may vary, so match loosely
+TIMESTEP_PATTERN = re.compile(
+    r"(fixed\s*delta\s*time|fixedDeltaTime|time\s*step|timestep|tick\s*rate)\D{0,20}?([-+]?\d+(?:[.,]\d+)?)",
+    re.IGNORECASE,
+)
+CULTURE_PATTERN = re.compile(r"(?:culture|locale)\w*\W{0,3}([a-z]{2,3}-[A-Za-z]{2,4})\b", re.IGNORECASE)
+ENGINE_PATTERN = re.compile(r"Initialize engine version:\s*(\S+)")
+
+
+def default_log_dir():
+    """Folder Unity writes Crossfire Legion's Player.log to."""
+    return os.path.join(
+        os.path.expanduser("~"), "AppData", "LocalLow", "Blackbird Interactive", "Crossfire Legion"
+    )
+
+
+def parse_line(text):
+    """Classify one log line and pull out the timestep/culture/engine value if present."""
+    match = TIMESTEP_PATTERN.search(text)
+    if match:
+        return LogLine(text, "timestep", match.group(2))
+    match = CULTURE_PATTERN.search(text)
+    if match:
+        return LogLine(text, "culture", match.group(1))
+    match = ENGINE_PATTERN.search(text)
+    if match:
+        return LogLine(text, "engine", match.group(1))
+    return LogLine(text, "text", None)
+
+
+def timestep_ok(value):
+    """Return True if a logged timestep looks like a sane fraction of a second.
+
+    Under a comma-decimal culture the game logs "0,02" or reads "0.02" as 2,
+    which is what makes it run at full speed.
+    """
+    text = str(value)
+    if "," in text:
+        return False
+    try:
+        seconds = float(text)
+    except ValueError:
+        return False
+    return 0 < seconds < 1
+
+
+class PlayerLogTailer:
+    """Incrementally reads Player.log, resuming from a persisted byte offset.
+
+    Only complete lines are yielded and the offset only moves past them.
+    Truncation (file shorter than the offset) restarts from 0; rotation
+    (Unity renaming Player.log to Player-prev.log on start) is detected by
+    file identity, and the rest of the old file is drained from
+    Player-prev.log before the new one is read from the beginning. Large
+    backlogs are read through mmap, small increments with buffered reads.
+    """
+
+    MMAP_THRESHOLD = 256 * 1024
+
+    def __init__(self, path=None, state_file=None, chunk_size=1024 * 1024):
+        self.path = path or os.path.join(default_log_dir(), PLAYER_LOG)
+        self.previous_path = os.path.join(os.path.dirname(self.path), PREVIOUS_LOG)
+        self.state_file = state_file
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.identity = None
+        # (offset, identity) as last loaded or saved, so polling without new lines writes nothing
+        self._saved = (0, None)
+        self._load_state()
+
+    # --- OFFSET STATE ---
+    def _load_state(self):
+        if not self.state_file:
+            return
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    state = json.load(f)
+                if state.get("path") == self.path:
+                    self.offset = int(state.get("offset", 0))
+                    self.identity = state.get("identity")
+                    self._saved = (self.offset, self.identity)
+        except Exception as e:
+            print(f"Error loading log offset: {e}")
+
+    def save_state(self):
+        """Persist the current offset so the next run resumes after the last yielded line."""
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump({"path": self.path, "offset": self.offset, "identity": self.identity}, f)
+            self._saved = (self.offset, self.identity)
+        except Exception as e:
+            print(f"Error saving log offset: {e}")
+
+    @staticmethod
+    def _identity(stat):
+        # File ID survives Unity's rename to Player-prev.log; size/ctime change on every append
+        if stat.st_ino:
+            return [stat.st_dev, stat.st_ino]
+        birth = getattr(stat, "st_birthtime_ns", None)
+        return [birth] if birth else None
+
+    # --- READING ---
+    def _read_from(self, path, offset, size):
+        """Yield (line bytes, offset after the line) for complete lines between offset and size."""
+        with open(path, "rb") as f:
+            if size - offset >= self.MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+                    while True:
+                        end = mapped.find(b"\n", offset, size)
+                        if end < 0:
+                            return
+                        yield mapped[offset:end], end + 1
+                        offset = end + 1
+            f.seek(offset)
+            pending = b""
+            position = offset
+            while position < size:
+                chunk = f.read(min(self.chunk_size, size - position))
+                if not chunk:
+                    return
+                position += len(chunk)
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for raw in lines:
+                    offset += len(raw) + 1
+                    yield raw, offset
+
+    def _emit(self, path, start, size):
+        for raw, offset in self._read_from(path, start, size):
+            # Advance before yielding so a consumer that stops early never sees a line twice
+            self.offset = offset
+            yield parse_line(raw.rstrip(b"\r").decode("utf-8", "replace"))
+
+    def read_new(self):
+        """Yield LogLine for every complete line appended since the last call."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        identity = self._identity(stat)
+
+        if self.identity is not None and identity is not None and identity != self.identity:
+            # Rotated: finish the old file (now Player-prev.log) if it is the one we were reading
+            try:
+                previous = os.stat(self.previous_path)
+                if self._identity(previous) == self.identity and previous.st_size > self.offset:
+                    yield from self._emit(self.previous_path, self.offset, previous.st_size)
+            except FileNotFoundError:
+                pass
+            self.offset = 0
+        elif stat.st_size < self.offset:
+            # Truncated in place
+            self.offset = 0
+        self.identity = identity
+
+        if stat.st_size > self.offset:
+            yield from self._emit(self.path, self.offset, stat.st_size)
+
+    def skip_to_end(self):
+        """Move the offset to the current end of the log without reading it."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        self.identity = self._identity(stat)
+        self.offset = stat.st_size
+
+    def follow(self, stop_event=None, interval=0.05):
+        """Yield lines forever (until stop_event is set), checking the file every `interval` seconds."""
+        while stop_event is None or not stop_event.is_set():
+            for line in self.read_new():
+                yield line
+            if (self.offset, self.identity) != self._saved:
+                self.save_state()
+            if stop_event is not None:
+                if stop_event.wait(interval):
+                    break
+            else:
+                time.sleep(interval)
+
+
+class TimestepMonitor:
+    """Subscribes to the Player.log stream and reports the first timestep verdict.
+
+    on_result(ok, line, culture) is called once, from the monitor thread, as
+    soon as a timestep line is parsed (culture is the last culture seen, if
+    any). Stops by itself after that, on stop(), or after `timeout` seconds.
+    """
+
+    def __init__(self, on_result, tailer=None, timeout=300.0):
+        self.on_result = on_result
+        self.tailer = tailer or PlayerLogTailer()
+        self.timeout = timeout
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="player-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        deadline = time.monotonic() + self.timeout
+        culture = None
+        timer = threading.Timer(self.timeout, self._stop.set)
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in self.tailer.follow(self._stop):
+                if line.kind == "culture":
+                    culture = line.value
+                elif line.kind == "timestep":
+                    self.on_result(timestep_ok(line.value), line, culture)
+                    return
+                if time.monotonic() > deadline:
+                    return
+        except Exception as e:
+            print(f"Player.log monitor error: {e}")
+        finally:
+            timer.cancel()
+            self._stop.set()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -1,10 +1,32 @@
-import flet as ft
-from regional_utils import RegionalFormatChanger
-from ui_components import create_header, create_status_container, create_controls_container, create_path_input_section
-from ui_handlers import setup_ui_handlers, update_status
+import sys
+from startup_profile import StartupProfile
+
+# Created first so every import below is measured; report with --startup-profile
+PROFILE = StartupProfile(enabled="--startup-profile" in sys.argv)
+# Per-phase timing table and trace export below the controls
+DIAGNOSTICS = "--diagnostics" in sys.argv
+
+# Already running: bring that window forward instead of starting a second app (--new-instance skips this)
+if "--new-instance" not in sys.argv:
+    with PROFILE.phase("single-instance check"):
+        import instance_ipc
+        try:
+            running = instance_ipc.forward(["show"], timeout=5.0)
+        except Exception:
+            running = None  # the running instance is stuck; start normally
+    if running is not None:
+        sys.exit(0)
+
+with PROFILE.phase("import flet"):
+    import flet as ft
+with PROFILE.phase("import ui_components"):
+    from ui_components import (
+        create_header, create_status_container, create_controls_container, create_path_input_section,
+        create_diagnostics_panel
+    )
 
 def main(page: ft.Page):
-    # FAST STARTuP
+    # FAST STARTUP: draw the window first, everything else is deferred to init_app()
     page.title = "Regional Format Control - Crossfire Legion"
     page.padding = 15
     page.spacing = 15
@@ -13,15 +35,16 @@ def main(page: ft.Page):
     page.color_scheme_seed = "#00ff41"
     
     # INSTANT DESKTOP WINDOW PROPERTIES - instant loading
+    PROFILE.mark("main() entered")
     try:
         # Modern Flet window properties (instant loading)
         page.window.width = 550
-        page.window.height = 650
+        page.window.height = 850 if DIAGNOSTICS else 650
         page.window.resizable = False
         page.window.maximizable = False
         page.window.center()
         page.window.min_width = 550
-        page.window.min_height = 650
+        page.window.min_height = 850 if DIAGNOSTICS else 650
         page.window.always_on_top = False
         page.window.skip_task_bar = False
         page.window.frameless = False
@@ -31,38 +54,24 @@ def main(page: ft.Page):
         # Fallback for older Flet versions (instant loading)
         try:
             page.window_width = 550
-            page.window_height = 650
+            page.window_height = 850 if DIAGNOSTICS else 650
             page.window_resizable = False
             page.window_maximizable = False
         except Exception:
             pass
     
-    # Initialize the regional format changer
-    rfc = RegionalFormatChanger()
-    
-    # Initialize locale data
-    current_locale_data = rfc.get_current_locale()
-    current_locale = current_locale_data.get("locale", "Unknown")
-    rfc.current_locale = current_locale
-    
-    # Load or set default locale
-    saved_default = rfc.load_config()
-    if saved_default:
-        rfc.default_locale = saved_default
-    else:
-        rfc.default_locale = current_locale
-        rfc.save_config()
-    
-    # Create UI components
-    header = create_header()
-    status_container = create_status_container(current_locale, rfc.default_locale)
-    controls_container, buttons = create_controls_container()
-    # Unpack path input section for button wiring
-    path_input_section, browse_button, path_input = create_path_input_section()
+    # Create UI components with placeholders; real values arrive from init_app()
+    with PROFILE.phase("build controls"):
+        header = create_header()
+        status_container = create_status_container("...", "...")
+        controls_container, buttons = create_controls_container()
+        # Unpack path input section for button wiring
+        path_input_section, browse_button, path_input = create_path_input_section()
+        diagnostics = create_diagnostics_panel() if DIAGNOSTICS else None
 
     # Status text for operations feedback
     status_text = ft.Text(
-        "Ready for operations",
+        "⏳ Loading...",
         size=11,
         color="#ffffff",
         text_align=ft.TextAlign.CENTER,
@@ -76,22 +85,84 @@ def main(page: ft.Page):
             status_container,
             status_text,
             controls_container,
-            path_input_section
+            path_input_section,
+            *([diagnostics[0]] if diagnostics else [])
         ], spacing=0),
         expand=True
     )
 
-    # Add to page
+    # Add to page: first frame is drawn before any registry/config work
     page.add(main_container)
+    PROFILE.mark("first frame")
 
-    # Setup UI handlers and state management, now passing browse/path_input
-    setup_ui_handlers(
-        page, rfc, status_text, status_container, path_input_section, buttons,
-        browse_button=browse_button, path_input=path_input
+    page.run_task(
+        init_app, page, status_text, status_container, path_input_section, buttons,
+        browse_button, path_input, diagnostics
     )
 
+async def init_app(page, status_text, status_container, path_input_section, buttons, browse_button, path_input,
+                   diagnostics=None):
+    """Deferred startup: load configs and the locale off the UI thread, then wire handlers."""
+    import asyncio
+
+    with PROFILE.phase("import regional_utils"):
+        from regional_utils import RegionalFormatChanger
+    with PROFILE.phase("import ui_handlers"):
+        from ui_handlers import (
+            setup_ui_handlers, setup_diagnostics, update_status, schedule_update, button_cooldown,
+            start_control_server
+        )
+
+    def load_state():
+        # Initialize the regional format changer
+        with PROFILE.phase("init RegionalFormatChanger"):
+            rfc = RegionalFormatChanger()
+
+        # Initialize locale data (fills the locale cache once; the watcher keeps it fresh)
+        with PROFILE.phase("read current locale"):
+            current_locale_data = rfc.get_current_locale()
+            rfc.current_locale = current_locale_data.get("locale", "Unknown")
+        with PROFILE.phase("start locale watcher"):
+            rfc.start_locale_watch()
+
+        # Load or set default locale
+        with PROFILE.phase("load region config"):
+            saved_default = rfc.load_config()
+            if saved_default:
+                rfc.default_locale = saved_default
+            else:
+                rfc.default_locale = rfc.current_locale
+                rfc.save_config()
+
+        # Resolve the installed game once so the path field can be prefilled from memory
+        with PROFILE.phase("resolve Steam library"):
+            rfc.find_game_exe()
+        return rfc
+
+    rfc = await asyncio.to_thread(load_state)
+
+    # Setup UI handlers and state management, now passing browse/path_input
+    with PROFILE.phase("wire handlers"):
+        setup_ui_handlers(
+            page, rfc, status_text, status_container, path_input_section, buttons,
+            browse_button=browse_button, path_input=path_input
+        )
+        if diagnostics:
+            setup_diagnostics(page, rfc, diagnostics[1], diagnostics[2])
+
+    # Later launches and cli.py hand their commands to this instance
+    with PROFILE.phase("start control server"):
+        start_control_server(page, rfc, status_container, buttons)
+
     # Initial status update
+    status_text.value = "Ready for operations"
+    schedule_update(page, status_text)
     update_status(page, rfc, status_container, buttons)
+    # Another instance (or the CLI) may have just changed the locale: honour its cooldown
+    if rfc.cooldown.remaining() > 0:
+        page.run_task(button_cooldown, page, buttons, rfc, status_container)
+    PROFILE.mark("ready")
+    PROFILE.print_report()
 
 if __name__ == "__main__":
     ft.app(target=main, view=ft.AppView.FLET_APP)
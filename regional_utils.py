@@ -1,22 +1,35 @@
-import subprocess
-import winreg
-import json
+import atexit
+import contextvars
 import os
+import queue
 import sys
-import ctypes
+import threading
 import time
-from datetime import datetime
+
+# Everything else (configs, caches, Steam lookup, game/log watchers, hives) is
+# imported on first use, so a headless apply only loads what it needs
+from os_backend import HKCU, HKU, INTERNATIONAL_KEY, WINDOW_TIMEOUT_MS, get_default_backend
+from tracing import span
 
 # --- ADMIN CHECK AND RELAUNCH ---
 def is_admin():
     try:
+        import ctypes
         return ctypes.windll.shell32.IsUserAnAdmin()
     except:
         return False
 
 if __name__ == "__main__":
+    import instance_ipc
+    try:
+        # Already running (and elevated): show that window rather than prompting for UAC again
+        if "--new-instance" not in sys.argv and instance_ipc.forward(["show"], timeout=5.0) is not None:
+            sys.exit(0)
+    except Exception:
+        pass
     if not is_admin():
         # Relaunch as admin, hide console window
+        import ctypes
         SW_HIDE = 0
         ctypes.windll.shell32.ShellExecuteW(
             None, "runas", sys.executable, " ".join([f'"{arg}"' for arg in sys.argv]), None, SW_HIDE
@@ -24,94 +37,219 @@ if __name__ == "__main__":
         sys.exit(0)
 # --- END ADMIN CHECK ---
 
+class OperationCancelled(Exception):
+    """Raised between apply phases when the caller's cancel event is set."""
+
+def _ps_quote(value):
+    """`value` as a single-quoted PowerShell string literal (no expansion inside)."""
+    # PowerShell also ends single-quoted strings at the typographic quotes, so double those too
+    return "'" + "".join(c * 2 if c in "'\u2018\u2019\u201a\u201b" else c for c in str(value)) + "'"
+
+class _lazy:
+    """Attribute built by the decorated method on first access, then kept on the instance.
+
+    Assigning the attribute replaces it like a plain one (tests swap in their own stores).
+    """
+    _lock = threading.RLock()
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._lock:
+            try:
+                return instance.__dict__[self.name]
+            except KeyError:
+                value = instance.__dict__[self.name] = self.factory(instance)
+                return value
+
 class RegionalFormatChanger:
-    def __init__(self):
+    def __init__(self, backend=None):
+        # All registry, broadcast and shell access goes through the backend
+        self.backend = backend or get_default_backend()
         self.default_locale = None
         self.current_locale = None
-        self.config_file = "region_config.json"
+        # Handle of the directly launched game (None for Steam launches, which hand off to a new process)
+        self.game_process = None
+        self.game_watcher = None
+        self.log_monitor = None
+        # WM_SETTINGCHANGE delivery ("send", "notify" or "per-window", see OSBackend) and its
+        # timeouts: the whole broadcast, or each window in "per-window" mode. Defaults only;
+        # a caller (e.g. a forwarded cli.py command) passes its own per call
+        self.broadcast_mode = "send"
+        self.broadcast_timeout_ms = 5000
+        self.broadcast_window_timeout_ms = WINDOW_TIMEOUT_MS
+        # Broadcasts run on one background worker so a hung window never stalls an apply
+        self._broadcast_queue = None
+        self._broadcast_future = None
+        self._broadcast_queued = None
+        # Held by apply, revert, restore and all-users runs, so commands arriving at once from the
+        # window, the control pipe and a fleet agent never interleave their writes
+        self._operation_lock = threading.RLock()
+        self.last_broadcast = None
+        # Persistent PowerShell hosts (shell_host) from the backend, started on first use; may be
+        # replaced by ShellHostPool.standin() in tests. None runs one powershell per command
+        self.powershell = None
+        self._powershell_checked = False
+        self._powershell_lock = threading.Lock()
+        atexit.register(self.close_powershell)
+        # {phase: ms} of the last apply that changed anything
+        self.last_apply_phases = {}
+        # Upper bound (seconds) for waiting on the registry to reflect an apply
+        self.verify_timeout = 5.0
+        # (fingerprint, values) of the last International key enumeration
+        self._international_cache = None
+        self.config_file = os.path.join(self._get_app_dir(), "region_config.json")
         self.game_config_file = os.path.join(self._get_app_dir(), "game_config.json")
+        atexit.register(self.flush_config)
+        # Hard upper bound (seconds) for the shared cooldown, see cooldown
+        self.cooldown_max = 15.0
+        # (token start, next probe time, current probe interval) for the cooldown being probed
+        self._probe_schedule = None
+        # Where the Player.log tailer remembers how far it has read
+        self.player_log_state_file = os.path.join(self._get_app_dir(), "player_log_state.json")
+        # Finished sessions' Player.log copies, see archive_player_log()
+        self.log_archive_dir = os.path.join(self._get_app_dir(), "log_archive")
         # Common locale display names for convenience
         self.locale_display_names = {
             "en-US": "United States",
         }
-        # Minimal safe registry overrides for fast apply
-        self.locale_registry_overrides = {
-            "en-US": {
-                "Locale": "00000409",  # LCID
-                "LocaleName": "en-US",
-                "iCountry": "1",
-                "sCountry": "United States",
-                "sCurrency": "$",
-                "sShortDate": "M/d/yyyy",
-                "sLongDate": "dddd, MMMM d, yyyy",
-                "sTimeFormat": "h:mm:ss tt",
-                "sShortTime": "h:mm tt",
-                "sMonDecimalSep": ".",
-                "sMonThousandSep": ",",
-                "sDecimal": ".",
-                "sThousand": ",",
-                "iMeasure": "1",
-                "iFirstDayOfWeek": "6",
-                "iCalendarType": "1",
-                "iDate": "0",
-                "iTime": "0",
-            }
-            ,
-            "de-DE": {
-                "Locale": "00000407",  # LCID for German (Germany)
-                "LocaleName": "de-DE",
-                "iCountry": "49",
-                "sCountry": "Germany",
-                "sCurrency": "€",
-                "sShortDate": "dd.MM.yyyy",
-                "sLongDate": "dddd, d. MMMM yyyy",
-                "sTimeFormat": "HH:mm:ss",
-                "sShortTime": "HH:mm",
-                "sMonDecimalSep": ",",
-                "sMonThousandSep": ".",
-                "sDecimal": ",",
-                "sThousand": ".",
-                "iMeasure": "0",
-                "iFirstDayOfWeek": "0",
-                "iCalendarType": "1",
-                "iDate": "1",
-                "iTime": "1",
-            }
-        }
+        # Per-SID snapshot histories for apply_to_all_users()
+        self.hive_snapshot_dir = os.path.join(self._get_app_dir(), "hive_snapshots")
+
+    # --- SUBSYSTEMS (built on first use) ---
+    @_lazy
+    def _phase_executor(self):
+        """Independent apply phases (verify, culture sync, broadcast) run side by side here."""
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=3, thread_name_prefix="apply-phase")
+
+    @_lazy
+    def locale_state(self):
+        """Current locale info served from memory; see start_locale_watch()."""
+        from locale_state import LocaleStateCache
+        return LocaleStateCache(self._read_current_locale)
+
+    @_lazy
+    def config(self):
+        """region_config.json, read once and written behind (debounced, atomic); flushed on exit."""
+        from config_store import ConfigStore
+        return ConfigStore(self.config_file)
+
+    @_lazy
+    def game_config(self):
+        """game_config.json, handled like config."""
+        from config_store import ConfigStore
+        return ConfigStore(self.game_config_file)
+
+    @_lazy
+    def capability_cache(self):
+        """Remembers which Language.Basic capabilities are installed so applies can skip the scan."""
+        from capability_cache import CapabilityCache
+        return CapabilityCache(os.path.join(self._get_app_dir(), "capability_cache.json"))
+
+    @_lazy
+    def cooldown(self):
+        """Shared with other instances: buttons stay locked until a probe sees the new culture live."""
+        from cooldown import CooldownToken
+        return CooldownToken(os.path.join(self._get_app_dir(), "cooldown.token"))
+
+    @_lazy
+    def locale_profiles(self):
+        """Registry profiles per locale, read lazily from the bundled table."""
+        from locale_profiles import LocaleProfileDB
+        return LocaleProfileDB()
+
+    @_lazy
+    def steam(self):
+        """Steam install and game folder lookup (libraryfolders.vdf / appmanifest, cached)."""
+        from steam_library import SteamLibrary
+        return SteamLibrary(self.backend)
+
+    @_lazy
+    def snapshots(self):
+        """Full International key snapshots taken before an apply, used for exact revert."""
+        from locale_snapshots import SnapshotStore
+        return SnapshotStore(os.path.join(self._get_app_dir(), "region_snapshots.json"))
         
+    def run_powershell(self, ps_cmd, timeout=None):
+        """Run a PowerShell script in a persistent host (milliseconds instead of a cold start).
+
+        Falls back to a new powershell process when the backend has no host
+        or the host died mid-command. Scripts must not depend on process
+        state such as the cached CurrentCulture (see probe_culture()).
+        """
+        with self._powershell_lock:
+            if self.powershell is None and not self._powershell_checked:
+                self._powershell_checked = True
+                self.powershell = self.backend.powershell_host_pool()
+        if self.powershell is not None:
+            from shell_host import ShellHostError
+            try:
+                with span("powershell.host"):
+                    return self.powershell.run(ps_cmd, timeout)
+            except ShellHostError as e:
+                print(f"PowerShell host error, using a new process: {e}")
+        with span("powershell.process"):
+            return self.backend.run_shell(
+                ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", ps_cmd],
+                timeout=timeout
+            )
+
+    def close_powershell(self):
+        """Stop the persistent PowerShell hosts, if any were started."""
+        if self.powershell is not None:
+            self.powershell.close()
+
     def get_current_locale(self):
-        """Get current Windows locale/regional format from Windows Settings (via Registry)"""
+        """Get current Windows locale/regional format (cached; see locale_state)"""
+        with span("locale.get"):
+            return self.locale_state.get()
+
+    def start_locale_watch(self):
+        """Keep locale_state fresh by invalidating it on International key changes."""
+        return self.locale_state.start_watching(self.backend, HKCU, INTERNATIONAL_KEY)
+
+    def stop_locale_watch(self):
+        """Stop the background locale watcher, if running."""
+        self.locale_state.stop_watching()
+
+    def _read_current_locale(self):
+        """Read current Windows locale/regional format from Windows Settings (via Registry)"""
+        with span("locale.read"):
+            return self._read_current_locale_uncached()
+
+    def _read_current_locale_uncached(self):
         try:
             # Primary method: Get from Windows Settings via Registry
             # This reads the same values that Windows Settings displays
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-                              r"Control Panel\International") as key:
-                # Get the locale name (e.g., "en-US")
-                locale_name = winreg.QueryValueEx(key, "LocaleName")[0]
-                
-                # Get additional regional format info
-                try:
-                    # Get the format string (e.g., "English (United States)")
-                    format_string = winreg.QueryValueEx(key, "sCountry")[0]
-                except:
-                    format_string = ""
-                
-                # Return comprehensive regional format info
-                if locale_name:
-                    return {
-                        "locale": locale_name,
-                        "country": format_string
-                    }
+            # Get the locale name (e.g., "en-US")
+            locale_name = self.backend.read_value(HKCU, INTERNATIONAL_KEY, "LocaleName")
+            
+            # Get additional regional format info
+            try:
+                # Get the format string (e.g., "English (United States)")
+                format_string = self.backend.read_value(HKCU, INTERNATIONAL_KEY, "sCountry")
+            except:
+                format_string = ""
+            
+            # Return comprehensive regional format info
+            if locale_name:
+                return {
+                    "locale": locale_name,
+                    "country": format_string
+                }
                 
         except Exception as e:
             print(f"Error reading from Registry: {e}")
         
         # Fallback method using PowerShell (less reliable but backup)
         try:
-            result = subprocess.run([
-                "powershell", "-Command", 
-                "Get-WinSystemLocale | Select-Object -ExpandProperty Name"
-            ], capture_output=True, text=True, shell=True)
+            result = self.run_powershell("Get-WinSystemLocale | Select-Object -ExpandProperty Name", timeout=15)
             
             if result.returncode == 0:
                 locale = result.stdout.strip()
@@ -122,142 +260,675 @@ class RegionalFormatChanger:
         
         return {"locale": "Unknown", "country": ""}
     
+    def get_locale_overrides(self, locale_name, minimal=False):
+        """Registry values that make up a locale's regional format; ValueError if it is not in the table.
+
+        With `minimal`, an affected locale keeps its own formats except for the
+        decimal separators (see LocaleProfileDB.minimal_override).
+        """
+        overrides = self.locale_profiles.get(locale_name)
+        if overrides is None:
+            raise ValueError(f"Unknown locale: {locale_name!r}")
+        if minimal:
+            overrides.update(self.locale_profiles.minimal_override(locale_name))
+        return overrides
+
+    def is_locale_affected(self, locale_name=None):
+        """Return True if the locale (default: current) uses a comma decimal separator."""
+        if locale_name is None:
+            locale_name = self.get_current_locale().get("locale")
+        from locale_profiles import is_comma_decimal
+        return is_comma_decimal(locale_name)
+
     def set_locale_to_en_us(self):
         """Open Windows Settings to Region page for user to set EN-US live"""
         try:
             # Hide console window when opening settings
-            si = subprocess.STARTUPINFO()
-            si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            si.wShowWindow = 0  # SW_HIDE
-            subprocess.Popen('start ms-settings:regionlanguage', shell=True, startupinfo=si)
+            self.backend.open_uri("ms-settings:regionlanguage")
             return True
         except Exception as e:
             print(f"Error opening Settings: {e}")
             return False
 
     # --- FAST LIVE APPLY: change current user's regional format ---
-    def _broadcast_setting_change(self):
-        """Broadcast WM_SETTINGCHANGE to apply changes without reboot/logoff."""
+    def _broadcast_options(self, mode=None, window_timeout_ms=None):
+        """(mode, per-window timeout) for one broadcast; None picks this changer's default."""
+        return (
+            mode or self.broadcast_mode,
+            self.broadcast_window_timeout_ms if window_timeout_ms is None else window_timeout_ms,
+        )
+
+    def _broadcast_setting_change(self, options=None):
+        """Queue a WM_SETTINGCHANGE broadcast on the background worker and return its Future.
+
+        `options` comes from _broadcast_options(). The caller does not wait for
+        it. A broadcast still queued (not yet started) with the same options
+        is reused, so back-to-back applies send one message.
+        """
+        options = options or self._broadcast_options()
+        future = self._broadcast_future
+        if (future is not None and not future.running() and not future.done()
+                and self._broadcast_queued == options):
+            return future
+        from concurrent.futures import Future
+        if self._broadcast_queue is None:
+            self._broadcast_queue = queue.Queue()
+            # A daemon thread rather than an executor: exiting must not wait on a window that never answers
+            threading.Thread(target=self._broadcast_worker, name="broadcast", daemon=True).start()
+        future = self._broadcast_future = Future()
+        self._broadcast_queued = options
+        self._broadcast_queue.put((future, options))
+        return future
+
+    def _broadcast_worker(self):
+        while True:
+            future, options = self._broadcast_queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._run_broadcast(*options))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run_broadcast(self, mode, window_timeout_ms):
+        with span("broadcast", mode=mode) as record:
+            try:
+                result = self.backend.broadcast_setting_change(
+                    "intl", mode=mode, timeout_ms=self.broadcast_timeout_ms,
+                    window_timeout_ms=window_timeout_ms,
+                )
+            except Exception as e:
+                # Non-fatal; settings will still apply for most apps next launch
+                print(f"Broadcast error: {e}")
+                record["ok"] = False
+                return None
+            if result is not None:
+                record["timed_out"] = result.timed_out
+                if result.timed_out:
+                    limit = window_timeout_ms if mode == "per-window" else self.broadcast_timeout_ms
+                    print(f"Broadcast: no reply within {limit}ms from {', '.join(result.timed_out)}")
+            self.last_broadcast = result
+            return result
+
+    def wait_for_broadcast(self, timeout=None):
+        """Block until the last queued broadcast finished; returns its BroadcastResult (or None)."""
+        future = self._broadcast_future
+        if future is None:
+            return None
         try:
-            HWND_BROADCAST = 0xFFFF
-            WM_SETTINGCHANGE = 0x001A
-            SMTO_ABORTIFHUNG = 0x0002
-
-            user32 = ctypes.windll.user32
-            SendMessageTimeoutW = user32.SendMessageTimeoutW
-            # LRESULT SendMessageTimeoutW(HWND hWnd, UINT Msg, WPARAM wParam, LPWSTR lParam, UINT fuFlags, UINT uTimeout, PDWORD_PTR lpdwResult)
-            SendMessageTimeoutW.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_void_p, ctypes.c_wchar_p, ctypes.c_uint, ctypes.c_uint, ctypes.POINTER(ctypes.c_ulong)]
-            SendMessageTimeoutW.restype = ctypes.c_void_p
-
-            result = ctypes.c_ulong(0)
-            SendMessageTimeoutW(HWND_BROADCAST, WM_SETTINGCHANGE, 0, ctypes.c_wchar_p("intl"), SMTO_ABORTIFHUNG, 5000, ctypes.byref(result))
-        except Exception as e:
-            # Non-fatal; settings will still apply for most apps next launch
-            print(f"Broadcast error: {e}")
+            return future.result(timeout)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _broadcast_note(future):
+        """Short result-message note on a broadcast that may still be running."""
+        if future is None or not future.done():
+            return "broadcast in background"
+        result = future.result()
+        if result is None:
+            return "broadcast failed"
+        note = f"broadcast {result.elapsed_ms:.0f}ms"
+        if result.timed_out:
+            note += f", {len(result.timed_out)} hung window(s)"
+        return note
+
+    # Values that must read back before an apply counts as verified
+    VERIFY_FIELDS = ("LocaleName", "sDecimal", "sMonDecimalSep")
+    # Poll interval used only when the backend cannot deliver change notifications
+    VERIFY_POLL_INTERVAL = 0.05
+
+    def _locale_applied(self, expected):
+        """Return True if every expected verify field already reads back from the registry."""
+        try:
+            _, current = self._international_state()
+        except Exception:
+            return False
+        return all(str(current.get(name, "")).lower() == str(value).lower() for name, value in expected.items())
+
+    def _wait_for_locale(self, overrides, watcher, timeout):
+        """Wait until LocaleName and the decimal fields match `overrides`.
+
+        Wakes on registry change notifications from `watcher` (or short polls
+        when there is none) and gives up after `timeout` seconds.
+        """
+        expected = {name: overrides[name] for name in self.VERIFY_FIELDS if name in overrides}
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._locale_applied(expected):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if watcher is not None:
+                watcher.wait(remaining)
+            else:
+                time.sleep(min(self.VERIFY_POLL_INTERVAL, remaining))
+
+    def _international_state(self):
+        """Return (fingerprint, values) for the International key.
+
+        The fingerprint is the key's last-write stamp; while it is unchanged
+        the cached enumeration is reused, so the check costs one key query.
+        """
+        try:
+            fingerprint = self.backend.key_last_write(HKCU, INTERNATIONAL_KEY)
+        except Exception:
+            fingerprint = None
+        cache = self._international_cache
+        if fingerprint is not None and cache and cache[0] == fingerprint:
+            return cache
+        # Single enumeration of the whole key
+        values = self.backend.read_values(HKCU, INTERNATIONAL_KEY)
+        if fingerprint is not None:
+            self._international_cache = (fingerprint, values)
+        return fingerprint, values
+
+    @staticmethod
+    def _registry_delta(current, target):
+        """Return the subset of `target` values that differ from `current`."""
+        return {name: value for name, value in target.items() if current.get(name) != value}
+
+    def _open_watcher(self):
+        """Arm a change watcher on the International key, or None if unsupported."""
+        try:
+            return self.backend.watch_key(HKCU, INTERNATIONAL_KEY)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _enter_phase(phase, message, progress, cancel_event):
+        """Stop if cancelled, otherwise report the phase about to run."""
+        if cancel_event is not None and cancel_event.is_set():
+            raise OperationCancelled(phase)
+        if progress:
+            try:
+                progress(phase, message)
+            except Exception as e:
+                print(f"Progress callback error: {e}")
 
-    def apply_locale_quick(self, locale_name: str):
+    def apply_locale_quick(self, locale_name: str, verify_timeout=None, progress=None, cancel_event=None, snapshot=True,
+                           broadcast_mode=None, window_timeout_ms=None, minimal=False):
         """Quickly set current user's regional format to the given locale (e.g., 'en-US').
 
+        Verification returns as soon as the registry reflects the new values;
+        `verify_timeout` (seconds) overrides self.verify_timeout as the deadline.
+        After the write, the broadcast, verify and culture phases run
+        concurrently (see PhaseGraph); their timings end up in
+        self.last_apply_phases. `progress(phase, message)` is called before
+        each phase ("write", "broadcast", "verify", "culture"), possibly from
+        several threads; setting `cancel_event` (a threading.Event) stops the
+        apply before any phase that has not started yet.
+        With `snapshot`, the whole key is saved first unless an unrestored
+        snapshot already exists, so revert can put it back exactly.
+        `broadcast_mode` and `window_timeout_ms` override self.broadcast_mode
+        and self.broadcast_window_timeout_ms for this call only.
+        With `minimal`, only the values that give `locale_name` a dot decimal
+        separator are changed on top of its profile, and the culture sync is
+        skipped (Set-Culture would put the locale's own separators back).
+
         Returns: (success: bool, message: str)
         """
+        broadcast = self._broadcast_options(broadcast_mode, window_timeout_ms)
+        with self._operation_lock, span("apply", locale=locale_name) as record:
+            record["ok"], message = self._apply_locale_quick(
+                locale_name, verify_timeout, progress, cancel_event, snapshot, broadcast, minimal
+            )
+            return record["ok"], message
+
+    def _apply_locale_quick(self, locale_name, verify_timeout, progress, cancel_event, snapshot, broadcast_options,
+                            minimal=False):
+        # Whoever asked (UI, cli, a forwarded or fleet command), only table locales are written
+        if self.locale_profiles.get(locale_name) is None:
+            return False, f"Unknown locale: {locale_name}"
+        if verify_timeout is None:
+            verify_timeout = self.verify_timeout
+        # Armed before the write so no change notification can be missed
+        watcher = self._open_watcher()
         try:
             # Update HKCU regional format
-            overrides = self.locale_registry_overrides.get(locale_name, {"LocaleName": locale_name})
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\International", 0, winreg.KEY_SET_VALUE) as key:
-                for value_name, value_data in overrides.items():
-                    winreg.SetValueEx(key, value_name, 0, winreg.REG_SZ, value_data)
-
-            # Flush to registry (best-effort)
+            self._enter_phase("write", f"Writing {locale_name} registry values...", progress, cancel_event)
+            overrides = self.get_locale_overrides(locale_name, minimal)
             try:
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\International", 0, winreg.KEY_READ) as key:
-                    winreg.FlushKey(key)
-            except Exception:
-                pass
-
-            # Broadcast change so many apps pick it up immediately
-            self._broadcast_setting_change()
+                _, current = self._international_state()
+            except FileNotFoundError:
+                current = {}
+            delta = self._registry_delta(current, overrides)
+            if not delta:
+                # Already in the target state: skip flush, broadcast and PowerShell entirely
+                self.current_locale = locale_name
+                self.last_apply_phases = {}
+                return True, f"Regional format already set to {locale_name}"
 
-            # Short delay to let Windows apply changes
-            time.sleep(1)
+            def write():
+                if snapshot and current and self.snapshots.pending() is None:
+                    with span("apply.snapshot"):
+                        self.snapshots.capture(current, current.get("LocaleName"))
+                with span("apply.write", values=len(delta)):
+                    self.backend.write_values(HKCU, INTERNATIONAL_KEY, delta)
 
-            # Verify with simple retry
-            for _ in range(5):
+            def flush():
+                # Best-effort
                 try:
-                    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\International") as key:
-                        applied = winreg.QueryValueEx(key, "LocaleName")[0]
-                        if str(applied).lower() == locale_name.lower():
-                            break
+                    with span("apply.flush"):
+                        self.backend.flush_key(HKCU, INTERNATIONAL_KEY)
                 except Exception:
                     pass
-                time.sleep(1)
 
-            # Also try using PowerShell to set culture and language list for broader coverage
-            try:
-                # Ensure language basic capability is present (best-effort)
-                culture = locale_name
-                basic_cap = f"Language.Basic~~~{culture}~0.0.1.0"
-                ps_cmd = (
-                    "$culture=\"" + culture + "\"; "
-                    "$basic=\"Language.Basic~~~$culture~0.0.1.0\"; "
-                    "$cap=Get-WindowsCapability -Online | Where-Object { $_.Name -eq $basic }; "
-                    "if(-not $cap -or $cap.State -ne 'Installed'){ Add-WindowsCapability -Online -Name $basic | Out-Null }; "
-                    f"Set-Culture -CultureInfo '{culture}'; "
-                    "$list = New-Object System.Collections.Generic.List[System.String]; "
-                    f"$list.Add('{culture}'); "
-                    "Set-WinUserLanguageList -LanguageList $list -Force | Out-Null"
-                )
-                subprocess.run(
-                    ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", ps_cmd],
-                    capture_output=True, text=True, shell=True, timeout=60,
-                    startupinfo=self._get_hidden_startupinfo()
-                )
-            except Exception:
-                # Best-effort; ignore failures here
-                pass
+            def broadcast():
+                # Only queues the broadcast so many apps pick the change up; see _broadcast_setting_change()
+                with span("apply.broadcast"):
+                    return self._broadcast_setting_change(broadcast_options)
+
+            def verify():
+                # Returns as soon as the change is visible, no fixed sleeps
+                with span("apply.verify") as record:
+                    record["verified"] = self._wait_for_locale(overrides, watcher, verify_timeout)
+                    return record["verified"]
+
+            def culture():
+                if minimal:
+                    return None
+                # Also try using PowerShell to set culture and language list for broader coverage
+                with span("apply.culture") as record:
+                    record["note"] = self._sync_culture(locale_name)
+                    return record["note"]
+
+            # Verify and the culture sync only need the write; neither waits for the other
+            from phase_graph import PhaseGraph
+            graph = PhaseGraph()
+            graph.add("write", write)
+            graph.add("flush", flush, after=("write",))
+            graph.add("broadcast", broadcast, after=("flush",))
+            graph.add("verify", verify, after=("write",))
+            graph.add("culture", culture, after=("write",))
+            messages = {
+                "broadcast": "Broadcasting setting change...",
+                "verify": "Verifying registry values...",
+                "culture": "Syncing culture and language list...",
+            }
+
+            def before_phase(name):
+                if name in messages:
+                    self._enter_phase(name, messages[name], progress, cancel_event)
 
-            # Final delay to stabilize
-            time.sleep(1)
+            phases = graph.run(self._phase_executor, before_phase)
+            self.last_apply_phases = {name: round(result["ms"], 2) for name, result in phases.items()}
+            broadcast = phases["broadcast"]["value"]
+            verified = phases["verify"]["value"]
+            capability_note = phases["culture"]["value"]
 
             # Update in-memory current locale
             self.current_locale = locale_name
-            return True, f"Regional format set to {locale_name}"
+            self.locale_state.invalidate()
+            self._start_cooldown(overrides)
+            message = f"Regional format set to {locale_name}"
+            if minimal:
+                message += " with a dot decimal separator"
+            if not verified:
+                message += f" (not verified within {verify_timeout:g}s)"
+            if capability_note:
+                message += f" [{capability_note}]"
+            message += f" [{self._broadcast_note(broadcast)}]"
+            return True, message
+        except OperationCancelled as e:
+            return False, f"Cancelled before {e} phase"
         except PermissionError:
             return False, "Permission denied. Please run as Administrator."
         except Exception as e:
             return False, f"Failed to set locale: {e}"
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def _sync_culture(self, culture):
+        """Run Set-Culture/Set-WinUserLanguageList, scanning capabilities only on a cache miss.
 
-    def revert_to_default_quick(self):
-        """Revert regional format to saved default locale from config."""
+        Returns a short note about the capability cache for the result message.
+        """
+        cache_hit = self.capability_cache.is_installed(culture)
+        ps_cmd = f"$culture={_ps_quote(culture)}; "
+        if not cache_hit:
+            # Ensure language basic capability is present (best-effort) and report its state
+            ps_cmd += (
+                "$basic=\"Language.Basic~~~$culture~0.0.1.0\"; "
+                "$cap=Get-WindowsCapability -Online | Where-Object { $_.Name -eq $basic }; "
+                "if(-not $cap -or $cap.State -ne 'Installed'){ Add-WindowsCapability -Online -Name $basic | Out-Null; "
+                "$cap=Get-WindowsCapability -Online -Name $basic }; "
+                "Write-Output \"CAPABILITY_STATE=$($cap.State)\"; "
+            )
+        ps_cmd += (
+            "Set-Culture -CultureInfo $culture; "
+            "$list = New-Object System.Collections.Generic.List[System.String]; "
+            "$list.Add($culture); "
+            "Set-WinUserLanguageList -LanguageList $list -Force | Out-Null"
+        )
         try:
-            target_locale = self.default_locale or self.load_config()
-            if not target_locale:
-                return False, "No default locale saved in configuration."
-            return self.apply_locale_quick(target_locale)
+            result = self.run_powershell(ps_cmd, timeout=60)
+        except Exception:
+            # Best-effort; ignore failures here
+            return "capability cache hit" if cache_hit else "capability cache miss"
+
+        if cache_hit:
+            if result.returncode != 0:
+                # Set-Culture failed although the pack was cached as installed; rescan next time
+                self.capability_cache.invalidate(culture)
+            return "capability cache hit"
+        for line in (result.stdout or "").splitlines():
+            if line.startswith("CAPABILITY_STATE="):
+                state = line.split("=", 1)[1].strip()
+                if state:
+                    self.capability_cache.record(culture, state)
+        return "capability cache miss"
+
+    # --- COOLDOWN / READINESS PROBE ---
+    # Each probe starts a powershell process: the first follows the apply at once, later ones
+    # back off from PROBE_INTERVAL to PROBE_INTERVAL_MAX seconds apart
+    PROBE_INTERVAL = 0.5
+    PROBE_INTERVAL_MAX = 2.0
+
+    def _start_cooldown(self, values):
+        self.cooldown.start(
+            {"locale": values.get("LocaleName"), "decimal": values.get("sDecimal")}, self.cooldown_max
+        )
+
+    def probe_culture(self):
+        """Ask a freshly started process which culture it sees.
+
+        Returns {"culture", "decimal", "parsed"} where "parsed" is how "1.5"
+        parses under that culture (15 when "." is the group separator), or
+        None if the probe could not run.
+        """
+        ps_cmd = (
+            "$c=[cultureinfo]::CurrentCulture; $v=0.0; [void][double]::TryParse('1.5', [ref]$v); "
+            "Write-Output ('PROBE=' + $c.Name + '|' + $c.NumberFormat.NumberDecimalSeparator + '|' + "
+            "$v.ToString([cultureinfo]::InvariantCulture))"
+        )
+        try:
+            with span("probe"):
+                # Deliberately a new process: a persistent host keeps the culture it started with
+                result = self.backend.run_shell(
+                    ["powershell", "-NoProfile", "-NonInteractive", "-Command", ps_cmd], timeout=10
+                )
         except Exception as e:
-            return False, f"Failed to revert: {e}"
+            print(f"Culture probe error: {e}")
+            return None
+        for line in (result.stdout or "").splitlines():
+            if line.startswith("PROBE="):
+                parts = line[len("PROBE="):].strip().split("|")
+                if len(parts) == 3:
+                    return {"culture": parts[0], "decimal": parts[1], "parsed": parts[2]}
+        return None
 
-    def save_config(self):
-        """Save configuration to file"""
-        config = {
-            "default_locale": self.default_locale,
-            "last_saved": datetime.now().isoformat()
-        }
+    def _probe_due(self, token):
+        """True if the backoff schedule for this cooldown allows another probe now."""
+        now = time.monotonic()
+        schedule = self._probe_schedule
+        if schedule is None or schedule[0] != token.get("started"):
+            # A new cooldown: probe now, then after PROBE_INTERVAL
+            self._probe_schedule = (token.get("started"), now + self.PROBE_INTERVAL, self.PROBE_INTERVAL)
+            return True
+        started, next_probe, interval = schedule
+        if now < next_probe:
+            return False
+        interval = min(interval * 2, self.PROBE_INTERVAL_MAX)
+        self._probe_schedule = (started, now + interval, interval)
+        return True
+
+    def check_cooldown(self):
+        """Probe (when the backoff allows) and end the shared cooldown if the expected culture is live.
+
+        Returns the seconds left (0 when no cooldown is active any more).
+        Calls between probes only read the token, so callers may poll often.
+        """
+        token = self.cooldown.read()
+        if token is None:
+            return 0.0
+        if not self._probe_due(token):
+            return self.cooldown.remaining()
+        expected = token.get("expected") or {}
+        probe = self.probe_culture()
+        if probe is not None:
+            culture_ok = not expected.get("locale") or probe["culture"].lower() == expected["locale"].lower()
+            decimal_ok = not expected.get("decimal") or probe["decimal"] == expected["decimal"]
+            if culture_ok and decimal_ok:
+                self.cooldown.finish()
+                return 0.0
+        return self.cooldown.remaining()
+
+    def wait_for_cooldown(self, interval=0.5):
+        """Block until the shared cooldown ends (probe confirmed or upper bound); returns seconds waited."""
+        started = time.monotonic()
+        remaining = self.check_cooldown()
+        while remaining > 0:
+            time.sleep(min(interval, remaining))
+            remaining = self.check_cooldown()
+        return time.monotonic() - started
+
+    def restore_snapshot(self, snapshot, verify_timeout=None, progress=None, cancel_event=None,
+                         broadcast_mode=None, window_timeout_ms=None):
+        """Put the International key back exactly as captured in `snapshot`.
+
+        Changed values are rewritten and values added since are deleted in one
+        batched write, followed by flush, broadcast and verification. Only the
+        language list is re-synced; Set-Culture would overwrite the restored
+        customisations.
+
+        Returns: (success: bool, message: str)
+        """
+        broadcast = self._broadcast_options(broadcast_mode, window_timeout_ms)
+        with self._operation_lock, span("restore", snapshot=snapshot.get("id")) as record:
+            record["ok"], message = self._restore_snapshot(snapshot, verify_timeout, progress, cancel_event, broadcast)
+            return record["ok"], message
+
+    def _restore_snapshot(self, snapshot, verify_timeout, progress, cancel_event, broadcast_options):
+        if verify_timeout is None:
+            verify_timeout = self.verify_timeout
+        values = snapshot["values"]
+        from locale_snapshots import added_since
+        locale_name = values.get("LocaleName") or snapshot.get("locale") or "snapshot"
+        watcher = self._open_watcher()
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self._enter_phase("write", f"Restoring {locale_name} snapshot...", progress, cancel_event)
+            _, current = self._international_state()
+            writes = self._registry_delta(current, values)
+            deletes = added_since(snapshot, current)
+            if writes or deletes:
+                with span("restore.write", values=len(writes), deleted=len(deletes)):
+                    self.backend.write_values(HKCU, INTERNATIONAL_KEY, writes, delete=deletes)
+                try:
+                    with span("restore.flush"):
+                        self.backend.flush_key(HKCU, INTERNATIONAL_KEY)
+                except Exception:
+                    pass
+
+                self._enter_phase("broadcast", "Broadcasting setting change...", progress, cancel_event)
+                with span("restore.broadcast"):
+                    broadcast = self._broadcast_setting_change(broadcast_options)
+
+                self._enter_phase("verify", "Verifying registry values...", progress, cancel_event)
+                with span("restore.verify") as record:
+                    verified = record["verified"] = self._wait_for_locale(values, watcher, verify_timeout)
+
+                self._enter_phase("culture", "Syncing language list...", progress, cancel_event)
+                with span("restore.culture"):
+                    self._sync_language_list(locale_name)
+            else:
+                verified = True
+                broadcast = None
+
+            self.snapshots.mark_restored(snapshot["id"])
+            self.current_locale = locale_name
+            self.locale_state.invalidate()
+            if writes or deletes:
+                self._start_cooldown(values)
+            message = f"Regional format restored to {locale_name} ({len(writes)} changed, {len(deletes)} removed)"
+            if not verified:
+                message += f" (not verified within {verify_timeout:g}s)"
+            if broadcast is not None:
+                message += f" [{self._broadcast_note(broadcast)}]"
+            return True, message
+        except OperationCancelled as e:
+            return False, f"Cancelled before {e} phase"
+        except PermissionError:
+            return False, "Permission denied. Please run as Administrator."
         except Exception as e:
-            print(f"Error saving config: {e}")
-    
-    def load_config(self):
-        """Load configuration from file"""
+            return False, f"Failed to restore snapshot: {e}"
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def _sync_language_list(self, culture):
+        """Set the user language list to `culture` without touching the regional format."""
+        from locale_profiles import is_locale_name
+        if not is_locale_name(culture):
+            # Restored from a snapshot of the registry, so not necessarily one of ours
+            print(f"Not syncing the language list to {culture!r}: not a locale name")
+            return
+        ps_cmd = (
+            "$list = New-Object System.Collections.Generic.List[System.String]; "
+            f"$list.Add({_ps_quote(culture)}); "
+            "Set-WinUserLanguageList -LanguageList $list -Force | Out-Null"
+        )
+        try:
+            self.run_powershell(ps_cmd, timeout=60)
+        except Exception:
+            # Best-effort; ignore failures here
+            pass
+
+    def revert_to_default_quick(self, progress=None, cancel_event=None, broadcast_mode=None, window_timeout_ms=None):
+        """Revert regional format to the snapshot taken before the last apply.
+
+        Falls back to the saved default locale's profile when no snapshot
+        has been taken yet.
+        """
+        broadcast = {"broadcast_mode": broadcast_mode, "window_timeout_ms": window_timeout_ms}
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get("default_locale")
+            # Held across choosing the snapshot and restoring it, so a concurrent apply cannot slip in between
+            with self._operation_lock:
+                snapshot = self.snapshots.latest()
+                if snapshot:
+                    return self.restore_snapshot(snapshot, progress=progress, cancel_event=cancel_event, **broadcast)
+                target_locale = self.default_locale or self.load_config()
+                if not target_locale:
+                    return False, "No default locale saved in configuration."
+                return self.apply_locale_quick(
+                    target_locale, progress=progress, cancel_event=cancel_event, snapshot=False, **broadcast
+                )
         except Exception as e:
-            print(f"Error loading config: {e}")
-        return None
+            return False, f"Failed to revert: {e}"
+
+    # --- ALL USERS (ADMIN MODE) ---
+    def apply_to_all_users(self, locale_name=None, revert=False, max_workers=4, broadcast_mode=None, window_timeout_ms=None):
+        """Apply `locale_name` (or revert) in the hive of every user profile on the machine, concurrently.
+
+        Hives of signed-out users are loaded from NTUSER.DAT for the duration.
+        Each hive gets its own snapshot history, so revert puts back exactly
+        what that user had; without a snapshot it falls back to the saved
+        default locale. Needs admin rights.
+
+        Returns {sid: {"success", "message", "profile", "loaded_on_demand", "ms"}}.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from user_hives import list_profiles
+        target_locale = None if revert else (locale_name or "en-US")
+        broadcast = self._broadcast_options(broadcast_mode, window_timeout_ms)
+        with self._operation_lock, span("hives", revert=revert) as record:
+            profiles = list_profiles(self.backend)
+            record["profiles"] = len(profiles)
+            results = {}
+            if not profiles:
+                return results
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(profiles))),
+                                    thread_name_prefix="hive") as executor:
+                futures = {
+                    # Copied context keeps "hives" as the parent of each per-hive span
+                    profile.sid: executor.submit(contextvars.copy_context().run, self._apply_to_hive, profile, target_locale)
+                    for profile in profiles
+                }
+                for sid, future in futures.items():
+                    results[sid] = future.result()
+            record["ok"] = all(result["success"] for result in results.values())
+        if any(result.get("changed") for result in results.values()):
+            # The signed-in user's session is among them; let its windows pick the change up
+            self.locale_state.invalidate()
+            self._broadcast_setting_change(broadcast)
+        return results
+
+    def _hive_snapshots(self, sid):
+        from locale_snapshots import SnapshotStore
+        os.makedirs(self.hive_snapshot_dir, exist_ok=True)
+        return SnapshotStore(os.path.join(self.hive_snapshot_dir, f"{sid}.json"))
+
+    def _apply_to_hive(self, profile, locale_name):
+        """Apply `locale_name` (None: revert) in one profile's hive; never raises."""
+        from locale_snapshots import added_since
+        from user_hives import mounted_hive
+        started = time.perf_counter()
+        result = {"profile": profile.profile_path, "loaded_on_demand": not profile.loaded, "changed": False}
+        try:
+            with span("hives.apply", sid=profile.sid) as record, mounted_hive(self.backend, profile) as hive:
+                key_path = f"{hive}\\{INTERNATIONAL_KEY}"
+                current = self.backend.read_values(HKU, key_path)
+                snapshots = self._hive_snapshots(profile.sid)
+                deletes = []
+                snapshot = None
+                if locale_name is not None:
+                    writes = self._registry_delta(current, self.get_locale_overrides(locale_name))
+                    if writes and snapshots.pending() is None:
+                        snapshots.capture(current, current.get("LocaleName"))
+                    message = f"Regional format set to {locale_name}"
+                else:
+                    snapshot = snapshots.latest()
+                    if snapshot:
+                        values = snapshot["values"]
+                        writes = self._registry_delta(current, values)
+                        deletes = added_since(snapshot, current)
+                        restored = values.get("LocaleName") or snapshot.get("locale")
+                    else:
+                        restored = self.default_locale or self.load_config()
+                        if not restored:
+                            raise ValueError("No snapshot and no default locale saved")
+                        writes = self._registry_delta(current, self.get_locale_overrides(restored))
+                    message = f"Regional format restored to {restored}"
+                if writes or deletes:
+                    self.backend.write_values(HKU, key_path, writes, delete=deletes)
+                    try:
+                        self.backend.flush_key(HKU, key_path)
+                    except Exception:
+                        pass
+                    result["changed"] = True
+                    message += f" ({len(writes)} changed, {len(deletes)} removed)"
+                else:
+                    message += " (already set)"
+                if snapshot:
+                    snapshots.mark_restored(snapshot["id"])
+                record["changed"] = result["changed"]
+            result.update(success=True, message=message)
+        except PermissionError:
+            result.update(success=False, message="Permission denied. Please run as Administrator.")
+        except FileNotFoundError as e:
+            result.update(success=False, message=f"Hive or key not found: {e}")
+        except Exception as e:
+            result.update(success=False, message=f"Failed: {e}")
+        result["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def save_config(self):
+        """Save configuration (written in the background, see ConfigStore)"""
+        self.config.set(default_locale=self.default_locale)
+
+    def load_config(self):
+        """Load configuration (from memory after the first read)"""
+        return self.config.get("default_locale")
+
+    def flush_config(self):
+        """Write any pending config changes to disk now."""
+        for name in ("config", "game_config"):
+            # A store that was never built has nothing to write
+            store = self.__dict__.get(name)
+            if store is not None:
+                store.flush()
 
     # --- GAME PATH CONFIG ---
     def _get_app_dir(self):
@@ -270,70 +941,49 @@ class RegionalFormatChanger:
             return os.getcwd()
 
     def save_game_path(self, game_path: str):
-        """Persist game path to separate config file."""
-        try:
-            data = {"game_path": game_path, "last_saved": datetime.now().isoformat()}
-            with open(self.game_config_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving game path: {e}")
+        """Persist game path to separate config file (debounced)."""
+        self.game_config.set(game_path=game_path)
 
     def load_game_path(self):
         """Load game path from separate config file."""
+        return self.game_config.get("game_path")
+
+    def find_game_exe(self):
+        """Return Crossfire_Legion.exe from the Steam libraries (full game before Demo), or None."""
         try:
-            if os.path.exists(self.game_config_file):
-                with open(self.game_config_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get("game_path")
+            return self.steam.game_exe()
         except Exception as e:
-            print(f"Error loading game path: {e}")
-        return None
+            print(f"Error resolving Steam library: {e}")
+            return None
 
     def launch_crossfire_legion(self):
         """Launch Crossfire: Legion via Steam"""
+        with span("launch.steam") as record:
+            record["ok"], message = self._launch_crossfire_legion()
+            return record["ok"], message
+
+    def _launch_crossfire_legion(self):
         try:
-            # Get Steam install path from registry
-            steam_path = None
-            try:
-                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                                  r"SOFTWARE\WOW6432Node\Valve\Steam") as key:
-                    steam_path = winreg.QueryValueEx(key, "InstallPath")[0]
-            except:
-                try:
-                    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, 
-                                      r"SOFTWARE\Valve\Steam") as key:
-                        steam_path = winreg.QueryValueEx(key, "InstallPath")[0]
-                except:
-                    pass
-            
-            if not steam_path:
-                # Try current user registry
-                try:
-                    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-                                      r"SOFTWARE\Valve\Steam") as key:
-                        steam_path = winreg.QueryValueEx(key, "SteamPath")[0]
-                except:
-                    pass
-            
-            if steam_path:
-                # Try launching via Steam, hide console window
-                steam_exe = os.path.join(steam_path, "Steam.exe")
-                if os.path.exists(steam_exe):
-                    si = subprocess.STARTUPINFO()
-                    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    si.wShowWindow = 0  # SW_HIDE
-                    subprocess.Popen([steam_exe, "-applaunch", "1072190"], shell=True, startupinfo=si)
-                    return True, "Launching via Steam..."
-                else:
-                    return False, "Steam executable not found"
-            else:
+            steam_exe = self.steam.steam_exe()
+            if not steam_exe:
                 return False, "Steam installation not found in registry"
-                
+            if not os.path.exists(steam_exe):
+                return False, "Steam executable not found"
+            # Steam.exe is a GUI process: spawn it directly instead of through cmd.exe
+            # The full game's appid, or the Demo's when only the Demo is installed
+            self.backend.spawn([steam_exe, "-applaunch", self.steam.app_id()], hidden=True)
+            self.game_process = None
+            return True, "Launching via Steam..."
         except Exception as e:
             return False, f"Error launching via Steam: {e}"
 
     def launch_manual_path(self, game_path):
         """Launch Crossfire: Legion from manually specified path"""
+        with span("launch.manual") as record:
+            record["ok"], message = self._launch_manual_path(game_path)
+            return record["ok"], message
+
+    def _launch_manual_path(self, game_path):
         try:
             if not game_path or not os.path.exists(game_path):
                 return False, "Invalid game path specified"
@@ -341,27 +991,95 @@ class RegionalFormatChanger:
                 return False, "Path must point to Crossfire_Legion.exe"
             exe_dir = os.path.dirname(game_path)
             try:
-                DETACHED_PROCESS = 0x00000008
-                CREATE_NO_WINDOW = 0x08000000
-                subprocess.Popen(
-                    [game_path], cwd=exe_dir, shell=False,
-                    creationflags=DETACHED_PROCESS | CREATE_NO_WINDOW
-                )
+                self.game_process = self.backend.spawn([game_path], cwd=exe_dir, detached=True)
             except Exception:
+                self.game_process = None
                 # Fallback via PowerShell Start-Process with WorkingDirectory, hide window
                 ps_cmd = f"Start-Process -FilePath \"{game_path}\" -WorkingDirectory \"{exe_dir}\" -WindowStyle Hidden"
-                subprocess.run(
-                    ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", ps_cmd],
-                    capture_output=True, text=True, shell=True, timeout=15,
-                    startupinfo=self._get_hidden_startupinfo()
-                )
+                self.run_powershell(ps_cmd, timeout=15)
             return True, f"Game launched from: {os.path.dirname(game_path)}"
         except Exception as e:
             return False, f"Error launching game: {e}"
 
-    def _get_hidden_startupinfo(self):
-        """Helper to get a STARTUPINFO object with hidden window for subprocess."""
-        si = subprocess.STARTUPINFO()
-        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        si.wShowWindow = 0  # SW_HIDE
-        return si
+    # --- GAME LIFECYCLE ---
+    def watch_game(self, on_exit, appear_timeout=180.0):
+        """Follow the last launched game in the background and call on_exit(found, message) when it ends.
+
+        Direct launches are followed by PID; Steam launches by waiting for
+        Crossfire_Legion.exe to appear. Replaces any previous watcher.
+        """
+        from game_watcher import GameWatcher
+        self.stop_game_watch()
+        pid = self.game_process.pid if self.game_process is not None else None
+        self.game_watcher = GameWatcher(appear_timeout=appear_timeout)
+        self.game_watcher.start(on_exit, pid=pid)
+
+    def wait_for_game_exit(self, appear_timeout=180.0):
+        """Block until the last launched game exits; returns (found, message)."""
+        from game_watcher import GameWatcher
+        pid = self.game_process.pid if self.game_process is not None else None
+        watcher = GameWatcher(appear_timeout=appear_timeout)
+        try:
+            return watcher.wait(pid)
+        finally:
+            watcher.stop()
+
+    def game_running(self):
+        """True if Crossfire_Legion.exe is running (however it was started)."""
+        from game_watcher import GAME_EXE, find_pids
+        try:
+            return bool(find_pids(GAME_EXE))
+        except Exception as e:
+            print(f"Error looking up game process: {e}")
+            return False
+
+    def stop_game_watch(self):
+        """Stop the background game watcher, if any, without reverting."""
+        if self.game_watcher is not None:
+            self.game_watcher.stop()
+            self.game_watcher = None
+
+    # --- PLAYER.LOG ---
+    def player_log_tailer(self, log_path=None):
+        """Tailer for Player.log that resumes from the persisted offset."""
+        from player_log import PlayerLogTailer
+        return PlayerLogTailer(log_path, state_file=self.player_log_state_file)
+
+    def monitor_player_log(self, on_result, timeout=300.0, log_path=None):
+        """Report the next game start's timestep verdict via on_result(ok, line, culture).
+
+        Call before launching: everything already in Player.log is skipped, so
+        only lines the new game writes are checked.
+        """
+        from player_log import TimestepMonitor
+        self.stop_log_monitor()
+        tailer = self.player_log_tailer(log_path)
+        tailer.skip_to_end()
+        self.log_monitor = TimestepMonitor(on_result, tailer=tailer, timeout=timeout)
+        self.log_monitor.start()
+        return self.log_monitor
+
+    def stop_log_monitor(self):
+        """Stop following Player.log, if a monitor is running."""
+        if self.log_monitor is not None:
+            self.log_monitor.stop()
+            self.log_monitor = None
+
+    def archive_player_log(self, locale=None, log_path=None):
+        """Copy the finished session's Player.log into the log archive.
+
+        Call on game exit, before reverting, so the session is indexed under
+        the locale that was in effect while it ran. Returns the index entry or None.
+        """
+        # Imported here: the process pool machinery is only needed when analyzing
+        from log_analyzer import LogArchive, exe_version
+        from player_log import PLAYER_LOG, default_log_dir
+        try:
+            locale = locale or self.get_current_locale().get("locale")
+            return LogArchive(self.log_archive_dir).archive(
+                log_path or os.path.join(default_log_dir(), PLAYER_LOG),
+                locale=locale, version=exe_version(self.load_game_path()),
+            )
+        except Exception as e:
+            print(f"Error archiving Player.log: {e}")
+            return None
@@ -0,0 +1,184 @@
+"""Long-lived shell processes that run scripts sent over stdin.
+
+Starting `powershell` costs 0.5-2s before any work happens; a ShellHost
+starts it once and then runs each script in the same process. The framing
+is one line per message so script text and output never need escaping:
+
+    request:  "<id> <base64 utf-8 script>\\n"
+    response: "<id> <returncode> <base64 stdout> <base64 stderr>\\n"
+
+A host that crashed is restarted before the next command; one that does
+not answer within the command's timeout is killed (and restarted on next
+use). The stand-in host runs each script with `sh -c`, so the protocol,
+restarts and timeouts can be exercised on Linux.
+"""
+import base64
+import itertools
+import queue
+import subprocess
+import sys
+import threading
+
+# Read-eval loop run inside powershell; errors in the script (or a failing native
+# command) give returncode 1, like `powershell -Command` does for its last statement
+_POWERSHELL_LOOP = r"""
+$enc = New-Object System.Text.UTF8Encoding($false)
+[Console]::OutputEncoding = $enc
+while (($line = [Console]::In.ReadLine()) -ne $null) {
+    $id, $body = $line.Split(' ', 2)
+    $script = $enc.GetString([Convert]::FromBase64String($body))
+    $Error.Clear(); $global:LASTEXITCODE = 0; $rc = 0; $out = ''
+    try { $out = & ([scriptblock]::Create($script)) 2>$null | Out-String -Width 4096 } catch { $rc = 1 }
+    if ($Error.Count -or $LASTEXITCODE) { $rc = 1 }
+    $err = $Error | Out-String -Width 4096
+    [Console]::Out.WriteLine("$id $rc " + [Convert]::ToBase64String($enc.GetBytes([string]$out)) + ' ' + [Convert]::ToBase64String($enc.GetBytes([string]$err)))
+    [Console]::Out.Flush()
+}
+"""
+
+POWERSHELL_HOST_ARGV = [
+    "powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+    "-EncodedCommand", base64.b64encode(_POWERSHELL_LOOP.encode("utf-16-le")).decode("ascii"),
+]
+
+_STANDIN_LOOP = r"""
+import base64, subprocess, sys
+b64 = lambda data: base64.b64encode(data).decode("ascii")
+for line in sys.stdin:
+    request_id, _, body = line.rstrip("\n").partition(" ")
+    result = subprocess.run(["sh", "-c", base64.b64decode(body).decode("utf-8")], capture_output=True)
+    sys.stdout.write(f"{request_id} {result.returncode} {b64(result.stdout)} {b64(result.stderr)}\n")
+    sys.stdout.flush()
+"""
+
+STANDIN_HOST_ARGV = [sys.executable, "-c", _STANDIN_LOOP]
+
+
+class ShellHostError(Exception):
+    """The host died or answered out of protocol; the command may not have run."""
+
+
+class ShellHost:
+    """One persistent shell process; run() sends a script and waits for its framed reply."""
+
+    def __init__(self, argv, **popen_kwargs):
+        self.argv = list(argv)
+        self.popen_kwargs = popen_kwargs
+        self.process = None
+        self.starts = 0
+        self._replies = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            self.argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            **self.popen_kwargs
+        )
+        self.starts += 1
+        # Pipes cannot be polled with a timeout on Windows; a reader thread queues each reply line
+        self._replies = queue.Queue()
+        threading.Thread(
+            target=self._read_replies, args=(self.process.stdout, self._replies),
+            name="shell-host-reader", daemon=True
+        ).start()
+
+    @staticmethod
+    def _read_replies(stream, replies):
+        for line in iter(stream.readline, b""):
+            replies.put(line)
+        replies.put(None)  # EOF: the host exited
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, script, timeout=None):
+        """Run `script` in the host and return a CompletedProcess.
+
+        Raises subprocess.TimeoutExpired (after killing the host) when no
+        reply arrives within `timeout` seconds, and ShellHostError when the
+        host exits while the command runs.
+        """
+        with self._lock:
+            if not self.alive():
+                self._start()
+            request_id = next(self._ids)
+            body = base64.b64encode(script.encode("utf-8")).decode("ascii")
+            try:
+                self.process.stdin.write(f"{request_id} {body}\n".encode("ascii"))
+                self.process.stdin.flush()
+            except OSError as e:
+                self._kill()
+                raise ShellHostError(f"Shell host stopped accepting commands: {e}")
+            try:
+                line = self._replies.get(timeout=timeout)
+            except queue.Empty:
+                self._kill()
+                raise subprocess.TimeoutExpired(self.argv[0], timeout)
+            if line is None:
+                self._kill()
+                raise ShellHostError("Shell host exited while running a command")
+            try:
+                reply_id, returncode, stdout, stderr = (line.decode("ascii").rstrip("\r\n").split(" ") + ["", ""])[:4]
+                if int(reply_id) != request_id:
+                    raise ValueError(f"reply {reply_id} for request {request_id}")
+                return subprocess.CompletedProcess(
+                    script, int(returncode),
+                    base64.b64decode(stdout).decode("utf-8", "replace"),
+                    base64.b64decode(stderr).decode("utf-8", "replace"),
+                )
+            except ValueError as e:
+                self._kill()
+                raise ShellHostError(f"Unexpected shell host reply: {e}")
+
+    def _kill(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.kill()
+            process.wait(5)
+        except Exception:
+            pass
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def close(self):
+        """Stop the host (it also exits by itself when our end of stdin closes)."""
+        with self._lock:
+            self._kill()
+
+
+class ShellHostPool:
+    """Up to `size` hosts started on demand, so a slow command never queues a quick one."""
+
+    def __init__(self, argv, size=2, **popen_kwargs):
+        self.hosts = [ShellHost(argv, **popen_kwargs) for _ in range(size)]
+        self._idle = queue.LifoQueue()
+        for host in reversed(self.hosts):
+            self._idle.put(host)
+
+    @classmethod
+    def standin(cls, size=2):
+        """Pool of `sh -c` hosts speaking the same protocol (for tests off Windows)."""
+        return cls(STANDIN_HOST_ARGV, size)
+
+    def run(self, script, timeout=None):
+        # LIFO hands out the most recently used, already running host first
+        host = self._idle.get()
+        try:
+            return host.run(script, timeout)
+        finally:
+            self._idle.put(host)
+
+    @property
+    def starts(self):
+        """Host processes started so far (restarts included)."""
+        return sum(host.starts for host in self.hosts)
+
+    def close(self):
+        for host in self.hosts:
+            host.close()
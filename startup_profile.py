@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Records how long each import/init phase of the app takes.
+
+    Offsets are measured from the moment the profile was created, which
+    should be the first statement of the entry script.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []  # (name, offset_s, duration_s)
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started, time.perf_counter() - start))
+
+    def mark(self, name):
+        """Record a zero-length milestone (e.g. "first frame")."""
+        self.phases.append((name, time.perf_counter() - self.started, 0.0))
+
+    def report(self):
+        """Return the phases as a printable table."""
+        lines = [f"{'phase':<32}{'at':>10}{'took':>10}"]
+        for name, offset, duration in self.phases:
+            lines.append(f"{name:<32}{offset * 1000:>8.1f}ms{duration * 1000:>8.1f}ms")
+        lines.append(f"{'total':<32}{(time.perf_counter() - self.started) * 1000:>8.1f}ms")
+        return "\n".join(lines)
+
+    def print_report(self):
+        """Print the report once, if profiling is enabled."""
+        if self.enabled and not self.reported:
+            self.reported = True
+            print(self.report(), flush=True)
@@ -0,0 +1,227 @@
+import os
+import re
+import threading
+import time
+
+from os_backend import HKCU, HKLM
+
+STEAM_APP_ID = "1072190"
+GAME_EXE_NAME = "Crossfire_Legion.exe"
+# appmanifest_<appid>.acf; the Demo is a separate Steam app with its own appid and manifest
+APP_MANIFEST = re.compile(r"appmanifest_(\d+)\.acf$", re.IGNORECASE)
+
+# Checked in order; HKCU is where a per-user Steam install always registers itself
+STEAM_PATH_KEYS = (
+    (HKCU, r"SOFTWARE\Valve\Steam", "SteamPath"),
+    (HKLM, r"SOFTWARE\WOW6432Node\Valve\Steam", "InstallPath"),
+    (HKLM, r"SOFTWARE\Valve\Steam", "InstallPath"),
+)
+
+
+# --- VDF PARSING ---
+# Whitespace, // comment, brace, quoted string (group 1) or bare word
+VDF_TOKEN = re.compile(r'\s+|//[^\n]*(?:\n|$)|[{}]|"((?:[^"\\]|\\.)*)"|[^\s{}"]+', re.DOTALL)
+VDF_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t"}
+
+
+def _tokens(f, chunk_size=64 * 1024):
+    """Yield VDF tokens ("{", "}" or a string) from a text file, reading it in chunks."""
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        match = VDF_TOKEN.match(buffer, pos)
+        # A token touching the end of the buffer may continue in the next chunk
+        if match is None or (match.end() == len(buffer) and not eof):
+            if eof:
+                if pos < len(buffer):
+                    raise ValueError(f"Malformed VDF near {buffer[pos:pos + 20]!r}")
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        pos = match.end()
+        text = match.group(0)
+        if match.group(1) is not None:
+            yield VDF_ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), match.group(1))
+        elif text in "{}" or not (text[0].isspace() or text.startswith("//")):
+            yield text
+
+
+def parse_vdf(path):
+    """Parse a Valve KeyValues text file (libraryfolders.vdf, *.acf) into nested dicts."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        root = {}
+        stack = [root]
+        key = None
+        for token in _tokens(f):
+            if token == "{":
+                child = {}
+                stack[-1][key] = child
+                stack.append(child)
+                key = None
+            elif token == "}":
+                if len(stack) > 1:
+                    stack.pop()
+                key = None
+            elif key is None:
+                key = token
+            else:
+                stack[-1][key] = token
+                key = None
+        return root
+
+
+# --- LIBRARY RESOLUTION ---
+class SteamLibrary:
+    """Finds the Steam install and the game's folder across all Steam libraries.
+
+    Installs are found through the libraries' appmanifest files: the full
+    game's (STEAM_APP_ID) and any other app whose install folder holds
+    Crossfire_Legion.exe, i.e. the Demo. Parsed VDF/ACF files are cached
+    keyed by mtime, and resolved results are served from memory; file and
+    steamapps folder mtimes are re-checked at most every
+    `revalidate_interval` seconds, so repeat lookups do not touch the disk.
+    """
+
+    def __init__(self, backend, revalidate_interval=30.0):
+        self.backend = backend
+        self.revalidate_interval = revalidate_interval
+        self._steam_path = None
+        self._files = {}      # path -> (mtime_ns, parsed dict)
+        self._result = None   # (checked_at, {path: mtime_ns}, [(install dir, appid)])
+        self._lock = threading.Lock()
+
+    def steam_path(self):
+        """Return the Steam install folder from the registry, or None."""
+        if self._steam_path is None:
+            for root, path, name in STEAM_PATH_KEYS:
+                try:
+                    value = self.backend.read_value(root, path, name)
+                except Exception:
+                    continue
+                if value:
+                    self._steam_path = os.path.normpath(value)
+                    break
+        return self._steam_path
+
+    def steam_exe(self):
+        steam_path = self.steam_path()
+        return os.path.join(steam_path, "Steam.exe") if steam_path else None
+
+    def _parse_cached(self, path, seen):
+        """Parse `path` unless it is unchanged since the last parse; records its mtime in `seen`."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            seen[path] = None
+            return None
+        seen[path] = mtime
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            parsed = parse_vdf(path)
+        except (OSError, ValueError) as e:
+            print(f"Error parsing {path}: {e}")
+            parsed = None
+        self._files[path] = (mtime, parsed)
+        return parsed
+
+    def library_folders(self, seen=None):
+        """Return every Steam library folder (the Steam folder itself first)."""
+        seen = {} if seen is None else seen
+        steam_path = self.steam_path()
+        if not steam_path:
+            return []
+        folders = [steam_path]
+        data = self._parse_cached(os.path.join(steam_path, "steamapps", "libraryfolders.vdf"), seen) or {}
+        entries = data.get("libraryfolders") or data.get("LibraryFolders") or {}
+        for key, entry in entries.items():
+            # New format: {"0": {"path": ...}}; old format: {"1": "D:\\SteamLibrary"}
+            path = entry.get("path") if isinstance(entry, dict) else (entry if key.isdigit() else None)
+            if path:
+                path = os.path.normpath(path)
+                if path.lower() not in (f.lower() for f in folders):
+                    folders.append(path)
+        return folders
+
+    def _manifests(self, steamapps, seen):
+        """Yield (appid, manifest path) for every appmanifest in a library."""
+        try:
+            # Installing or removing an app adds or deletes a manifest, which changes the folder's mtime
+            seen[steamapps] = os.stat(steamapps).st_mtime_ns
+            names = os.listdir(steamapps)
+        except OSError:
+            seen[steamapps] = None
+            return
+        for name in sorted(names):
+            match = APP_MANIFEST.match(name)
+            if match:
+                yield match.group(1), os.path.join(steamapps, name)
+
+    def _resolve(self, seen):
+        installs = []
+        for library in self.library_folders(seen):
+            steamapps = os.path.join(library, "steamapps")
+            for appid, path in self._manifests(steamapps, seen):
+                install_dir = ((self._parse_cached(path, seen) or {}).get("AppState") or {}).get("installdir")
+                if not install_dir:
+                    continue
+                folder = os.path.join(steamapps, "common", install_dir)
+                if os.path.isfile(os.path.join(folder, GAME_EXE_NAME)):
+                    installs.append((folder, appid))
+        # The full game before the Demo
+        installs.sort(key=lambda install: install[1] != STEAM_APP_ID)
+        return installs
+
+    def _stale(self, files):
+        for path, mtime in files.items():
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                return True
+        return False
+
+    def _installs(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._result is not None:
+                checked_at, files, installs = self._result
+                if now - checked_at < self.revalidate_interval:
+                    return list(installs)
+                if not self._stale(files):
+                    self._result = (now, files, installs)
+                    return list(installs)
+            seen = {}
+            installs = self._resolve(seen)
+            self._result = (now, seen, installs)
+            return list(installs)
+
+    def install_dirs(self):
+        """Return folders containing Crossfire_Legion.exe, full game first, then the Demo."""
+        return [folder for folder, _ in self._installs()]
+
+    def app_id(self):
+        """Steam appid of the install game_exe() picks (the Demo's own when only it is installed)."""
+        installs = self._installs()
+        return installs[0][1] if installs else STEAM_APP_ID
+
+    def game_exe(self):
+        """Return the path of the installed Crossfire_Legion.exe, or None."""
+        installs = self.install_dirs()
+        if installs and not os.path.isfile(os.path.join(installs[0], GAME_EXE_NAME)):
+            # Uninstalled or moved since it was cached: resolve again rather than hand out a dead path
+            self.invalidate()
+            installs = self.install_dirs()
+        return os.path.join(installs[0], GAME_EXE_NAME) if installs else None
+
+    def invalidate(self):
+        """Forget resolved results so the next lookup re-checks the files."""
+        with self._lock:
+            self._result = None
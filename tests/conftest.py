@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capability_cache import CapabilityCache  # noqa: E402
+from cooldown import CooldownToken  # noqa: E402
+from locale_snapshots import SnapshotStore  # noqa: E402
+from os_backend import HKCU, INTERNATIONAL_KEY, InMemoryBackend  # noqa: E402
+from regional_utils import RegionalFormatChanger  # noqa: E402
+
+
+def fake_powershell(args):
+    """Stand-in for the culture-sync script: report the language pack as installed."""
+    if "Get-WindowsCapability" in args[-1]:
+        return 0, "CAPABILITY_STATE=Installed\n", ""
+    return 0, "", ""
+
+
+def build_changer(state_dir, start_locale="de-DE", latency=0.0):
+    """RegionalFormatChanger on an in-memory registry seeded with start_locale.
+
+    Every state file lives under `state_dir` and the cooldown upper bound is
+    short, so tests neither touch the app folder nor wait 15 seconds.
+    """
+    rfc = RegionalFormatChanger(backend=InMemoryBackend(shell_handler=fake_powershell))
+    rfc.backend.latency.update({op: latency for op in InMemoryBackend.OPERATIONS})
+    rfc.backend.set_key(HKCU, INTERNATIONAL_KEY, rfc.get_locale_overrides(start_locale))
+    rfc.capability_cache = CapabilityCache(os.path.join(state_dir, "capability_cache.json"))
+    rfc.snapshots = SnapshotStore(os.path.join(state_dir, "region_snapshots.json"))
+    rfc.cooldown = CooldownToken(os.path.join(state_dir, "cooldown.token"))
+    rfc.cooldown_max = 0.05
+    rfc.hive_snapshot_dir = os.path.join(state_dir, "hive_snapshots")
+    rfc.player_log_state_file = os.path.join(state_dir, "player_log_state.json")
+    rfc.log_archive_dir = os.path.join(state_dir, "log_archive")
+    rfc.default_locale = start_locale
+    return rfc
+
+
+@pytest.fixture
+def make_changer(tmp_path):
+    """Factory for build_changer() with its state kept in the test's tmp_path."""
+    def factory(start_locale="de-DE", latency=0.0):
+        return build_changer(str(tmp_path), start_locale=start_locale, latency=latency)
+
+    return factory
@@ -0,0 +1,85 @@
+from os_backend import HKCU, INTERNATIONAL_KEY
+
+
+def test_international_state_reuses_the_enumeration_while_the_key_is_unchanged(make_changer):
+    rfc = make_changer()
+    reads = rfc.backend.calls["read"]
+    first = rfc._international_state()
+    second = rfc._international_state()
+    assert second == first
+    assert rfc.backend.calls["read"] == reads + 1
+
+
+def test_international_state_rereads_after_the_key_changes(make_changer):
+    rfc = make_changer()
+    fingerprint, values = rfc._international_state()
+    assert values["sDecimal"] == ","
+
+    rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"sDecimal": "."})
+    new_fingerprint, new_values = rfc._international_state()
+    assert new_fingerprint != fingerprint
+    assert new_values["sDecimal"] == "."
+
+
+def test_apply_writes_only_the_changed_values(make_changer):
+    rfc = make_changer()
+    before = rfc.backend.read_values(HKCU, INTERNATIONAL_KEY)
+    target = rfc.get_locale_overrides("en-US")
+    written = []
+    write_values = rfc.backend.write_values
+
+    def recording(root, path, values, delete=()):
+        written.append(dict(values))
+        return write_values(root, path, values, delete)
+
+    rfc.backend.write_values = recording
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    assert written == [{name: value for name, value in target.items() if before.get(name) != value}]
+    assert rfc.backend.read_values(HKCU, INTERNATIONAL_KEY) == dict(before, **target)
+
+
+def test_apply_in_target_state_is_a_no_op(make_changer):
+    rfc = make_changer(start_locale="en-US")
+    ok, message = rfc.apply_locale_quick("en-US")
+    assert ok
+    assert message == "Regional format already set to en-US"
+    assert rfc.backend.calls["write"] == 0
+    assert rfc.backend.calls["flush"] == 0
+    assert rfc.backend.broadcasts == []
+    assert rfc.backend.shell_commands == []
+    assert rfc.cooldown.read() is None
+
+
+def test_no_op_check_after_an_apply_costs_no_enumeration(make_changer):
+    rfc = make_changer()
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    rfc.wait_for_broadcast(5)
+    reads = rfc.backend.calls["read"]
+
+    ok, message = rfc.apply_locale_quick("en-US")
+    assert message == "Regional format already set to en-US"
+    assert rfc.backend.calls["read"] == reads
+
+
+def test_locales_outside_the_table_are_never_written(make_changer):
+    rfc = make_changer()
+    for locale in ("xx-XX", "en-US'; Remove-Item C:\\ -Recurse; '"):
+        ok, message = rfc.apply_locale_quick(locale, verify_timeout=1)
+        assert not ok and message.startswith("Unknown locale")
+    assert rfc.backend.calls["write"] == 0
+    assert rfc.backend.shell_commands == []
+
+
+def test_culture_sync_quotes_the_locale(make_changer):
+    rfc = make_changer()
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    script = rfc.backend.shell_commands[-1][-1]
+    assert "$culture='en-US';" in script and '"en-US"' not in script
+
+    # A LocaleName restored from a snapshot is only handed to PowerShell if it is a locale name
+    commands = len(rfc.backend.shell_commands)
+    rfc._sync_language_list("de-DE'); Remove-Item C:\\ -Recurse; ('")
+    assert len(rfc.backend.shell_commands) == commands
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_per_window_broadcast_uses_the_short_window_timeout(make_changer):
+    rfc = make_changer()
+    rfc.backend.hung_windows = ["Hung A (pid 1)", "Hung B (pid 2)"]
+    rfc.broadcast_mode = "per-window"
+    rfc.broadcast_window_timeout_ms = 50
+
+    started = time.perf_counter()
+    result = rfc._broadcast_setting_change().result(5)
+    assert time.perf_counter() - started < 1.0  # not 2 x broadcast_timeout_ms
+    assert result.timed_out == ["Hung A (pid 1)", "Hung B (pid 2)"]
+
+
+def test_queued_broadcast_is_reused(make_changer):
+    rfc = make_changer()
+    rfc.backend.latency["broadcast"] = 0.2
+    running = rfc._broadcast_setting_change()
+    time.sleep(0.05)
+    queued = rfc._broadcast_setting_change()
+    assert queued is not running
+    assert rfc._broadcast_setting_change() is queued
+    assert queued.result(5) is not None
+    assert len(rfc.backend.broadcasts) == 2
+
+
+def test_pending_broadcast_does_not_block_exit(tmp_path):
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {TESTS_DIR!r})
+        from conftest import build_changer
+        rfc = build_changer({str(tmp_path)!r})
+        rfc.backend.hung_windows = ["Hung (pid 1)"]
+        rfc.broadcast_timeout_ms = 60000
+        rfc._broadcast_setting_change()
+    """)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30)
+    assert time.perf_counter() - started < 10
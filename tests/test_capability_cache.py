@@ -0,0 +1,73 @@
+import json
+
+import capability_cache
+from capability_cache import CapabilityCache
+
+
+def test_installed_culture_is_remembered_across_instances(tmp_path):
+    path = str(tmp_path / "capability_cache.json")
+    CapabilityCache(path).record("en-US", "Installed")
+    cache = CapabilityCache(path)
+    assert cache.is_installed("en-US")
+    assert cache.is_installed("EN-us")
+    assert not cache.is_installed("fr-FR")
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache = CapabilityCache(str(tmp_path / "capability_cache.json"), ttl=60)
+    cache.record("en-US", "Installed")
+    now = capability_cache.time.time()
+    monkeypatch.setattr(capability_cache.time, "time", lambda: now + 61)
+    assert not cache.is_installed("en-US")
+
+
+def test_states_other_than_installed_are_misses(tmp_path):
+    cache = CapabilityCache(str(tmp_path / "capability_cache.json"))
+    cache.record("en-US", "NotPresent")
+    assert not cache.is_installed("en-US")
+
+
+def test_invalidate_one_or_all(tmp_path):
+    path = tmp_path / "capability_cache.json"
+    cache = CapabilityCache(str(path))
+    cache.record("en-US", "Installed")
+    cache.record("en-GB", "Installed")
+    cache.invalidate("en-us")
+    assert not cache.is_installed("en-US")
+    assert cache.is_installed("en-GB")
+    cache.invalidate()
+    assert not cache.is_installed("en-GB")
+    assert json.loads(path.read_text())["cultures"] == {}
+
+
+def test_other_versions_are_ignored(tmp_path):
+    path = tmp_path / "capability_cache.json"
+    path.write_text(json.dumps({"version": 0, "cultures": {"en-us": {"state": "Installed", "checked": 1e12}}}))
+    assert not CapabilityCache(str(path)).is_installed("en-US")
+
+
+def _scans(rfc):
+    return [args for args in rfc.backend.shell_commands if "Get-WindowsCapability" in args[-1]]
+
+
+def test_apply_scans_on_a_miss_and_skips_the_scan_on_a_hit(make_changer):
+    rfc = make_changer()
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok and "capability cache miss" in message
+    assert len(_scans(rfc)) == 1
+    assert rfc.capability_cache.is_installed("en-US")
+
+    ok, message = rfc.apply_locale_quick("de-DE", verify_timeout=1)
+    assert ok, message
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok and "capability cache hit" in message
+    assert len(_scans(rfc)) == 2  # the de-DE miss only
+
+
+def test_failed_culture_sync_on_a_hit_invalidates_the_entry(make_changer):
+    rfc = make_changer()
+    rfc.capability_cache.record("en-US", "Installed")
+    rfc.backend.shell_handler = lambda args: (1, "", "Set-Culture failed")
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok and "capability cache hit" in message
+    assert not rfc.capability_cache.is_installed("en-US")
@@ -0,0 +1,101 @@
+import time
+
+import cli
+
+
+def test_run_waits_for_cooldown_before_launch(make_changer, tmp_path, monkeypatch):
+    rfc = make_changer()
+    # The stand-in shell has no culture probe, so the cooldown lasts its full upper bound
+    rfc.cooldown_max = 0.3
+    launched = []
+
+    def launch(rfc, args):
+        launched.append(rfc.cooldown.remaining())
+        return False, "launch stubbed"
+
+    monkeypatch.setattr(cli, "_launch", launch)
+    exe = str(tmp_path / "Crossfire_Legion.exe")
+    monkeypatch.setattr(rfc, "find_game_exe", lambda: exe)
+    started = time.perf_counter()
+    result = cli.serve_request(rfc, ["run", "--path", exe])
+
+    assert launched == [0.0]
+    assert result["launch_waited_ms"] >= 200
+    assert time.perf_counter() - started >= 0.25
+    assert result["revert"] is not None
+
+
+def test_broadcast_options_do_not_stick_to_the_instance(make_changer):
+    rfc = make_changer()
+    result = cli.serve_request(rfc, ["--broadcast", "notify", "apply", "en-US"])
+    assert result["success"], result
+    assert result["broadcast"]["mode"] == "notify"
+    assert rfc.broadcast_mode == "send"
+
+    result = cli.serve_request(rfc, ["revert"])
+    assert result["broadcast"]["mode"] == "send"
+
+
+def test_concurrent_commands_do_not_interleave(make_changer):
+    import threading
+
+    rfc = make_changer()
+    rfc.backend.latency["write"] = 0.05
+    spans = []
+    original = rfc._apply_locale_quick
+
+    def recorded(*args):
+        spans.append(("start", args[0]))
+        try:
+            return original(*args)
+        finally:
+            spans.append(("end", args[0]))
+
+    rfc._apply_locale_quick = recorded
+    threads = [
+        threading.Thread(target=cli.serve_request, args=(rfc, ["apply", locale]))
+        for locale in ("en-US", "en-GB", "fr-FR")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(spans) == 6
+    # Every start is directly followed by its own end
+    for start, end in zip(spans[::2], spans[1::2]):
+        assert start[0] == "start" and end == ("end", start[1])
+
+
+def test_minimal_apply_keeps_the_current_locale(make_changer):
+    rfc = make_changer()
+    result = cli.serve_request(rfc, ["apply", "--minimal"])
+    assert result["success"], result
+    assert result["locale"] == "de-DE"
+    assert rfc.get_current_locale()["locale"] == "de-DE"
+
+    result = cli.serve_request(rfc, ["apply", "--minimal", "--all-users"])
+    assert not result["success"]
+
+
+def test_unknown_locales_are_usage_errors(make_changer, capsys):
+    assert cli.main(["--local", "apply", "en-US\"; Remove-Item C:\\x; $y=\""]) == cli.EXIT_USAGE
+    assert cli.main(["--local", "run", "--steam", "--locale", "xx-XX"]) == cli.EXIT_USAGE
+
+    rfc = make_changer()
+    result = cli.serve_request(rfc, ["apply", "xx-XX"])
+    assert not result["success"]
+    assert rfc.get_current_locale()["locale"] == "de-DE"
+    assert rfc.backend.calls["write"] == 0
+
+
+def test_locale_is_spelled_as_in_the_table(make_changer):
+    result = cli.serve_request(make_changer(), ["apply", "EN-us"])
+    assert result["success"], result
+    assert result["locale"] == "en-US"
+
+
+def test_empty_forwarded_argv_is_rejected(make_changer):
+    result = cli.serve_request(make_changer(), [])
+    assert result["command"] == "?"
+    assert not result["success"]
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+
+from config_store import ConfigStore
+
+
+def test_burst_of_edits_is_one_write(tmp_path):
+    path = str(tmp_path / "game_config.json")
+    store = ConfigStore(path, delay=0.1)
+    typed = r"D:\SteamLibrary\Crossfire_Legion.exe"
+    for end in range(1, len(typed) + 1):
+        store.set(game_path=typed[:end])
+    assert store.writes == 0
+    assert not os.path.exists(path)
+
+    time.sleep(0.3)
+    assert store.writes == 1
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["game_path"] == typed
+
+
+def test_unchanged_values_are_not_written(tmp_path):
+    store = ConfigStore(str(tmp_path / "region_config.json"), delay=60)
+    store.set(default_locale="de-DE")
+    store.flush()
+    store.reset_count()
+    store.set(default_locale="de-DE")
+    store.flush()
+    assert store.writes == 0
+
+
+def test_flush_writes_pending_changes_once(tmp_path):
+    path = str(tmp_path / "region_config.json")
+    store = ConfigStore(path, delay=60)
+    store.set(default_locale="de-DE")
+    store.flush()
+    store.flush()
+    assert store.writes == 1
+    assert ConfigStore(path).get("default_locale") == "de-DE"
+    # Nothing but the config itself is left in the folder
+    assert os.listdir(tmp_path) == ["region_config.json"]
+
+
+def test_file_is_read_once(tmp_path):
+    path = tmp_path / "region_config.json"
+    path.write_text(json.dumps({"default_locale": "fr-FR"}))
+    store = ConfigStore(str(path))
+    assert store.get("default_locale") == "fr-FR"
+    path.write_text(json.dumps({"default_locale": "changed-on-disk"}))
+    assert store.get("default_locale") == "fr-FR"
@@ -0,0 +1,58 @@
+import time
+
+from cooldown import CooldownToken
+
+
+def _probes(rfc):
+    return [args for args in rfc.backend.shell_commands if "PROBE=" in args[-1]]
+
+
+def _probe_reports(culture, decimal):
+    def handler(args):
+        if "PROBE=" in args[-1]:
+            return 0, f"PROBE={culture}|{decimal}|1.5\n", ""
+        return 0, "", ""
+    return handler
+
+
+def test_token_is_shared_and_expires(tmp_path):
+    path = str(tmp_path / "cooldown.token")
+    CooldownToken(path).start({"locale": "en-US", "decimal": "."}, 0.2)
+    other = CooldownToken(path)
+    assert other.read()["expected"] == {"locale": "en-US", "decimal": "."}
+    assert 0 < other.remaining() <= 0.2
+    time.sleep(0.25)
+    assert other.read() is None
+    assert other.remaining() == 0.0
+
+
+def test_finish_ends_the_cooldown_for_everyone(tmp_path):
+    path = str(tmp_path / "cooldown.token")
+    CooldownToken(path).start({"locale": "en-US"}, 10)
+    CooldownToken(path).finish()
+    assert CooldownToken(path).read() is None
+    CooldownToken(path).finish()  # already gone: no error
+
+
+def test_probe_seeing_the_new_culture_ends_the_cooldown(make_changer):
+    rfc = make_changer()
+    rfc.cooldown_max = 10
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    rfc.backend.shell_handler = _probe_reports("en-US", ".")
+    assert rfc.check_cooldown() == 0.0
+    assert rfc.cooldown.read() is None
+    assert len(_probes(rfc)) == 1
+
+
+def test_probes_back_off_while_the_culture_is_not_live(make_changer):
+    rfc = make_changer()
+    rfc.cooldown_max = 1.7
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    rfc.backend.shell_handler = _probe_reports("de-DE", ",")
+
+    waited = rfc.wait_for_cooldown(interval=0.02)
+    assert waited >= 1.5
+    # Probes at about 0, 0.5 and 1.5 s instead of one per poll (85 at this interval)
+    assert 2 <= len(_probes(rfc)) <= 4
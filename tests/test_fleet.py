@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import time
+
+import fleet
+import regional_utils
+from fleet import FleetAgent, FleetController, STATUS_COMMAND, summarize
+from os_backend import HKCU, INTERNATIONAL_KEY
+
+TOKEN = "fleet-secret"
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_status_is_answered_while_a_command_runs(make_changer):
+    rfc = make_changer()
+    rfc.backend.latency["write"] = 1.0
+
+    async def scenario():
+        agent = await FleetAgent(rfc, TOKEN, port=0).start()
+        address = [("127.0.0.1", agent.port)]
+        busy, watcher = FleetController(address, TOKEN), FleetController(address, TOKEN, timeout=0.5)
+        try:
+            apply = asyncio.ensure_future(busy.dispatch(["apply", "en-US"]))
+            await asyncio.sleep(0.2)
+            started = time.perf_counter()
+            status = await watcher.status()
+            status_seconds = time.perf_counter() - started
+            return status, status_seconds, await apply
+        finally:
+            busy.close()
+            watcher.close()
+            await agent.close()
+
+    status, status_seconds, applied = _run(scenario())
+    assert status["summary"]["reachable"] == 1
+    assert status_seconds < 0.5
+    assert all(result["success"] for result in applied.values())
+
+
+def test_summarize_counts_seats():
+    statuses = {
+        "a:1": {"success": True, "locale": "en-US", "affected": False, "cooldown_remaining": 3.0},
+        "b:1": {"success": True, "locale": "de-DE", "affected": True, "game_running": True},
+        "c:1": {"success": False, "unreachable": True},
+    }
+    summary = summarize(statuses)
+    assert summary["agents"] == 3
+    assert summary["reachable"] == 2
+    assert summary["locales"] == {"en-US": 1, "de-DE": 1}
+    assert (summary["affected"], summary["cooling_down"], summary["games_running"]) == (1, 1, 1)
+
+
+def test_fleet_status_reports_the_seat(make_changer):
+    rfc = make_changer()
+
+    async def scenario():
+        agent = await FleetAgent(rfc, TOKEN, port=0).start()
+        controller = FleetController([("127.0.0.1", agent.port)], TOKEN)
+        try:
+            return await controller.dispatch([STATUS_COMMAND])
+        finally:
+            controller.close()
+            await agent.close()
+
+    (result,) = _run(scenario()).values()
+    assert result["success"]
+    assert result["locale"] == "de-DE"
+    assert result["affected"]
+
+
+def _record_start(start, started):
+    async def recorded(agent):
+        started.append(await start(agent))
+        return started[-1]
+    return recorded
+
+
+def test_agent_mode_keeps_status_live(make_changer, monkeypatch):
+    rfc = make_changer()
+    monkeypatch.setattr(regional_utils, "RegionalFormatChanger", lambda: rfc)
+    started = []
+    monkeypatch.setattr(fleet.FleetAgent, "start", _record_start(fleet.FleetAgent.start, started))
+
+    async def scenario():
+        args = argparse.Namespace(token=TOKEN, host="127.0.0.1", port=0)
+        task = asyncio.ensure_future(fleet._run_agent(args))
+        for _ in range(200):
+            if started:
+                break
+            await asyncio.sleep(0.01)
+        assert rfc.get_current_locale()["locale"] == "de-DE"
+        # Changed on the seat itself, not through the agent
+        rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, rfc.get_locale_overrides("en-US"))
+        for _ in range(100):
+            if rfc.get_current_locale()["locale"] == "en-US":
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    _run(scenario())
+    assert rfc.get_current_locale()["locale"] == "en-US"
+    assert rfc.locale_state._watch_thread is None
+
+
+def _dispatch(rfc, argv, agent_token=TOKEN, controller_token=TOKEN):
+    async def scenario():
+        agent = await FleetAgent(rfc, agent_token, port=0).start()
+        controller = FleetController([("127.0.0.1", agent.port)], controller_token, timeout=5)
+        try:
+            return await controller.dispatch(argv)
+        finally:
+            controller.close()
+            await agent.close()
+
+    (result,) = _run(scenario()).values()
+    return result
+
+
+def test_non_ascii_token_handshake(make_changer):
+    token = "geheimes-Passwört-🔑"
+    result = _dispatch(make_changer(), ["status"], agent_token=token, controller_token=token)
+    assert result["success"], result
+
+
+def test_wrong_token_is_rejected(make_changer):
+    result = _dispatch(make_changer(), ["status"], controller_token="wrong-Tökén")
+    assert not result["success"]
+    assert result["unreachable"]
+
+
+def test_token_never_crosses_the_wire(make_changer):
+    received = bytearray()
+
+    async def scenario():
+        agent = await FleetAgent(make_changer(), TOKEN, port=0).start()
+
+        async def relay(reader, writer):
+            # Sits between controller and agent and keeps a copy of everything sent
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", agent.port)
+
+            async def pipe(source, sink):
+                while data := await source.read(65536):
+                    received.extend(data)
+                    sink.write(data)
+                sink.close()
+
+            await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+
+        proxy = await asyncio.start_server(relay, "127.0.0.1", 0)
+        controller = FleetController([("127.0.0.1", proxy.sockets[0].getsockname()[1])], TOKEN, timeout=5)
+        try:
+            return await controller.dispatch(["status"])
+        finally:
+            controller.close()
+            proxy.close()
+            await agent.close()
+
+    (result,) = _run(scenario()).values()
+    assert result["success"], result
+    assert received and TOKEN.encode() not in received
+
+
+def test_only_the_steam_install_launches_over_the_network(make_changer, tmp_path, monkeypatch):
+    rfc = make_changer()
+    installed = str(tmp_path / "steamapps" / "common" / "Crossfire Legion" / "Crossfire_Legion.exe")
+    monkeypatch.setattr(rfc, "find_game_exe", lambda: installed)
+    launched = []
+    monkeypatch.setattr(rfc, "launch_manual_path", lambda path: launched.append(path) or (True, "launched"))
+
+    refused = _dispatch(rfc, ["launch", "--path", str(tmp_path / "evil.exe")])
+    assert not refused["success"]
+    assert "Steam install" in refused["message"]
+    assert launched == []
+
+    assert _dispatch(rfc, ["launch", "--path", installed])["success"]
+    assert launched == [installed]
+
+
+def test_file_options_are_refused_over_the_network(make_changer, tmp_path):
+    rfc = make_changer()
+    result = _dispatch(rfc, ["log", "--log-path", str(tmp_path / "secrets.txt")])
+    assert not result["success"] and "--log-path" in result["message"]
+    result = _dispatch(rfc, ["--trace", str(tmp_path / "out.jsonl"), "status"])
+    assert not result["success"] and "--trace" in result["message"]
+    assert not (tmp_path / "out.jsonl").exists()
+
+
+def test_unknown_locales_are_refused_over_the_network(make_changer):
+    rfc = make_changer()
+    result = _dispatch(rfc, ["apply", "en-US'; Stop-Computer; '"])
+    assert not result["success"]
+    assert rfc.backend.calls["write"] == 0 and rfc.backend.shell_commands == []
+
+
+def test_agent_listens_on_loopback_unless_told_otherwise(monkeypatch):
+    hosts = []
+
+    async def run_agent(args):
+        hosts.append(args.host)
+
+    monkeypatch.setattr(fleet, "_run_agent", run_agent)
+    fleet.main(["--token", TOKEN, "agent"])
+    fleet.main(["--token", TOKEN, "agent", "--bind", "0.0.0.0"])
+    assert hosts == ["127.0.0.1", "0.0.0.0"]
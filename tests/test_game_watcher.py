@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from game_watcher import GameWatcher, find_pids
+
+# Exits on its own after a moment; argv[0] carries the game's image name like a Proton launch
+STANDIN_EXE = "Crossfire_Legion.exe"
+STANDIN_ARGV = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+needs_proc = pytest.mark.skipif(not os.path.isdir("/proc"), reason="process lookup reads /proc")
+
+
+def _start_standin(seconds=0.3):
+    argv = [STANDIN_EXE, "-c", f"import time; time.sleep({seconds})"]
+    return subprocess.Popen(argv, executable=sys.executable)
+
+
+def test_waits_for_launched_pid():
+    child = subprocess.Popen(STANDIN_ARGV)
+    try:
+        started = time.monotonic()
+        found, message = GameWatcher(appear_timeout=1.0).wait(child.pid)
+        assert found, message
+        assert time.monotonic() - started >= 0.2
+    finally:
+        child.wait()
+
+
+@needs_proc
+def test_follows_game_started_by_another_process():
+    # Like Steam -applaunch: the PID we launched is not the game, which appears a bit later
+    holder = []
+    timer = threading.Timer(0.2, lambda: holder.append(_start_standin()))
+    timer.start()
+    try:
+        watcher = GameWatcher(appear_timeout=5.0)
+        found, message = watcher.wait()
+        assert found, message
+        assert watcher.pid == holder[0].pid
+    finally:
+        timer.join()
+        for child in holder:
+            child.wait()
+
+
+@needs_proc
+def test_find_pids_matches_image_name_case_insensitively():
+    child = _start_standin(seconds=2)
+    try:
+        # /proc/<pid>/cmdline is empty for a moment right after exec
+        deadline = time.monotonic() + 2
+        while child.pid not in find_pids(STANDIN_EXE.upper()) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert child.pid in find_pids(STANDIN_EXE.upper())
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_reports_game_that_never_started():
+    found, message = GameWatcher(exe_name="NoSuchGame.exe", appear_timeout=0.2).wait()
+    assert not found
+    assert "did not start" in message
+
+
+def test_stop_does_not_call_on_exit():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    calls = []
+    try:
+        watcher = GameWatcher()
+        watcher.start(lambda found, message: calls.append(message), pid=child.pid)
+        time.sleep(0.1)
+        watcher.stop()
+        assert watcher._thread is None
+    finally:
+        child.kill()
+        child.wait()
+    time.sleep(0.05)
+    assert calls == []
+
+
+def test_on_exit_runs_when_child_exits():
+    child = subprocess.Popen(STANDIN_ARGV)
+    done = threading.Event()
+    results = []
+
+    def on_exit(found, message):
+        results.append(found)
+        done.set()
+
+    try:
+        GameWatcher().start(on_exit, pid=child.pid)
+        assert done.wait(5)
+        assert results == [True]
+    finally:
+        child.wait()
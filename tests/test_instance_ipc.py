@@ -0,0 +1,86 @@
+import os
+import stat
+import sys
+from multiprocessing.connection import Client
+
+import pytest
+
+import cli
+import instance_ipc
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a Unix socket in tmp_path")
+
+
+@pytest.fixture
+def endpoint(tmp_path):
+    return str(tmp_path / "control.sock"), str(tmp_path / "control.key")
+
+
+def test_forward_round_trip_is_json(endpoint):
+    address, key_file = endpoint
+    seen = []
+    server = instance_ipc.ControlServer(lambda argv: seen.append(argv) or {"command": argv[0], "success": True},
+                                        address, key_file).start()
+    try:
+        assert instance_ipc.ping(address, key_file)
+        result = instance_ipc.forward(["status"], address, key_file, timeout=5.0)
+    finally:
+        server.close()
+    assert result == {"command": "status", "success": True}
+    assert seen == [["status"]]
+    assert not os.path.exists(key_file)
+
+
+def test_key_file_is_private_and_replaced(endpoint, tmp_path):
+    address, key_file = endpoint
+    # A key file or symlink left at the path is replaced, never written through
+    target = tmp_path / "victim.txt"
+    target.write_text("keep")
+    os.symlink(target, key_file)
+    server = instance_ipc.ControlServer(lambda argv: {}, address, key_file).start()
+    try:
+        assert not os.path.islink(key_file)
+        assert stat.S_IMODE(os.stat(key_file).st_mode) == 0o600
+        assert target.read_text() == "keep"
+    finally:
+        server.close()
+
+
+def test_malformed_requests_never_reach_the_handler(endpoint):
+    address, key_file = endpoint
+    seen = []
+    server = instance_ipc.ControlServer(lambda argv: seen.append(argv) or {}, address, key_file).start()
+    try:
+        with open(key_file, "rb") as f:
+            key = f.read()
+        for payload in (b'{"argv": [1, 2]}', b'{"argv": []}', b'{"argv": ["' + b"x" * 2000 + b'"]}', b"[]"):
+            with Client(address, family="AF_UNIX", authkey=key) as conn:
+                conn.send_bytes(payload)
+                assert b"Bad request" in conn.recv_bytes()
+        with Client(address, family="AF_UNIX", authkey=key) as conn:
+            # Not JSON (e.g. a pickle): the connection is dropped unread
+            conn.send_bytes(b"\x80\x04N.")
+            with pytest.raises(EOFError):
+                conn.recv_bytes()
+    finally:
+        server.close()
+    assert seen == []
+
+
+def test_forwarded_commands_cannot_name_arbitrary_files(make_changer, tmp_path, monkeypatch):
+    rfc = make_changer()
+    installed = str(tmp_path / "Crossfire_Legion.exe")
+    monkeypatch.setattr(rfc, "find_game_exe", lambda: installed)
+    launched = []
+    monkeypatch.setattr(rfc, "launch_manual_path", lambda path: launched.append(path) or (True, "launched"))
+
+    refused = cli.serve_request(rfc, ["launch", "--path", str(tmp_path / "evil.exe")])
+    assert not refused["success"] and "Steam install" in refused["message"]
+    refused = cli.serve_request(rfc, ["log", "--log-path", str(tmp_path / "secrets.txt")])
+    assert not refused["success"] and "--log-path" in refused["message"]
+    refused = cli.serve_request(rfc, ["apply", "xx-INVALID'"])
+    assert not refused["success"] and "Invalid arguments" in refused["message"]
+    assert launched == []
+
+    assert cli.serve_request(rfc, ["launch", "--path", installed])["success"]
+    assert launched == [installed]
@@ -0,0 +1,51 @@
+from locale_profiles import COMMA_DECIMAL_LOCALES, LocaleProfileDB, is_comma_decimal, is_locale_name
+from os_backend import HKCU, INTERNATIONAL_KEY
+
+
+def test_comma_decimal_locales_match_the_table():
+    db = LocaleProfileDB()
+    from_table = {name for name in db.names() if db.get(name)["sDecimal"] == ","}
+    assert COMMA_DECIMAL_LOCALES == from_table
+
+
+def test_is_comma_decimal():
+    assert is_comma_decimal("de-DE")
+    assert not is_comma_decimal("en-US")
+    assert not is_comma_decimal(None)
+
+
+def test_is_locale_name_accepts_only_plain_tags():
+    for name in ("en-US", "de", "sr-Latn-RS", "es-419"):
+        assert is_locale_name(name)
+    for name in ("", None, "en-US'", "en US", "en-US;x", "english-US", "en-US-x-private"):
+        assert not is_locale_name(name)
+
+
+def test_lookup_is_case_insensitive_and_misses_are_none():
+    db = LocaleProfileDB()
+    assert db.get("DE-de")["sDecimal"] == ","
+    assert db.get("xx-XX") is None
+
+
+def test_minimal_override_switches_only_the_separators():
+    db = LocaleProfileDB()
+    assert db.minimal_override("en-US") == {}
+    # German groups thousands with ".", which must not collide with the new decimal point
+    assert db.minimal_override("de-DE") == {
+        "sDecimal": ".", "sMonDecimalSep": ".", "sThousand": ",", "sMonThousandSep": ",",
+    }
+    # French groups with a narrow space: nothing to move out of the way
+    assert db.minimal_override("fr-FR") == {"sDecimal": ".", "sMonDecimalSep": "."}
+
+
+def test_minimal_apply_keeps_the_locale_and_skips_the_culture_sync(make_changer):
+    rfc = make_changer()
+    german = rfc.get_locale_overrides("de-DE")
+    ok, message = rfc.apply_locale_quick("de-DE", verify_timeout=1, minimal=True)
+    assert ok, message
+    assert "dot decimal" in message
+
+    values = rfc.backend.read_values(HKCU, INTERNATIONAL_KEY)
+    assert values == dict(german, **rfc.locale_profiles.minimal_override("de-DE"))
+    assert values["LocaleName"] == "de-DE" and values["sShortDate"] == german["sShortDate"]
+    assert rfc.backend.shell_commands == []
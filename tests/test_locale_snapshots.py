@@ -0,0 +1,31 @@
+from locale_snapshots import SnapshotStore, added_since
+from os_backend import HKCU, INTERNATIONAL_KEY
+
+
+def test_restore_keeps_non_string_values(make_changer):
+    rfc = make_changer()
+    # A value that is not REG_SZ (e.g. a REG_BINARY written by another tool)
+    rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"sDecimal": ","})
+    rfc.backend.set_key(HKCU, INTERNATIONAL_KEY, dict(
+        rfc.backend.read_values(HKCU, INTERNATIONAL_KEY), Binary=b"\x01\x02", Dword=7
+    ))
+
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=0)
+    assert ok, message
+    rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"sAddedLater": "x"})
+    ok, message = rfc.revert_to_default_quick()
+    assert ok, message
+
+    values = rfc.backend.read_values(HKCU, INTERNATIONAL_KEY)
+    assert values["Binary"] == b"\x01\x02"
+    assert values["Dword"] == 7
+    assert values["sDecimal"] == ","
+    assert "sAddedLater" not in values
+
+
+def test_added_since_uses_names_at_capture(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.json"))
+    snapshot = store.capture({"sDecimal": ",", "Binary": b"\x00"}, "de-DE")
+    assert snapshot["names"] == ["Binary", "sDecimal"]
+    current = {"sDecimal": ".", "Binary": b"\x00", "sNew": "x", "Other": 1}
+    assert added_since(snapshot, current) == ["sNew", "Other"]
@@ -0,0 +1,80 @@
+import threading
+
+from locale_state import LocaleStateCache
+from os_backend import HKCU, INTERNATIONAL_KEY
+
+
+class CountingLoader:
+    def __init__(self, locale="de-DE"):
+        self.locale = locale
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"locale": self.locale, "country": ""}
+
+
+def test_get_loads_once_and_returns_copies():
+    loader = CountingLoader()
+    cache = LocaleStateCache(loader)
+    first = cache.get()
+    first["locale"] = "changed by caller"
+    assert cache.get() == {"locale": "de-DE", "country": ""}
+    assert loader.calls == 1
+
+
+def test_invalidate_reloads_on_next_get():
+    loader = CountingLoader()
+    cache = LocaleStateCache(loader)
+    cache.get()
+    loader.locale = "en-US"
+    cache.invalidate()
+    assert cache.get()["locale"] == "en-US"
+    assert loader.calls == 2
+
+
+def test_load_overlapping_an_invalidate_is_not_cached():
+    loader = CountingLoader()
+    cache = LocaleStateCache(None)
+
+    def racing_loader():
+        state = loader()
+        if loader.calls == 1:
+            # A change lands while the first load is still reading the old value
+            loader.locale = "en-US"
+            cache.invalidate()
+        return state
+
+    cache._loader = racing_loader
+    assert cache.get()["locale"] == "de-DE"
+    assert cache.get()["locale"] == "en-US"
+    assert loader.calls == 2
+
+
+def test_watcher_invalidates_and_notifies_on_external_change(make_changer):
+    rfc = make_changer()
+    assert rfc.get_current_locale()["locale"] == "de-DE"
+    changed = threading.Event()
+    rfc.locale_state.add_listener(changed.set)
+    assert rfc.start_locale_watch()
+    try:
+        # As if changed in Windows Settings
+        rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"LocaleName": "fr-FR"})
+        assert changed.wait(5)
+        assert rfc.get_current_locale()["locale"] == "fr-FR"
+    finally:
+        rfc.stop_locale_watch()
+    assert rfc.locale_state._watch_thread is None
+
+
+def test_reads_are_served_from_memory_until_an_apply(make_changer):
+    rfc = make_changer()
+    rfc.get_current_locale()
+    reads = rfc.backend.calls["read"]
+    for _ in range(10):
+        assert rfc.get_current_locale()["locale"] == "de-DE"
+    assert rfc.backend.calls["read"] == reads
+
+    ok, message = rfc.apply_locale_quick("en-US", verify_timeout=1)
+    assert ok, message
+    assert rfc.get_current_locale()["locale"] == "en-US"
@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+
+import log_analyzer
+from log_analyzer import LogArchive, failed, scan, summarize
+
+GOOD_LOG = (
+    "Initialize engine version: 2021.3.16f1\n"
+    "Fixed timestep: 0.02\n"
+    "frame time 16.6 ms\n"
+    "frame time 16.8 ms\n"
+)
+
+
+def _write_gz(path, text):
+    with gzip.open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+def test_corrupt_log_is_reported_not_fatal(tmp_path):
+    good = str(tmp_path / "good.log.gz")
+    _write_gz(good, GOOD_LOG)
+    truncated = str(tmp_path / "truncated.log.gz")
+    with open(good, "rb") as f:
+        data = f.read()
+    with open(truncated, "wb") as f:
+        f.write(data[: len(data) // 2])
+    garbage = str(tmp_path / "garbage.log.gz")
+    with open(garbage, "wb") as f:
+        f.write(b"not gzip at all")
+
+    results = scan([good, truncated, garbage], workers=2)
+    assert [r["path"] for r in results] == [good, truncated, garbage]
+    assert [r["path"] for r in failed(results)] == [truncated, garbage]
+    rows = summarize(results)
+    assert sum(row["sessions"] for row in rows) == 1
+
+
+def test_single_missing_log_is_reported(tmp_path):
+    missing = str(tmp_path / "missing.log")
+    assert failed(scan([missing])) == [scan([missing])[0]]
+
+
+def test_archive_records_end_time_and_start_when_known(tmp_path):
+    log = tmp_path / "Player.log"
+    log.write_text(GOOD_LOG)
+    os.utime(log, (1_700_000_000, 1_700_000_000))
+    archive = LogArchive(str(tmp_path / "archive"))
+    session = archive.archive(str(log), locale="de-DE")
+
+    assert session["ended"].startswith("2023-11-14")
+    if session["started"] is not None:
+        assert session["started"] >= session["ended"]  # created just now, after the backdated mtime
+    listed = archive.sessions(locale="de-DE")
+    assert len(listed) == 1
+    assert summarize(scan([listed[0]["path"]]))[0]["sessions"] == 1
+
+
+def _log(path, culture, timestep="0.02"):
+    path.write_text(f"Initialize engine version: 2021.3.16f1\nCurrent culture: {culture}\nFixed timestep: {timestep}\n")
+    return str(path)
+
+
+def test_exe_version_and_engine_are_separate_columns(tmp_path):
+    log = _log(tmp_path / "a.log", "de-DE")
+    rows = summarize(scan([log]), {log: {"locale": "de-DE", "exe_version": "1.0.3"}})
+    assert rows[0]["exe_version"] == "1.0.3"
+    assert rows[0]["engine"] == "2021.3.16f1"
+
+    rows = summarize(scan([log]))
+    assert (rows[0]["exe_version"], rows[0]["engine"]) == ("-", "2021.3.16f1")
+
+
+def test_locale_filter_applies_to_explicit_paths(tmp_path, capsys):
+    _log(tmp_path / "german.log", "de-DE", "0,02")
+    _log(tmp_path / "english.log", "en-US")
+    log_analyzer.main([str(tmp_path), "--locale", "de-de", "--json", "--workers", "1"])
+    rows = json.loads(capsys.readouterr().out)
+    assert [(row["locale"], row["sessions"], row["runaway"]) for row in rows] == [("de-DE", 1, 1)]
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from phase_graph import PhaseGraph
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_phases_start_after_their_dependencies(executor):
+    order = []
+    graph = PhaseGraph()
+    graph.add("read", lambda: order.append("read") or 1)
+    graph.add("write", lambda: order.append("write"), after=["read"])
+    graph.add("broadcast", lambda: order.append("broadcast"), after=["write"])
+
+    results = graph.run(executor)
+
+    assert order == ["read", "write", "broadcast"]
+    assert list(results) == ["read", "write", "broadcast"]
+    assert all(result["ok"] for result in results.values())
+    assert results["read"]["value"] == 1 and results["read"]["ms"] >= 0
+
+
+def test_sibling_phases_run_concurrently(executor):
+    # Both siblings must be inside the barrier at once, or it times out
+    barrier = threading.Barrier(2, timeout=5)
+    graph = PhaseGraph()
+    graph.add("write", lambda: None)
+    graph.add("culture", barrier.wait, after=["write"])
+    graph.add("broadcast", barrier.wait, after=["write"])
+
+    results = graph.run(executor)
+
+    assert results["culture"]["ok"] and results["broadcast"]["ok"]
+
+
+def test_a_failure_skips_its_dependents_and_is_reraised(executor):
+    ran = []
+    graph = PhaseGraph()
+    graph.add("write", lambda: 1 / 0)
+    graph.add("broadcast", lambda: ran.append("broadcast"), after=["write"])
+    graph.add("culture", lambda: ran.append("culture"))
+
+    with pytest.raises(ZeroDivisionError):
+        graph.run(executor)
+
+    # Unrelated phases still finish; dependents of the failed one never start
+    assert ran == ["culture"]
+
+
+def test_the_first_error_in_add_order_wins(executor):
+    first_may_fail = threading.Event()
+
+    def first():
+        first_may_fail.wait(5)
+        raise KeyError("first")
+
+    def second():
+        try:
+            raise ValueError("second")
+        finally:
+            first_may_fail.set()
+
+    graph = PhaseGraph()
+    graph.add("first", first)
+    graph.add("second", second)
+
+    # "second" fails earlier in time, but "first" was added first
+    with pytest.raises(KeyError):
+        graph.run(executor)
+
+
+def test_before_phase_errors_count_as_phase_errors(executor):
+    ran = []
+    graph = PhaseGraph()
+    graph.add("write", lambda: ran.append("write"))
+    graph.add("broadcast", lambda: ran.append("broadcast"), after=["write"])
+
+    def before_phase(name):
+        if name == "broadcast":
+            raise InterruptedError("cancelled")
+
+    with pytest.raises(InterruptedError):
+        graph.run(executor, before_phase=before_phase)
+    assert ran == ["write"]
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError):
+        PhaseGraph().add("broadcast", lambda: None, after=["write"])
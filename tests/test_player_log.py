@@ -0,0 +1,130 @@
+import threading
+import time
+
+import player_log
+from player_log import PREVIOUS_LOG, PlayerLogTailer, parse_line, timestep_ok
+
+
+def _texts(lines):
+    return [line.text for line in lines]
+
+
+def _tailer(tmp_path, **kwargs):
+    return PlayerLogTailer(str(tmp_path / "Player.log"), state_file=str(tmp_path / "state.json"), **kwargs)
+
+
+def test_parse_line_and_timestep_verdict():
+    line = parse_line("Fixed delta time: 0.02")
+    assert (line.kind, line.value) == ("timestep", "0.02")
+    assert parse_line("Current culture: de-DE").value == "de-DE"
+    assert parse_line("Initialize engine version: 2021.3.5f1").kind == "engine"
+    assert timestep_ok("0.02")
+    assert not timestep_ok("0,02")
+    assert not timestep_ok("2")
+
+
+def test_partial_line_waits_for_its_newline(tmp_path):
+    log = tmp_path / "Player.log"
+    log.write_bytes(b"first\r\nsec")
+    tailer = _tailer(tmp_path)
+    assert _texts(tailer.read_new()) == ["first"]
+    assert tailer.offset == len(b"first\r\n")
+
+    with open(log, "ab") as f:
+        f.write(b"ond\n")
+    assert _texts(tailer.read_new()) == ["second"]
+    assert _texts(tailer.read_new()) == []
+
+
+def test_offset_is_resumed_from_the_state_file(tmp_path):
+    (tmp_path / "Player.log").write_bytes(b"one\ntwo\n")
+    tailer = _tailer(tmp_path)
+    assert _texts(tailer.read_new()) == ["one", "two"]
+    tailer.save_state()
+
+    with open(tmp_path / "Player.log", "ab") as f:
+        f.write(b"three\n")
+    assert _texts(_tailer(tmp_path).read_new()) == ["three"]
+
+
+def test_truncated_log_is_read_from_the_start(tmp_path):
+    log = tmp_path / "Player.log"
+    log.write_bytes(b"a long first session line\n")
+    tailer = _tailer(tmp_path)
+    list(tailer.read_new())
+
+    with open(log, "r+b") as f:
+        f.truncate(0)
+        f.write(b"new\n")
+    assert _texts(tailer.read_new()) == ["new"]
+
+
+def test_rotation_drains_the_previous_log_first(tmp_path):
+    log = tmp_path / "Player.log"
+    log.write_bytes(b"old 1\n")
+    tailer = _tailer(tmp_path)
+    assert _texts(tailer.read_new()) == ["old 1"]
+
+    # Unity appends a little more, then the next start renames the file and begins a new one
+    with open(log, "ab") as f:
+        f.write(b"old 2\n")
+    log.rename(tmp_path / PREVIOUS_LOG)
+    log.write_bytes(b"new 1\n")
+    assert _texts(tailer.read_new()) == ["old 2", "new 1"]
+    assert tailer.offset == len(b"new 1\n")
+
+
+def test_large_backlog_is_read_through_mmap(tmp_path, monkeypatch):
+    mapped = []
+    real_mmap = player_log.mmap.mmap
+
+    def recording_mmap(*args, **kwargs):
+        mapped.append(args)
+        return real_mmap(*args, **kwargs)
+
+    monkeypatch.setattr(player_log.mmap, "mmap", recording_mmap)
+    lines = [f"line {i}" for i in range(2000)]
+    (tmp_path / "Player.log").write_bytes(("\n".join(lines) + "\npartial").encode())
+    tailer = _tailer(tmp_path)
+    tailer.MMAP_THRESHOLD = 1024
+
+    assert _texts(tailer.read_new()) == lines
+    assert len(mapped) == 1
+    # The unterminated last line is left for the next read
+    assert tailer.offset == len(("\n".join(lines) + "\n").encode())
+
+
+def test_small_increments_use_buffered_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(player_log.mmap, "mmap", None)  # would fail if called
+    (tmp_path / "Player.log").write_bytes(b"a\nb\nc\n")
+    tailer = _tailer(tmp_path, chunk_size=3)
+    assert _texts(tailer.read_new()) == ["a", "b", "c"]
+
+
+def test_follow_saves_state_only_when_the_offset_moves(tmp_path, monkeypatch):
+    log = tmp_path / "Player.log"
+    log.write_bytes(b"x\n")
+    tailer = _tailer(tmp_path)
+    saves = []
+    save_state = tailer.save_state
+
+    def counting_save():
+        saves.append(tailer.offset)
+        save_state()
+
+    monkeypatch.setattr(tailer, "save_state", counting_save)
+    stop = threading.Event()
+    seen = []
+    thread = threading.Thread(target=lambda: seen.extend(tailer.follow(stop, interval=0.005)))
+    thread.start()
+    try:
+        time.sleep(0.1)  # many polls with nothing new
+        with open(log, "ab") as f:
+            f.write(b"y\n")
+        time.sleep(0.1)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    assert _texts(seen) == ["x", "y"]
+    assert saves == [2, 4]
@@ -0,0 +1,75 @@
+import subprocess
+
+import pytest
+
+from shell_host import STANDIN_HOST_ARGV, ShellHost, ShellHostError, ShellHostPool
+
+
+@pytest.fixture
+def host():
+    host = ShellHost(STANDIN_HOST_ARGV)
+    yield host
+    host.close()
+
+
+def test_runs_many_scripts_in_one_process(host):
+    first = host.run("echo hello", timeout=10)
+    assert (first.returncode, first.stdout) == (0, "hello\n")
+    for i in range(5):
+        assert host.run(f"echo {i}", timeout=10).stdout == f"{i}\n"
+    assert host.starts == 1
+
+
+def test_script_text_and_output_need_no_escaping(host):
+    result = host.run("printf 'a b\\n\\tc ü %s' x; echo oops >&2; exit 3", timeout=10)
+    assert result.returncode == 3
+    assert result.stdout == "a b\n\tc ü x"
+    assert result.stderr == "oops\n"
+
+
+def test_timeout_kills_host_and_next_command_restarts_it(host):
+    host.run("true", timeout=10)
+    with pytest.raises(subprocess.TimeoutExpired):
+        host.run("sleep 5", timeout=0.2)
+    assert not host.alive()
+    assert host.run("echo back", timeout=10).stdout == "back\n"
+    assert host.starts == 2
+
+
+def test_host_dying_mid_command_is_reported_then_restarted(host):
+    host.run("true", timeout=10)
+    # The script's parent is the host itself
+    with pytest.raises(ShellHostError):
+        host.run("kill -9 $PPID; sleep 5", timeout=10)
+    assert host.run("echo again", timeout=10).stdout == "again\n"
+    assert host.starts == 2
+
+
+def test_host_that_exited_between_commands_is_restarted(host):
+    host.run("true", timeout=10)
+    host.process.kill()
+    host.process.wait()
+    assert host.run("echo again", timeout=10).stdout == "again\n"
+    assert host.starts == 2
+
+
+def test_pool_reuses_the_most_recent_host():
+    pool = ShellHostPool.standin(size=2)
+    try:
+        for _ in range(3):
+            pool.run("true", timeout=10)
+        assert pool.starts == 1
+    finally:
+        pool.close()
+
+
+def test_culture_sync_uses_the_persistent_host(make_changer):
+    
+    rfc = make_changer()
+    rfc.powershell = ShellHostPool.standin(size=1)
+    try:
+        assert rfc.run_powershell("echo synced", timeout=10).stdout == "synced\n"
+        assert rfc.run_powershell("echo again", timeout=10).stdout == "again\n"
+        assert rfc.powershell.starts == 1
+    finally:
+        rfc.powershell.close()
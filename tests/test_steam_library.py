@@ -0,0 +1,125 @@
+import io
+import os
+
+import pytest
+
+import steam_library
+from os_backend import HKCU, InMemoryBackend
+from steam_library import GAME_EXE_NAME, STEAM_APP_ID, SteamLibrary, _tokens, parse_vdf
+
+DEMO_APP_ID = "2000001"
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def _manifest(steamapps, appid, install_dir, exe=True):
+    _write(os.path.join(steamapps, f"appmanifest_{appid}.acf"),
+           f'"AppState"\n{{\n\t"appid"\t\t"{appid}"\n\t"installdir"\t\t"{install_dir}"\n}}\n')
+    if exe:
+        _write(os.path.join(steamapps, "common", install_dir, GAME_EXE_NAME), "")
+
+
+@pytest.fixture
+def steam(tmp_path):
+    """Steam in tmp/Steam with a second library in tmp/Library holding the full game."""
+    steam_path = tmp_path / "Steam"
+    library = tmp_path / "Library"
+    _write(steam_path / "steamapps" / "libraryfolders.vdf", (
+        '"libraryfolders"\n{\n'
+        f'\t"0"\n\t{{\n\t\t"path"\t\t"{str(steam_path).replace(os.sep, "/")}"\n\t}}\n'
+        f'\t"1"\n\t{{\n\t\t"path"\t\t"{str(library).replace(os.sep, "/")}"\n\t}}\n'
+        '}\n'
+    ))
+    _manifest(str(steam_path / "steamapps"), DEMO_APP_ID, "Crossfire Legion Demo Build")
+    _manifest(str(steam_path / "steamapps"), "10", "Other Game", exe=False)
+    _manifest(str(library / "steamapps"), STEAM_APP_ID, "Crossfire Legion")
+    backend = InMemoryBackend()
+    backend.set_key(HKCU, r"SOFTWARE\Valve\Steam", {"SteamPath": str(steam_path)})
+    return SteamLibrary(backend, revalidate_interval=0), steam_path, library
+
+
+# --- VDF ---
+def test_tokens_handle_comments_escapes_and_bare_words():
+    text = '// header\n"key" { "quoted \\"value\\"" bare "tab\\there" } // trailing'
+    assert list(_tokens(io.StringIO(text))) == ["key", "{", 'quoted "value"', "bare", "tab\there", "}"]
+
+
+def test_tokens_split_across_chunk_boundaries():
+    text = '"a long key name" { "value with spaces" "x" }'
+    for chunk_size in (1, 2, 3, 7):
+        assert list(_tokens(io.StringIO(text), chunk_size=chunk_size)) == [
+            "a long key name", "{", "value with spaces", "x", "}"
+        ]
+
+
+def test_unterminated_string_is_malformed():
+    with pytest.raises(ValueError):
+        list(_tokens(io.StringIO('"key" "never closed')))
+
+
+def test_parse_vdf_nests_sections(tmp_path):
+    path = _write(tmp_path / "x.vdf", '"root"\n{\n\t"a"\t"1"\n\t"child"\n\t{\n\t\t"b"\t"2"\n\t}\n}\n')
+    assert parse_vdf(path) == {"root": {"a": "1", "child": {"b": "2"}}}
+
+
+# --- RESOLUTION ---
+def test_game_and_demo_are_found_by_appmanifest(steam):
+    library, steam_path, game_library = steam
+    assert library.library_folders() == [str(steam_path), str(game_library)]
+    assert library.install_dirs() == [
+        os.path.join(str(game_library), "steamapps", "common", "Crossfire Legion"),
+        os.path.join(str(steam_path), "steamapps", "common", "Crossfire Legion Demo Build"),
+    ]
+    assert library.app_id() == STEAM_APP_ID
+    assert library.game_exe().endswith(os.path.join("Crossfire Legion", GAME_EXE_NAME))
+
+
+def test_demo_alone_launches_under_its_own_appid(steam):
+    library, _, game_library = steam
+    os.remove(game_library / "steamapps" / f"appmanifest_{STEAM_APP_ID}.acf")
+    assert library.app_id() == DEMO_APP_ID
+    assert "Demo Build" in library.game_exe()
+
+
+def test_unchanged_files_are_not_parsed_again(steam, monkeypatch):
+    library, _, _ = steam
+    library.revalidate_interval = 3600
+    parsed = []
+    real_parse = steam_library.parse_vdf
+    monkeypatch.setattr(steam_library, "parse_vdf", lambda path: parsed.append(path) or real_parse(path))
+
+    first = library.install_dirs()
+    assert len(parsed) == 4  # libraryfolders.vdf and three manifests
+    assert library.install_dirs() == first
+    library.revalidate_interval = 0
+    assert library.install_dirs() == first
+    assert len(parsed) == 4
+
+
+def test_changed_manifest_is_parsed_again(steam, monkeypatch):
+    library, _, game_library = steam
+    library.install_dirs()
+    parsed = []
+    real_parse = steam_library.parse_vdf
+    monkeypatch.setattr(steam_library, "parse_vdf", lambda path: parsed.append(path) or real_parse(path))
+
+    steamapps = str(game_library / "steamapps")
+    _manifest(steamapps, STEAM_APP_ID, "Crossfire Legion Moved")
+    manifest = os.path.join(steamapps, f"appmanifest_{STEAM_APP_ID}.acf")
+    stat = os.stat(manifest)
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert library.install_dirs()[0].endswith("Crossfire Legion Moved")
+    assert parsed == [manifest]
+
+
+def test_missing_cached_exe_is_resolved_again(steam):
+    library, steam_path, game_library = steam
+    library.revalidate_interval = 3600
+    assert "Demo" not in library.game_exe()
+    os.remove(game_library / "steamapps" / "common" / "Crossfire Legion" / GAME_EXE_NAME)
+    assert "Demo Build" in library.game_exe()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import tracing
+from tracing import Tracer, format_summary, traced
+
+
+def test_nested_spans_record_their_parent():
+    tracer = Tracer()
+    with tracer.span("outer"):
+        with tracer.span("inner", values=3) as attrs:
+            attrs["note"] = "set inside"
+    inner, outer = tracer.spans()
+    assert (inner["name"], inner["parent"], outer["parent"]) == ("inner", "outer", None)
+    assert inner["values"] == 3 and inner["note"] == "set inside"
+    assert inner["ms"] <= outer["ms"]
+
+
+def test_parent_follows_the_context_into_threads_and_tasks():
+    tracer = Tracer()
+
+    def in_thread():
+        with tracer.span("thread"):
+            pass
+
+    async def child():
+        with tracer.span("task"):
+            await asyncio.to_thread(in_thread)
+
+    async def main():
+        with tracer.span("root"):
+            await asyncio.gather(child(), child())
+
+    asyncio.run(main())
+    parents = [(span["name"], span["parent"]) for span in tracer.spans()]
+    assert sorted(parents, key=str) == sorted(
+        [("thread", "task"), ("thread", "task"), ("task", "root"), ("task", "root"), ("root", None)], key=str
+    )
+
+    # A plain thread starts with an empty context: no parent leaks across
+    seen = []
+    with tracer.span("root"):
+        thread = threading.Thread(target=lambda: seen.append(tracing._current_span.get()))
+        thread.start()
+        thread.join()
+    assert seen == [None]
+
+
+def test_failed_span_is_recorded_and_reraised():
+    tracer = Tracer()
+    with pytest.raises(ValueError):
+        with tracer.span("boom"):
+            raise ValueError("x")
+    assert tracer.spans("boom")[0]["ok"] is False
+    assert tracing._current_span.get() is None
+
+
+def test_ring_buffer_keeps_only_the_newest_spans():
+    tracer = Tracer(capacity=5)
+    for i in range(12):
+        with tracer.span("step", i=i):
+            pass
+    assert [span["i"] for span in tracer.spans()] == [7, 8, 9, 10, 11]
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("off") as attrs:
+        attrs["x"] = 1
+    assert tracer.spans() == []
+
+
+def test_summary_percentiles():
+    tracer = Tracer()
+    for ms in range(1, 21):  # 1..20 ms
+        tracer._spans.append({"name": "apply", "ms": float(ms)})
+    tracer._spans.append({"name": "flush", "ms": 2.0})
+    summary = tracer.summary()
+    assert summary["apply"] == {"count": 20, "p50_ms": 10.5, "p95_ms": 19.0, "max_ms": 20.0}
+    assert summary["flush"]["p95_ms"] == 2.0
+    assert format_summary(summary).splitlines()[1].startswith("apply")
+
+
+def test_export_jsonl_writes_one_span_per_line(tmp_path):
+    tracer = Tracer()
+    with tracer.span("apply", locale="de-DE", extra=object()):
+        pass
+    with tracer.span("verify"):
+        pass
+    path = tmp_path / "trace.jsonl"
+    assert tracer.export_jsonl(str(path)) == 2
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["name"] for line in lines] == ["apply", "verify"]
+    assert lines[0]["locale"] == "de-DE"
+    assert isinstance(lines[0]["extra"], str)  # not JSON serializable: written with str()
+
+
+def test_traced_wraps_sync_and_async_functions(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, "TRACER", tracer)
+
+    @traced("sync")
+    def sync(x):
+        return x + 1
+
+    @traced("async")
+    async def run(x):
+        return x * 2
+
+    assert sync(1) == 2
+    assert asyncio.run(run(2)) == 4
+    assert [span["name"] for span in tracer.spans()] == ["sync", "async"]
@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+from os_backend import HKCU, INTERNATIONAL_KEY
+from ui_handlers import update_status, watch_locale_status
+from ui_scheduler import UpdateScheduler
+
+
+class FakePage:
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.updates = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+
+def _status_panel():
+    controls = [None, None, SimpleNamespace(value=""), SimpleNamespace(value="")]
+    return SimpleNamespace(content=SimpleNamespace(controls=controls))
+
+
+def _buttons():
+    def button(text, bgcolor):
+        return SimpleNamespace(text=text, disabled=False, bgcolor=bgcolor)
+
+    return {
+        "set_en_us_btn": button("Set to EN-US", "#2d5a3d"),
+        "fast_en_us_btn": button("Fast EN-US (Live)", "#2d5a3d"),
+        "revert_default_btn": button("Revert to Default", "#5a3d2d"),
+    }
+
+
+def test_marks_in_one_tick_are_sent_as_one_update():
+    async def interaction():
+        page = FakePage(asyncio.get_running_loop())
+        scheduler = UpdateScheduler(page)
+        first, second = object(), object()
+        scheduler.mark(first)
+        scheduler.mark(second, first)
+        scheduler.mark(second)
+        await asyncio.sleep(0)
+        return page, scheduler, first, second
+
+    page, scheduler, first, second = asyncio.run(interaction())
+    assert scheduler.updates_sent == 1
+    assert len(page.updates) == 1
+    assert set(map(id, page.updates[0])) == {id(first), id(second)}
+
+
+def test_full_update_wins_over_dirty_controls():
+    page = FakePage()
+    scheduler = UpdateScheduler(page)
+    scheduler._scheduled = True  # hold the flush as if the event loop had not run yet
+    scheduler.mark(object())
+    scheduler.mark()
+    scheduler.flush()
+    assert page.updates == [()]
+    assert scheduler.updates_sent == 1
+
+
+def test_flush_without_changes_sends_nothing():
+    scheduler = UpdateScheduler(FakePage())
+    scheduler.flush()
+    assert scheduler.updates_sent == 0
+
+
+def test_status_refresh_stays_within_update_budget():
+    page = FakePage()
+    page.ui_scheduler = UpdateScheduler(page)
+    rfc = SimpleNamespace(default_locale="de-DE", current_locale=None)
+    panel, buttons = _status_panel(), _buttons()
+
+    update_status(page, rfc, panel, buttons, {"locale": "en-US", "country": "United States"})
+    assert page.ui_scheduler.updates_sent == 1
+    assert len(page.updates[0]) == 3  # both status lines and the fast button
+
+    # Nothing changed: re-rendering the same state must not reach the client
+    page.ui_scheduler.reset_count()
+    update_status(page, rfc, panel, buttons, {"locale": "en-US", "country": "United States"})
+    assert page.ui_scheduler.updates_sent == 0
+
+
+def test_live_status_follows_external_changes_until_unsubscribed(make_changer):
+    rfc = make_changer()
+    panel, buttons = _status_panel(), _buttons()
+
+    async def wait_for(condition):
+        for _ in range(500):
+            if condition():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    async def session():
+        page = FakePage(asyncio.get_running_loop())
+        page.ui_scheduler = UpdateScheduler(page)
+        assert rfc.start_locale_watch()
+        unsubscribe = watch_locale_status(page, rfc, panel, buttons)
+        try:
+            # Changed outside the tool, e.g. in Windows Settings
+            rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"LocaleName": "en-US", "sCountry": "United States"})
+            assert await wait_for(lambda: panel.content.controls[2].value == "Current: en-US (United States)")
+            assert buttons["fast_en_us_btn"].disabled
+
+            unsubscribe()
+            sent = page.ui_scheduler.updates_sent
+            rfc.backend.write_values(HKCU, INTERNATIONAL_KEY, {"LocaleName": "fr-FR"})
+            assert await wait_for(lambda: rfc.get_current_locale()["locale"] == "fr-FR")
+            await asyncio.sleep(0.05)
+            assert page.ui_scheduler.updates_sent == sent
+            assert panel.content.controls[2].value == "Current: en-US (United States)"
+        finally:
+            rfc.stop_locale_watch()
+
+    asyncio.run(session())
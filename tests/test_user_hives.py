@@ -0,0 +1,97 @@
+import pytest
+
+from os_backend import HKCU, HKLM, HKU, INTERNATIONAL_KEY, InMemoryBackend
+from user_hives import PROFILE_LIST_KEY, UserProfile, list_profiles, mounted_hive
+
+SIGNED_IN = "S-1-5-21-1000-1001"
+SIGNED_OUT = "S-1-5-21-1000-1002"
+SYSTEM = "S-1-5-18"
+
+
+def _seed(backend, german):
+    """One signed-in and one signed-out account (both German), plus SYSTEM."""
+    for sid, path in ((SIGNED_IN, r"C:\Users\anna"), (SIGNED_OUT, r"C:\Users\ben"), (SYSTEM, r"C:\Windows\system32")):
+        backend.set_key(HKLM, f"{PROFILE_LIST_KEY}\\{sid}", {"ProfileImagePath": path})
+    backend.set_key(HKU, f"{SIGNED_IN}\\{INTERNATIONAL_KEY}", dict(german))
+    backend.set_key(HKU, f"{SIGNED_IN}_Classes\\Local Settings", {})
+    backend.hive_files[r"C:\Users\ben\NTUSER.DAT"] = {INTERNATIONAL_KEY: dict(german, Binary=b"\x01")}
+
+
+@pytest.fixture
+def rfc(make_changer):
+    rfc = make_changer()
+    _seed(rfc.backend, rfc.get_locale_overrides("de-DE"))
+    return rfc
+
+
+def test_list_profiles_covers_user_accounts_only(rfc):
+    profiles = {profile.sid: profile for profile in list_profiles(rfc.backend)}
+    assert set(profiles) == {SIGNED_IN, SIGNED_OUT}
+    assert profiles[SIGNED_IN].loaded
+    assert not profiles[SIGNED_OUT].loaded
+    assert profiles[SIGNED_OUT].profile_path == r"C:\Users\ben"
+
+
+def test_list_profiles_skips_half_deleted_profile():
+    backend = InMemoryBackend()
+    backend.set_key(HKLM, f"{PROFILE_LIST_KEY}\\{SIGNED_OUT}", {})
+    assert list_profiles(backend) == []
+
+
+def test_mounted_hive_loads_and_unloads_signed_out_profile():
+    backend = InMemoryBackend()
+    backend.hive_files[r"C:\Users\ben\NTUSER.DAT"] = {INTERNATIONAL_KEY: {"sDecimal": ","}}
+    profile = UserProfile(SIGNED_OUT, r"C:\Users\ben", False)
+    with mounted_hive(backend, profile) as hive:
+        assert hive != SIGNED_OUT
+        assert backend.loaded_hives == {hive: r"C:\Users\ben\NTUSER.DAT"}
+        backend.write_values(HKU, f"{hive}\\{INTERNATIONAL_KEY}", {"sDecimal": "."})
+    assert backend.loaded_hives == {}
+    assert backend.hive_files[r"C:\Users\ben\NTUSER.DAT"][INTERNATIONAL_KEY]["sDecimal"] == "."
+
+
+def test_mounted_hive_unloads_even_when_the_block_fails():
+    backend = InMemoryBackend()
+    backend.hive_files[r"C:\Users\ben\NTUSER.DAT"] = {INTERNATIONAL_KEY: {}}
+    with pytest.raises(RuntimeError):
+        with mounted_hive(backend, UserProfile(SIGNED_OUT, r"C:\Users\ben", False)):
+            raise RuntimeError("write failed")
+    assert backend.loaded_hives == {}
+
+
+def test_mounted_hive_uses_signed_in_profile_in_place():
+    backend = InMemoryBackend()
+    with mounted_hive(backend, UserProfile(SIGNED_IN, r"C:\Users\anna", True)) as hive:
+        assert hive == SIGNED_IN
+    assert backend.calls["hive"] == 0
+
+
+def test_apply_and_revert_every_user(rfc):
+    results = rfc.apply_to_all_users("en-US")
+    assert set(results) == {SIGNED_IN, SIGNED_OUT}
+    assert all(result["success"] and result["changed"] for result in results.values())
+    assert results[SIGNED_OUT]["loaded_on_demand"]
+    assert rfc.backend.read_values(HKU, f"{SIGNED_IN}\\{INTERNATIONAL_KEY}")["LocaleName"] == "en-US"
+    ben = rfc.backend.hive_files[r"C:\Users\ben\NTUSER.DAT"][INTERNATIONAL_KEY]
+    assert ben["LocaleName"] == "en-US"
+    # The signed-in user running the tool is not touched through HKCU
+    assert rfc.backend.read_values(HKCU, INTERNATIONAL_KEY)["LocaleName"] == "de-DE"
+
+    assert all(r["message"].endswith("(already set)") for r in rfc.apply_to_all_users("en-US").values())
+
+    results = rfc.apply_to_all_users(revert=True)
+    assert all(result["success"] for result in results.values())
+    assert rfc.backend.read_values(HKU, f"{SIGNED_IN}\\{INTERNATIONAL_KEY}")["LocaleName"] == "de-DE"
+    ben = rfc.backend.hive_files[r"C:\Users\ben\NTUSER.DAT"][INTERNATIONAL_KEY]
+    assert ben["LocaleName"] == "de-DE"
+    # Not a string value, so not in the snapshot's values; still must survive the revert
+    assert ben["Binary"] == b"\x01"
+    assert rfc.backend.loaded_hives == {}
+
+
+def test_one_failing_hive_does_not_stop_the_others(rfc):
+    del rfc.backend.hive_files[r"C:\Users\ben\NTUSER.DAT"]
+    results = rfc.apply_to_all_users("en-US")
+    assert results[SIGNED_IN]["success"]
+    assert not results[SIGNED_OUT]["success"]
+    assert "not found" in results[SIGNED_OUT]["message"]
@@ -0,0 +1,134 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Name of the innermost open span; contextvars follow asyncio tasks and asyncio.to_thread
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Lightweight span recorder for locale operations, launches and UI handlers.
+
+    Each span is a dict {"name", "parent", "start", "ms", "ok", "thread", ...attrs}
+    where "start" is a perf_counter timestamp (monotonic; only meaningful
+    relative to other spans of the same process). Finished spans go to a
+    ring buffer of `capacity` entries, so memory stays bounded however long
+    the app runs.
+    """
+
+    def __init__(self, capacity=2000, enabled=True):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the enclosed block as span `name`; nested spans record it as their parent.
+
+        Yields the attrs dict, so the block can add fields or set "ok" itself
+        (e.g. for operations that report failure instead of raising).
+        """
+        if not self.enabled:
+            yield attrs
+            return
+        parent = _current_span.get()
+        token = _current_span.set(name)
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield attrs
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _current_span.reset(token)
+            record = {
+                "name": name,
+                "parent": parent,
+                "start": start,
+                "ms": duration * 1000,
+                "ok": ok,
+                "thread": threading.current_thread().name,
+            }
+            record.update(attrs)
+            with self._lock:
+                self._spans.append(record)
+
+    def spans(self, name=None):
+        """Return recorded spans, oldest first (optionally only those called `name`)."""
+        with self._lock:
+            spans = list(self._spans)
+        return [s for s in spans if name is None or s["name"] == name]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def export_jsonl(self, path):
+        """Write every buffered span as one JSON object per line; returns the count written."""
+        import json
+        spans = self.spans()
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str))
+                f.write("\n")
+        return len(spans)
+
+    def summary(self):
+        """Return {span name: {"count", "p50_ms", "p95_ms", "max_ms"}} over the buffer."""
+        # Imported here: only the diagnostics panel and benchmarks summarize
+        import statistics
+        durations = {}
+        for span in self.spans():
+            durations.setdefault(span["name"], []).append(span["ms"])
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "p50_ms": statistics.median(values),
+                "p95_ms": values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))],
+                "max_ms": values[-1],
+            }
+        return summary
+
+
+# Process-wide tracer used by regional_utils, ui_handlers and cli
+TRACER = Tracer()
+
+
+def span(name, **attrs):
+    """Shorthand for TRACER.span()."""
+    return TRACER.span(name, **attrs)
+
+
+def format_summary(summary):
+    """Render Tracer.summary() as a fixed-width table, slowest p95 first."""
+    lines = [f"{'span':<22}{'n':>5}{'p50':>10}{'p95':>10}"]
+    for name, stats in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"]):
+        lines.append(f"{name[:21]:<22}{stats['count']:>5}{stats['p50_ms']:>8.1f}ms{stats['p95_ms']:>8.1f}ms")
+    return "\n".join(lines)
+
+
+def traced(name):
+    """Decorator running each call of a function (sync or async) inside span `name`."""
+    import inspect
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with TRACER.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
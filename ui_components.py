@@ -212,3 +212,36 @@ def create_path_input_section():
     )
     return container, browse_btn, game_path_input
 
+def create_diagnostics_panel():
+    """Create the optional diagnostics panel (per-phase timing summary and trace export)"""
+    summary_text = ft.Text(
+        "No operations traced yet",
+        size=10,
+        color="#aaaaaa",
+        font_family="Consolas",
+        selectable=True
+    )
+
+    export_btn = ft.ElevatedButton(
+        text="💾 Export Trace",
+        bgcolor="#2d4a5a",
+        color="#ffffff",
+        style=ft.ButtonStyle(
+            shape=ft.RoundedRectangleBorder(radius=4),
+            elevation=2,
+        ),
+        height=32,
+        width=140
+    )
+
+    container = ft.Container(
+        content=ft.Column([
+            ft.Text("DIAGNOSTICS", size=14, color="#ffffff", weight=ft.FontWeight.BOLD),
+            ft.Divider(color="#333333", height=1),
+            summary_text,
+            ft.Row([export_btn], alignment=ft.MainAxisAlignment.END)
+        ], spacing=8),
+        padding=ft.padding.all(15),
+        border=ft.border.all(1, "#333333")
+    )
+    return container, summary_text, export_btn
@@ -1,6 +1,14 @@
-import flet as ft
 import os
+import math
 import asyncio
+import threading
+from datetime import datetime
+
+from tracing import TRACER, format_summary, span, traced
+from ui_scheduler import UpdateScheduler
+
+# Hard ceiling for one apply/revert run (PowerShell culture sync alone may take 60s)
+LOCALE_OPERATION_TIMEOUT = 90
 
 def setup_ui_handlers(page, rfc, status_text, status_container, path_input_section, buttons, browse_button=None, path_input=None):
     """Setup all UI event handlers and state management"""
@@ -28,10 +36,28 @@ def setup_ui_handlers(page, rfc, status_text, status_container, path_input_secti
     page.game_path_input = game_path_input
     page.rfc = rfc
     page.status_text = status_text
+    # All control changes go through one coalescing scheduler instead of page.update()
+    page.ui_scheduler = UpdateScheduler(page)
+    # Cancel event of the locale operation currently running on a worker thread
+    page.locale_cancel_event = None
+
+    # Stop any running apply/revert at its next phase when the window goes away
+    def on_disconnect(e):
+        if page.locale_cancel_event is not None:
+            page.locale_cancel_event.set()
+        unwatch_status()
+        rfc.stop_locale_watch()
+        rfc.stop_game_watch()
+        rfc.stop_log_monitor()
+        rfc.flush_config()
+        control_server = getattr(page, "control_server", None)
+        if control_server is not None:
+            control_server.close()
+    page.on_disconnect = on_disconnect
 
-    # Load saved game path if available
+    # Load saved game path if available, else the install found in the Steam libraries
     try:
-        saved_path = rfc.load_game_path()
+        saved_path = rfc.load_game_path() or rfc.find_game_exe()
         if saved_path:
             game_path_input.value = saved_path
     except Exception:
@@ -40,14 +66,16 @@ def setup_ui_handlers(page, rfc, status_text, status_container, path_input_secti
     # Auto-save when user edits the path field
     def on_game_path_changed(e):
         try:
+            # Only updates memory; the file is written once typing pauses
             rfc.save_game_path(game_path_input.value or "")
-            status_text.value = "✅ Path saved"
-            status_text.color = "#4CAF50"
-            page.update()
+            if status_text.value != "✅ Path saved":
+                status_text.value = "✅ Path saved"
+                status_text.color = "#4CAF50"
+                schedule_update(page, status_text)
         except Exception as ex:
             status_text.value = f"⚠️ Could not save path: {ex}"
             status_text.color = "#ffa500"
-            page.update()
+            schedule_update(page, status_text)
     game_path_input.on_change = on_game_path_changed
     
     # Setup button click handlers
@@ -55,15 +83,106 @@ def setup_ui_handlers(page, rfc, status_text, status_container, path_input_secti
     fast_en_us_btn.on_click = lambda e: on_fast_set_en_us(e, page, rfc, status_text, status_container, buttons)
     refresh_btn.on_click = lambda e: on_refresh(e, page, rfc, status_text, status_container, buttons)
     revert_default_btn.on_click = lambda e: on_revert_default(e, page, rfc, status_text, status_container, buttons)
-    launch_game_btn.on_click = lambda e: on_launch_game(e, page, rfc, status_text)
-    offline_launch_btn.on_click = lambda e: on_launch_manual(e, page, rfc, status_text)
+    launch_game_btn.on_click = lambda e: on_launch_game(e, page, rfc, status_text, status_container, buttons)
+    offline_launch_btn.on_click = lambda e: on_launch_manual(e, page, rfc, status_text, status_container, buttons)
     browse_btn.on_click = lambda e: browse_for_game_file(e, page, game_path_input, status_text, rfc)
 
+    # Status panel follows locale changes made outside the app (Windows Settings, other instances)
+    unwatch_status = watch_locale_status(page, rfc, status_container, buttons)
+
+def setup_diagnostics(page, rfc, summary_text, export_btn):
+    """Wire the optional diagnostics panel (shown with --diagnostics)."""
+    page.diagnostics_text = summary_text
+    export_btn.on_click = lambda e: on_export_trace(e, page, rfc)
+    update_diagnostics(page)
+
+def update_diagnostics(page):
+    """Refresh the per-phase p50/p95 table, if the diagnostics panel is shown."""
+    summary_text = getattr(page, "diagnostics_text", None)
+    if summary_text is None:
+        return
+    summary = TRACER.summary()
+    if summary:
+        summary_text.value = format_summary(summary)
+        schedule_update(page, summary_text)
+
+def on_export_trace(e, page, rfc):
+    """Write the buffered spans as JSONL next to the app's configs."""
+    status_text = page.status_text
+    path = os.path.join(rfc._get_app_dir(), f"trace-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+    try:
+        count = TRACER.export_jsonl(path)
+        status_text.value = f"✅ Exported {count} spans to {os.path.basename(path)}"
+        status_text.color = "#4CAF50"
+    except Exception as ex:
+        status_text.value = f"❌ Could not export trace: {ex}"
+        status_text.color = "#f44336"
+    schedule_update(page, status_text)
+
+def start_control_server(page, rfc, status_container, buttons):
+    """Serve cli.py commands from later launches, scripts and stream decks in this process.
+
+    Runs the same handlers as cli.py against this window's RegionalFormatChanger,
+    then refreshes the status display. Returns the server, or None if another
+    instance already owns the endpoint.
+    """
+    import cli
+    import instance_ipc
+
+    status_text = page.status_text
+
+    def handle(argv):
+        if argv == ["show"]:
+            # A second launch of the app: bring this window forward instead
+            try:
+                page.window.minimized = False
+                page.window.to_front()
+            except Exception as e:
+                print(f"Error bringing window to front: {e}")
+            schedule_update(page)
+            return {"command": "show", "success": True, "message": "Brought the running window to front"}
+        # Runs on the connection's thread; applies and reverts queue behind any running in this
+        # window (rfc holds one operation lock), and broadcast options stay per command;
+        # serve_request refuses what an unelevated client should not get from us
+        result = cli.serve_request(rfc, argv)
+        status_text.value = f"📡 {result['command']}: {result['message']}"
+        status_text.color = "#4CAF50" if result["success"] else "#f44336"
+        schedule_update(page, status_text)
+        update_status(page, rfc, status_container, buttons)
+        update_diagnostics(page)
+        return result
+
+    try:
+        server = instance_ipc.ControlServer(handle).start()
+    except instance_ipc.AlreadyRunning:
+        print("Another instance owns the control endpoint; not serving commands")
+        return None
+    except Exception as e:
+        print(f"Error starting control server: {e}")
+        return None
+    page.control_server = server
+    return server
+
+def schedule_update(page, *controls, immediate=False):
+    """Queue controls for the next coalesced update (the whole page when none are given).
+
+    `immediate` flushes right away, for changes the client must see before
+    the handler continues (e.g. a FilePicker added to page.overlay).
+    """
+    scheduler = getattr(page, "ui_scheduler", None)
+    if scheduler is None:
+        page.update()
+        return
+    scheduler.mark(*controls)
+    if immediate:
+        scheduler.flush()
+
+@traced("ui.set_en_us")
 def on_set_en_us(e, page, rfc, status_text):
     """Handle setting locale to EN-US"""
     status_text.value = "➡️ Opening Windows Settings for Region..."
     status_text.color = "#ffa500"
-    page.update()
+    schedule_update(page, status_text)
 
     success = rfc.set_locale_to_en_us()
     if success:
@@ -73,38 +192,65 @@ def on_set_en_us(e, page, rfc, status_text):
         status_text.value = "❌ Failed to open Settings."
         status_text.color = "#f44336"
 
-    page.update()
+    schedule_update(page, status_text)
+    update_diagnostics(page)
     page.run_task(delayed_update, page, status_text)
 
 def on_fast_set_en_us(e, page, rfc, status_text, status_container, buttons):
     """Quickly apply EN-US regional format via registry and broadcast."""
-    buttons['fast_en_us_btn'].disabled = True
-    buttons['revert_default_btn'].disabled = True
-    status_text.value = "⚡ Applying EN-US regional format..."
-    status_text.color = "#ffa500"
-    page.update()
-
-    success, message = rfc.apply_locale_quick("en-US")
-    if success:
-        status_text.value = f"✅ {message}"
-        status_text.color = "#4CAF50"
-    else:
-        status_text.value = f"❌ {message}"
-        status_text.color = "#f44336"
-
-    update_status(page, rfc, status_container, buttons)
-    page.update()
-    page.run_task(button_cooldown, page, buttons, 15, rfc, status_container)
+    page.run_task(
+        run_locale_operation, page, rfc, status_text, status_container, buttons,
+        "⚡ Applying EN-US regional format...", rfc.apply_locale_quick, "en-US"
+    )
 
 def on_revert_default(e, page, rfc, status_text, status_container, buttons):
     """Revert regional format to saved default from config."""
+    page.run_task(
+        run_locale_operation, page, rfc, status_text, status_container, buttons,
+        "↩️ Reverting to default regional format...", rfc.revert_to_default_quick
+    )
+
+async def run_locale_operation(page, rfc, status_text, status_container, buttons, start_message, operation, *args):
+    """Run a blocking apply/revert on a worker thread, streaming its phases into status_text."""
     buttons['fast_en_us_btn'].disabled = True
     buttons['revert_default_btn'].disabled = True
-    status_text.value = "↩️ Reverting to default regional format..."
+    status_text.value = start_message
     status_text.color = "#ffa500"
-    page.update()
+    schedule_update(page, status_text, buttons['fast_en_us_btn'], buttons['revert_default_btn'])
+
+    loop = asyncio.get_running_loop()
+    cancel_event = threading.Event()
+    page.locale_cancel_event = cancel_event
+
+    def show_progress(phase, message):
+        status_text.value = f"⏳ {message}"
+        status_text.color = "#ffa500"
+        schedule_update(page, status_text)
+
+    def progress(phase, message):
+        # Called on the worker thread; hop back to the event loop before touching controls
+        loop.call_soon_threadsafe(show_progress, phase, message)
+
+    try:
+        # Spans recorded on the worker thread get this one as their parent (context is copied)
+        with span(f"ui.{operation.__name__}") as record:
+            success, message = await asyncio.wait_for(
+                asyncio.to_thread(operation, *args, progress=progress, cancel_event=cancel_event),
+                LOCALE_OPERATION_TIMEOUT
+            )
+            record["ok"] = success
+    except asyncio.TimeoutError:
+        cancel_event.set()
+        success, message = False, f"Timed out after {LOCALE_OPERATION_TIMEOUT}s"
+    except asyncio.CancelledError:
+        cancel_event.set()
+        raise
+    except Exception as ex:
+        success, message = False, f"Operation failed: {ex}"
+    finally:
+        if page.locale_cancel_event is cancel_event:
+            page.locale_cancel_event = None
 
-    success, message = rfc.revert_to_default_quick()
     if success:
         status_text.value = f"✅ {message}"
         status_text.color = "#4CAF50"
@@ -113,63 +259,118 @@ def on_revert_default(e, page, rfc, status_text, status_container, buttons):
         status_text.color = "#f44336"
 
     update_status(page, rfc, status_container, buttons)
-    page.update()
-    page.run_task(button_cooldown, page, buttons, 15, rfc, status_container)
+    schedule_update(page, status_text)
+    update_diagnostics(page)
+    await button_cooldown(page, buttons, rfc, status_container)
 
+@traced("ui.refresh")
 def on_refresh(e, page, rfc, status_text, status_container, buttons):
     """Handle manual refresh"""
-    status_text.value = "🔄 Refreshing status..."
-    status_text.color = "#2196F3"
-    page.update()
-    
+    # Explicit refresh is the one place that forces a re-read from the OS
+    rfc.locale_state.invalidate()
     update_status(page, rfc, status_container, buttons)
     status_text.value = "✅ Status refreshed"
     status_text.color = "#4CAF50"
-    page.update()
+    schedule_update(page, status_text)
 
-def on_launch_game(e, page, rfc, status_text):
+@traced("ui.launch_game")
+def on_launch_game(e, page, rfc, status_text, status_container=None, buttons=None):
     """Handle launching Crossfire: Legion via Steam"""
     status_text.value = "🚀 Launching Crossfire: Legion via Steam..."
     status_text.color = "#ffa500"
-    page.update()
+    schedule_update(page, status_text)
     
+    # Subscribe to Player.log before launching so the new game's first lines are not missed
+    start_timestep_check(page, rfc, status_text)
     success, message = rfc.launch_crossfire_legion()
     if success:
         status_text.value = f"✅ {message}"
         status_text.color = "#4CAF50"
+        start_auto_revert(page, rfc, status_text, status_container, buttons)
     else:
+        rfc.stop_log_monitor()
         status_text.value = f"❌ {message}"
         status_text.color = "#f44336"
     
-    page.update()
+    schedule_update(page, status_text)
+    update_diagnostics(page)
     page.run_task(delayed_update, page, status_text)
 
-def on_launch_manual(e, page, rfc, status_text):
+@traced("ui.launch_manual")
+def on_launch_manual(e, page, rfc, status_text, status_container=None, buttons=None):
     """Handle launching Crossfire: Legion from manual path"""
     game_path = page.game_path_input.value
     if not game_path:
         status_text.value = "❌ Please enter a game path first"
         status_text.color = "#f44336"
-        page.update()
+        schedule_update(page, status_text)
         return
     
     status_text.value = "🎮 Launching Crossfire: Legion from manual path..."
     status_text.color = "#ffa500"
-    page.update()
+    schedule_update(page, status_text)
     
+    # Subscribe to Player.log before launching so the new game's first lines are not missed
+    start_timestep_check(page, rfc, status_text)
     success, message = rfc.launch_manual_path(game_path)
     if success:
         status_text.value = f"✅ {message}"
         status_text.color = "#4CAF50"
+        start_auto_revert(page, rfc, status_text, status_container, buttons)
     else:
+        rfc.stop_log_monitor()
         status_text.value = f"❌ {message}"
         status_text.color = "#f44336"
     
-    page.update()
+    schedule_update(page, status_text)
+    update_diagnostics(page)
     page.run_task(delayed_update, page, status_text)
 
+def start_auto_revert(page, rfc, status_text, status_container, buttons):
+    """Revert to the default locale automatically once the launched game exits."""
+    if status_container is None or buttons is None:
+        return
+
+    def on_game_exit(found, message):
+        # Runs on the watcher thread
+        if not found:
+            status_text.value = f"⚠️ {message}; auto-revert skipped"
+            status_text.color = "#ffa500"
+            schedule_update(page, status_text)
+            return
+        rfc.archive_player_log()
+        current = rfc.get_current_locale().get("locale", "")
+        if rfc.default_locale and current.lower() == str(rfc.default_locale).lower():
+            return
+        page.run_task(
+            run_locale_operation, page, rfc, status_text, status_container, buttons,
+            f"🎮 {message}, reverting to default...", rfc.revert_to_default_quick
+        )
+
+    rfc.watch_game(on_game_exit)
+
+def start_timestep_check(page, rfc, status_text):
+    """Show whether the game parsed its timestep correctly as soon as Player.log says so."""
+    def on_timestep(ok, line, culture):
+        # Runs on the Player.log monitor thread
+        culture_note = f", culture {culture}" if culture else ""
+        if ok:
+            status_text.value = f"✅ Game timestep parsed correctly ({line.value}{culture_note})"
+            status_text.color = "#4CAF50"
+        else:
+            status_text.value = f"⚠️ Game timestep parsed as {line.value}{culture_note} - speed bug active, apply EN-US and restart the game"
+            status_text.color = "#f44336"
+        schedule_update(page, status_text)
+
+    try:
+        rfc.monitor_player_log(on_timestep)
+    except Exception as e:
+        print(f"Player.log monitor unavailable: {e}")
+
 def browse_for_game_file(e, page, game_path_input, status_text, rfc):
     """Open a file dialog to select a game executable."""
+    # Imported on first use so flet's control classes are not needed at handler wiring time
+    import flet as ft
     try:
         # Reuse a persistent file picker attached to page
         if not hasattr(page, "file_picker") or page.file_picker is None:
@@ -178,7 +379,7 @@ def browse_for_game_file(e, page, game_path_input, status_text, rfc):
                     on_result=lambda res: handle_file_picker_result(res, page, game_path_input, rfc)
                 )
                 page.overlay.append(page.file_picker)
-                page.update()
+                schedule_update(page, immediate=True)
             except Exception:
                 page.file_picker = None
 
@@ -197,12 +398,12 @@ def browse_for_game_file(e, page, game_path_input, status_text, rfc):
                     on_result=lambda res: handle_file_picker_result(res, page, game_path_input, rfc)
                 )
                 page.overlay.append(temp_picker)
-                page.update()
+                schedule_update(page, immediate=True)
                 temp_picker.pick_files(allow_multiple=False, allowed_extensions=["exe"], initial_directory="C:\\")
         except Exception as ex:
             status_text.value = f"❌ Browse not supported: {ex}"
             status_text.color = "#f44336"
-            page.update()
+            schedule_update(page, status_text)
             # Fallback using tkinter
             try:
                 import tkinter as tk
@@ -221,14 +422,14 @@ def browse_for_game_file(e, page, game_path_input, status_text, rfc):
                     except Exception:
                         status_text.value = "⚠️ Could not save path"
                         status_text.color = "#ffa500"
-                    page.update()
+                    schedule_update(page, status_text, game_path_input)
             except Exception:
                 pass
         
     except Exception as e:
         status_text.value = f"❌ Browse error: {e}"
         status_text.color = "#f44336"
-        page.update()
+        schedule_update(page, status_text)
 
 def handle_file_picker_result(e, page, game_path_input, rfc):
     """Handle the result from file picker"""
@@ -246,7 +447,7 @@ def handle_file_picker_result(e, page, game_path_input, rfc):
             except Exception:
                 page.status_text.value = "⚠️ Could not save path, will still use it now"
                 page.status_text.color = "#ffa500"
-        page.update()
+        schedule_update(page, page.status_text, game_path_input)
     
     # Remove the file picker from overlay
     # Keep picker in overlay for reuse; do not pop
@@ -257,10 +458,15 @@ async def delayed_update(page, status_text):
     await asyncio.sleep(3)
     status_text.value = "Ready for operations"
     status_text.color = "#ffffff"
-    page.update()
+    schedule_update(page, status_text)
+
+async def button_cooldown(page, buttons, rfc, status_container):
+    """Keep the fast change buttons disabled until the shared cooldown ends.
 
-async def button_cooldown(page, buttons, duration, rfc, status_container):
-    """Disables fast change buttons for a duration, then re-enables them by refreshing status."""
+    The cooldown ends as soon as a probe process sees the new culture (or at
+    rfc.cooldown_max seconds); another instance may end it too. Only the two
+    buttons are redrawn, and only when their countdown text changes.
+    """
     fast_btn = buttons['fast_en_us_btn']
     revert_btn = buttons['revert_default_btn']
     
@@ -270,33 +476,49 @@ async def button_cooldown(page, buttons, duration, rfc, status_container):
     fast_btn.disabled = True
     revert_btn.disabled = True
 
-    for i in range(duration, 0, -1):
-        cooldown_text = f"Cooldown ({i}s)"
-        fast_btn.text = cooldown_text
-        revert_btn.text = cooldown_text
-        page.update()
-        await asyncio.sleep(1)
+    remaining = await asyncio.to_thread(rfc.check_cooldown)
+    while remaining > 0:
+        cooldown_text = f"Cooldown ({math.ceil(remaining)}s)"
+        if fast_btn.text != cooldown_text:
+            fast_btn.text = cooldown_text
+            revert_btn.text = cooldown_text
+            schedule_update(page, fast_btn, revert_btn)
+        await asyncio.sleep(min(0.5, remaining))
+        remaining = await asyncio.to_thread(rfc.check_cooldown)
     
     fast_btn.text = original_fast_text
     revert_btn.text = original_revert_text
     update_status(page, rfc, status_container, buttons)
-    page.update()
 
-def update_status(page, rfc, status_container, buttons):
-    """Update the status display"""
-    current_data = rfc.get_current_locale()
+def _set_props(control, changed, **props):
+    """Assign props to a control and add it to `changed` only if something differs."""
+    if control is None:
+        return
+    if any(getattr(control, name) != value for name, value in props.items()):
+        for name, value in props.items():
+            setattr(control, name, value)
+        changed.append(control)
+
+def update_status(page, rfc, status_container, buttons, current_data=None):
+    """Update the status display from the cached locale state (or `current_data` if given).
+
+    Only controls whose text, colour or state actually changed are sent to the client.
+    """
+    if current_data is None:
+        current_data = rfc.get_current_locale()
     current_locale = current_data.get("locale", "Unknown")
     rfc.current_locale = current_locale
+    changed = []
     
     # Update status displays
     current_status = status_container.content.controls[2]  # Get current status text
     default_status = status_container.content.controls[3]  # Get default status text
     
-    current_status.value = f"Current: {current_locale}"
+    current_value = f"Current: {current_locale}"
     if current_data.get("country"):
-        current_status.value += f" ({current_data['country']})"
-    
-    default_status.value = f"Default: {rfc.default_locale}"
+        current_value += f" ({current_data['country']})"
+    _set_props(current_status, changed, value=current_value)
+    _set_props(default_status, changed, value=f"Default: {rfc.default_locale}")
     
     # Update button states using the buttons dictionary
     set_en_us_btn = buttons['set_en_us_btn']
@@ -306,31 +528,51 @@ def update_status(page, rfc, status_container, buttons):
     is_en_us = current_locale.lower() == "en-us"
     
     # "Set to EN-US" button is always clickable
-    set_en_us_btn.disabled = False
-    set_en_us_btn.text = "Set to EN-US"
-    set_en_us_btn.bgcolor = "#2d5a3d"
+    _set_props(set_en_us_btn, changed, disabled=False, text="Set to EN-US", bgcolor="#2d5a3d")
 
     # Handle fast change buttons, respecting cooldown
     if fast_en_us_btn and not fast_en_us_btn.text.startswith("Cooldown"):
         if is_en_us:
-            fast_en_us_btn.disabled = True
-            fast_en_us_btn.text = "✓ Already EN-US"
-            fast_en_us_btn.bgcolor = "#1a4d3a"
+            _set_props(fast_en_us_btn, changed, disabled=True, text="✓ Already EN-US", bgcolor="#1a4d3a")
         else:
-            fast_en_us_btn.disabled = False
-            fast_en_us_btn.text = "Fast EN-US (Live)"
-            fast_en_us_btn.bgcolor = "#2d5a3d"
+            _set_props(fast_en_us_btn, changed, disabled=False, text="Fast EN-US (Live)", bgcolor="#2d5a3d")
 
     # Revert button state, respecting cooldown
     if revert_default_btn and not revert_default_btn.text.startswith("Cooldown"):
         if rfc.default_locale and current_locale.lower() == str(rfc.default_locale).lower():
-            revert_default_btn.disabled = True
-            revert_default_btn.text = "✓ Already Default"
-            revert_default_btn.bgcolor = "#4d3a1a"
+            _set_props(revert_default_btn, changed, disabled=True, text="✓ Already Default", bgcolor="#4d3a1a")
         else:
-            revert_default_btn.disabled = False
-            revert_default_btn.text = "Revert to Default"
-            revert_default_btn.bgcolor = "#5a3d2d"
+            _set_props(revert_default_btn, changed, disabled=False, text="Revert to Default", bgcolor="#5a3d2d")
     
-    page.update()
+    if changed:
+        schedule_update(page, *changed)
+
+def watch_locale_status(page, rfc, status_container, buttons):
+    """Keep the status panel live: re-render it whenever the International key changes.
+
+    Driven by the registry watcher (no polling), so changes made in Windows
+    Settings or by another instance show up on their own. Returns a function
+    that unsubscribes; later notifications are ignored once it has been called.
+    """
+    closed = threading.Event()
+
+    def render(current_data):
+        if not closed.is_set():
+            update_status(page, rfc, status_container, buttons, current_data)
+
+    def on_locale_changed():
+        # Watcher thread: read here, off the event loop; only the control changes hop over to it.
+        # A burst of writes re-renders nothing once the panel already shows the final state.
+        if closed.is_set():
+            return
+        current_data = rfc.get_current_locale()
+        loop = getattr(page, "loop", None)
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(render, current_data)
+
+    def unsubscribe():
+        closed.set()
+        rfc.locale_state.remove_listener(on_locale_changed)
 
+    rfc.locale_state.add_listener(on_locale_changed)
+    return unsubscribe
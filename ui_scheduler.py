@@ -0,0 +1,61 @@
+import threading
+
+
+class UpdateScheduler:
+    """Coalesce control mutations into as few page.update() calls as possible.
+
+    Handlers call mark(*controls) after changing controls; everything marked
+    before the event loop gets to run the flush is sent in a single update.
+    Marking without controls requests a full page update (e.g. after
+    page.overlay changes). `updates_sent` counts the updates actually sent.
+    """
+
+    def __init__(self, page, loop=None):
+        self.page = page
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._dirty = {}
+        self._full = False
+        self._scheduled = False
+        self.updates_sent = 0
+
+    def mark(self, *controls):
+        """Mark controls dirty and schedule one flush on the next event-loop tick."""
+        with self._lock:
+            if controls:
+                for control in controls:
+                    if control is not None:
+                        self._dirty[id(control)] = control
+            else:
+                self._full = True
+            if self._scheduled:
+                return
+            self._scheduled = True
+        loop = self._loop or getattr(self.page, "loop", None)
+        if loop is None or loop.is_closed():
+            self.flush()
+        else:
+            loop.call_soon_threadsafe(self.flush)
+
+    def flush(self):
+        """Send pending changes now as a single update."""
+        with self._lock:
+            controls = list(self._dirty.values())
+            full = self._full
+            self._dirty.clear()
+            self._full = False
+            self._scheduled = False
+        if not full and not controls:
+            return
+        try:
+            if full:
+                self.page.update()
+            else:
+                self.page.update(*controls)
+            self.updates_sent += 1
+        except Exception as e:
+            print(f"UI update error: {e}")
+
+    def reset_count(self):
+        """Zero `updates_sent`, e.g. before measuring one interaction."""
+        self.updates_sent = 0
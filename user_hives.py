@@ -0,0 +1,51 @@
+import ntpath
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+from os_backend import HKLM, HKU
+
+PROFILE_LIST_KEY = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\ProfileList"
+
+# `loaded` is True when the account is signed in (its hive is already under HKEY_USERS\<sid>)
+UserProfile = namedtuple("UserProfile", "sid profile_path loaded")
+
+
+def is_user_sid(sid):
+    """True for local and domain user accounts (S-1-5-21-...), not SYSTEM or service accounts."""
+    return sid.upper().startswith("S-1-5-21-") and not sid.lower().endswith("_classes")
+
+
+def list_profiles(backend):
+    """Return a UserProfile for every user account in ProfileList, signed in or not."""
+    loaded = {name.upper() for name in backend.list_subkeys(HKU, "")}
+    profiles = []
+    for sid in backend.list_subkeys(HKLM, PROFILE_LIST_KEY):
+        if not is_user_sid(sid):
+            continue
+        try:
+            profile_path = backend.read_value(HKLM, f"{PROFILE_LIST_KEY}\\{sid}", "ProfileImagePath")
+        except FileNotFoundError:
+            continue  # half-deleted profile
+        # REG_EXPAND_SZ, e.g. %SystemDrive%\Users\name
+        profiles.append(UserProfile(sid, os.path.expandvars(profile_path), sid.upper() in loaded))
+    return profiles
+
+
+@contextmanager
+def mounted_hive(backend, profile):
+    """Yield the HKEY_USERS subkey holding `profile`'s hive.
+
+    Signed-in accounts are used in place; otherwise the profile's NTUSER.DAT
+    is loaded under a temporary name for the duration of the block.
+    """
+    if profile.loaded:
+        yield profile.sid
+        return
+    # Not the SID itself, so a sign-in while we hold the hive cannot pick up our mount
+    name = f"CrossfireLegionFix_{profile.sid}"
+    backend.load_hive(HKU, name, ntpath.join(profile.profile_path, "NTUSER.DAT"))
+    try:
+        yield name
+    finally:
+        backend.unload_hive(HKU, name)